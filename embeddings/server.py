@@ -1,12 +1,149 @@
-from fastapi import FastAPI
+import asyncio
+import os
+import time
+
+from fastapi import FastAPI, HTTPException
 from sentence_transformers import SentenceTransformer
 
 app = FastAPI()
 
-model = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
+MODEL_NAME = os.getenv("MODEL_NAME", "sentence-transformers/all-MiniLM-L6-v2")
+# Micro-batching: concurrent single-text requests are collected for up to
+# BATCH_MAX_WAIT_MS (or until BATCH_MAX_SIZE texts are queued) and encoded
+# together in one forward pass.
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", 64))
+BATCH_MAX_WAIT_MS = float(os.getenv("BATCH_MAX_WAIT_MS", 5))
+# Upper bound for texts accepted by /encode_batch in one request.
+MAX_BATCH_REQUEST = int(os.getenv("MAX_BATCH_REQUEST", 1024))
+
+model = SentenceTransformer(MODEL_NAME)
+
+
+def encode_texts(texts):
+    """Runs one forward pass for a list of texts (called from a worker thread)."""
+    return model.encode(texts, batch_size=BATCH_MAX_SIZE).tolist()
+
+
+class MicroBatcher:
+    def __init__(self, max_batch_size: int, max_wait_ms: float):
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.queue = None
+        self._worker = None
+        self.metrics = {
+            "requests": 0,
+            "batches": 0,
+            "last_batch_size": 0,
+            "max_batch_size_seen": 0,
+            "encode_seconds_total": 0.0,
+        }
+
+    def start(self):
+        self.queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._worker:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+
+    async def submit(self, text: str):
+        future = asyncio.get_running_loop().create_future()
+        self.metrics["requests"] += 1
+        await self.queue.put((text, future))
+        return await future
+
+    async def _collect(self):
+        # Block for the first item, then keep draining until the batch is full
+        # or the wait window closes.
+        batch = [await self.queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            texts = [text for text, _ in batch]
+
+            start = time.perf_counter()
+            try:
+                embeddings = await asyncio.to_thread(encode_texts, texts)
+                if len(embeddings) != len(batch):
+                    # Pairing by position would hand requests each other's vectors.
+                    raise ValueError(f"Got {len(embeddings)} embeddings for {len(batch)} texts")
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.metrics["batches"] += 1
+            self.metrics["last_batch_size"] = len(batch)
+            self.metrics["max_batch_size_seen"] = max(self.metrics["max_batch_size_seen"], len(batch))
+            self.metrics["encode_seconds_total"] += time.perf_counter() - start
+
+            for (_, future), emb in zip(batch, embeddings):
+                if not future.done():
+                    future.set_result(emb)
+
+    def snapshot(self):
+        data = dict(self.metrics)
+        data["queue_depth"] = self.queue.qsize() if self.queue else 0
+        data["avg_batch_size"] = (
+            data["requests"] / data["batches"] if data["batches"] else 0.0
+        )
+        data["max_batch_size"] = self.max_batch_size
+        data["max_wait_ms"] = self.max_wait * 1000.0
+        return data
+
+
+batcher = MicroBatcher(BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS)
+
+
+@app.on_event("startup")
+async def start_batcher():
+    batcher.start()
+
+
+@app.on_event("shutdown")
+async def stop_batcher():
+    await batcher.stop()
+
 
 @app.post("/encode")
 async def encode(payload: dict):
-    text = payload["text"]
-    embedding = model.encode(text).tolist()
+    text = payload.get("text")
+    # Checked before batching: one bad text would fail every request encoded with it.
+    if not isinstance(text, str):
+        raise HTTPException(status_code=422, detail="'text' must be a string")
+    embedding = await batcher.submit(text)
     return {"embedding": embedding}
+
+
+@app.post("/encode_batch")
+async def encode_batch(payload: dict):
+    texts = payload.get("texts")
+    if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+        raise HTTPException(status_code=422, detail="'texts' must be a list of strings")
+    if len(texts) > MAX_BATCH_REQUEST:
+        raise HTTPException(status_code=413, detail=f"Too many texts ({len(texts)} > {MAX_BATCH_REQUEST})")
+    if not texts:
+        return {"embeddings": []}
+    embeddings = await asyncio.to_thread(encode_texts, texts)
+    return {"embeddings": embeddings}
+
+
+@app.get("/metrics")
+async def metrics():
+    return batcher.snapshot()
@@ -1,14 +1,33 @@
 import asyncio
 import aiomysql
 import aerospike
-from elasticsearch import Elasticsearch
+from aerospike_helpers.batch.records import BatchRecords, Write
+from aerospike_helpers.operations import operations as as_ops
+from elasticsearch import AsyncElasticsearch
+from elasticsearch.helpers import async_bulk
 import os
+import sys
 import time
 import requests
 import json
 import argparse
 from datetime import datetime, timedelta
 
+# src/ lives next to scripts/ (same layout as the Docker image)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from src.tools.routing import routing_for
+from indexer_common import (
+    bump_generation,
+    EmbeddingStore,
+    StageStats,
+    FileCheckpointStore,
+    AerospikeCheckpointStore,
+    run_sharded,
+)
+
 # Config
 MYSQL_HOST = os.getenv("MYSQL_HOST", "localhost")
 MYSQL_USER = os.getenv("MYSQL_USER", "root")
@@ -22,10 +41,31 @@ AS_SET = "jobs"
 
 ES_HOST = os.getenv("ES_HOST", "http://elasticsearch:9200")
 EMBED_API = os.getenv("EMBEDDING_API", "http://embeddings:8002/encode")
+EMBED_BATCH_API = os.getenv("EMBEDDING_BATCH_API", EMBED_API.rsplit("/", 1)[0] + "/encode_batch")
 INDEX_NAME = "jobs"
+VECTOR_DIMS = 384
+
+# Pipeline: MySQL reader -> embed workers -> sink workers (ES bulk + AS batch).
+# Queues are bounded so a slow stage applies backpressure upstream.
+BATCH_SIZE = int(os.getenv("INDEXER_BATCH_SIZE", 200))  # MySQL page size == pipeline batch
+EMBED_WORKERS = int(os.getenv("INDEXER_EMBED_WORKERS", 4))
+SINK_WORKERS = int(os.getenv("INDEXER_SINK_WORKERS", 2))
+QUEUE_SIZE = int(os.getenv("INDEXER_QUEUE_SIZE", 8))
+# Full reindex can be split into WORKERS processes, each owning the rows with
+# MOD(CRC32(job_id), WORKERS) == shard and its own MySQL/ES/Aerospike clients.
+WORKERS = int(os.getenv("INDEXER_WORKERS", 1))
+SHARD_RETRIES = int(os.getenv("INDEXER_SHARD_RETRIES", 2))
 
-# Global Clients
-es = Elasticsearch(ES_HOST)
+JOB_COLUMNS = "job_id, title, description, location, experience, skills"
+
+# Incremental (partial) runs resume from a persisted (updated_at, job_id)
+# high-water mark. Rows newer than NOW() - CHECKPOINT_LAG_SECONDS are left
+# for the next run, so rows committed late with an older timestamp in the
+# same second are not skipped.
+CHECKPOINT_NAME = os.getenv("INDEXER_CHECKPOINT_NAME", "indexer_checkpoint")
+CHECKPOINT_FILE = os.getenv("INDEXER_CHECKPOINT_FILE", ".indexer_checkpoint.json")
+CHECKPOINT_LAG_SECONDS = int(os.getenv("INDEXER_CHECKPOINT_LAG_SECONDS", 2))
+EPOCH = datetime(1970, 1, 1)
 
 def get_aerospike_client():
     config = {"hosts": [(AS_HOST, AS_PORT)]}
@@ -39,27 +79,21 @@ async def get_mysql_pool():
         db=MYSQL_DB, loop=asyncio.get_running_loop()
     )
 
-def embed_text_sync(text):
+def embed_batch_sync(texts):
     try:
-        resp = requests.post(EMBED_API, json={"text": text}, timeout=10)
+        resp = requests.post(EMBED_BATCH_API, json={"texts": texts}, timeout=60)
         if resp.status_code == 200:
-            return resp.json().get("embedding", [])
+            embs = resp.json().get("embeddings", [])
+            if len(embs) == len(texts):
+                return embs
+        print(f"Embedding error: status {resp.status_code}")
     except Exception as e:
         print(f"Embedding error: {e}")
-    return [0.0] * 384
+    return [[0.0] * VECTOR_DIMS for _ in texts]
 
-async def process_job(row, as_client):
+def to_bins(row):
     job_id, title, desc, loc, exp, skills = row
-    
-    # Text for embedding
-    full_text = f"{title} {desc} {skills} {loc}"
-    
-    # 1. Embed (CPU bound/Blocking IO -> Thread)
-    vector = await asyncio.to_thread(embed_text_sync, full_text)
-    
-    # 2. Update Aerospike (Full Data)
-    key = (AS_NAMESPACE, AS_SET, str(job_id))
-    bins = {
+    return {
         "job_id": str(job_id),
         "title": title,
         "description": desc,
@@ -67,67 +101,401 @@ async def process_job(row, as_client):
         "experience": exp,
         "skills": skills
     }
-    # Write to AS (sync client, run in thread or if fast enough just run)
-    # Aerospike python client is sync.
+
+def write_aerospike_batch(as_client, docs):
+    """Writes full job records in one batch call (runs in a worker thread)."""
+    records = BatchRecords([
+        Write(
+            key=(AS_NAMESPACE, AS_SET, doc["job_id"]),
+            ops=[as_ops.write(name, value) for name, value in doc.items()],
+        )
+        for doc in docs
+    ])
+    result = as_client.batch_write(records)
+    return sum(1 for rec in result.batch_records if rec.result != 0)
+
+# --------------------------------------------------------
+# CHECKPOINTS
+# --------------------------------------------------------
+def get_checkpoint_store(kind, as_client):
+    if kind == "file":
+        return FileCheckpointStore(CHECKPOINT_FILE)
+    return AerospikeCheckpointStore(as_client, CHECKPOINT_NAME)
+
+def parse_checkpoint(checkpoint):
+    if not checkpoint:
+        return EPOCH, ""
+    return datetime.fromisoformat(checkpoint["updated_at"]), str(checkpoint["job_id"])
+
+def format_checkpoint(updated_at, job_id):
+    return {"updated_at": updated_at.isoformat(), "job_id": str(job_id)}
+
+class CheckpointTracker:
+    """
+    Batches finish out of order (several embed/sink workers), so the
+    watermark only advances over a contiguous prefix of completed batches:
+    a crash can then re-process a few batches but never skip one.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.next_seq = 0
+        self.completed = {}
+
+    async def complete(self, seq, mark):
+        self.completed[seq] = mark
+        watermark = None
+        while self.next_seq in self.completed:
+            watermark = self.completed.pop(self.next_seq)
+            self.next_seq += 1
+        if watermark is not None:
+            await asyncio.to_thread(self.store.save, watermark)
+
+# --------------------------------------------------------
+# PIPELINE STAGES
+# --------------------------------------------------------
+async def read_rows(pool, embed_q, stats, page_size, shard=None):
+    """
+    Full mode: streams every job with keyset pagination on job_id (primary
+    key), one page of page_size rows per query, so memory stays constant and
+    the first pages reach the embed stage while later pages are still read.
+    shard=(index, count) restricts the scan to one CRC32(job_id) shard.
+    """
+    if shard is None:
+        print("Streaming ALL jobs from MySQL...")
+    else:
+        print(f"Streaming jobs of shard {shard[0]}/{shard[1]} from MySQL...")
+    last_id = None
+    seq = 0
+    async with pool.acquire() as conn:
+        while True:
+            conditions = []
+            params = []
+            if shard is not None:
+                conditions.append("MOD(CRC32(job_id), %s) = %s")
+                params.extend([shard[1], shard[0]])
+            if last_id is not None:
+                conditions.append("job_id > %s")
+                params.append(last_id)
+            where_sql = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+            params.append(page_size)
+
+            start = time.perf_counter()
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    f"SELECT {JOB_COLUMNS} FROM jobs {where_sql} ORDER BY job_id LIMIT %s",
+                    params,
+                )
+                rows = await cur.fetchall()
+            stats.add("read", time.perf_counter() - start)
+
+            if not rows:
+                break
+            await embed_q.put((seq, rows, None))
+            seq += 1
+            last_id = rows[-1][0]
+            if len(rows) < page_size:
+                break
+
+async def read_changed_rows(pool, embed_q, stats, page_size, checkpoint):
+    """
+    Partial mode: streams rows changed after the checkpoint, ordered by the
+    (updated_at, job_id) keyset. Each batch carries the watermark of its
+    last row, committed once the batch is written.
+    """
+    last_ts, last_id = parse_checkpoint(checkpoint)
+    print(f"Streaming jobs changed after ({last_ts.isoformat()}, {last_id!r}) from MySQL...")
+    seq = 0
+    async with pool.acquire() as conn:
+        while True:
+            start = time.perf_counter()
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    f"SELECT {JOB_COLUMNS}, updated_at FROM jobs "
+                    "WHERE (updated_at > %s OR (updated_at = %s AND job_id > %s)) "
+                    "AND updated_at < NOW() - INTERVAL %s SECOND "
+                    "ORDER BY updated_at, job_id LIMIT %s",
+                    (last_ts, last_ts, last_id, CHECKPOINT_LAG_SECONDS, page_size),
+                )
+                rows = await cur.fetchall()
+            stats.add("read", time.perf_counter() - start)
+
+            if not rows:
+                break
+            last_ts, last_id = rows[-1][-1], rows[-1][0]
+            await embed_q.put((seq, [row[:-1] for row in rows], format_checkpoint(last_ts, last_id)))
+            seq += 1
+            if len(rows) < page_size:
+                break
+
+async def embed_worker(embed_q, sink_q, stats, embedding_store):
+    while True:
+        item = await embed_q.get()
+        if item is None:
+            return
+        seq, rows, mark = item
+        docs = [to_bins(row) for row in rows]
+        # Text for embedding
+        texts = [f"{d['title']} {d['description']} {d['skills']} {d['location']}" for d in docs]
+
+        start = time.perf_counter()
+        if embedding_store is not None:
+            vectors = await asyncio.to_thread(embedding_store.embed, texts, embed_batch_sync)
+        else:
+            vectors = await asyncio.to_thread(embed_batch_sync, texts)
+        stats.add("embed", time.perf_counter() - start)
+        await sink_q.put((seq, docs, vectors, mark))
+
+async def detect_location_routing(es):
+    """True when the live index was built with location routing (_routing required)."""
     try:
-        as_client.put(key, bins)
+        mappings = await es.indices.get_mapping(index=INDEX_NAME)
+    except Exception:
+        return False
+    return any(m.get("mappings", {}).get("_routing", {}).get("required") for m in mappings.values())
+
+def stale_copies_query(docs, routings):
+    """Matches copies of these jobs stored under another routing (their location changed)."""
+    return {"bool": {"should": [
+        {"bool": {
+            "filter": [{"ids": {"values": [doc["job_id"]]}}],
+            "must_not": [{"term": {"_routing": routing}}],
+        }}
+        for doc, routing in zip(docs, routings)
+    ], "minimum_should_match": 1}}
+
+async def write_es(es, docs, vectors, stats, routed=False, delete_stale=False):
+    actions = [
+        {
+            "_index": INDEX_NAME,
+            "_id": doc["job_id"],
+            "_source": {**doc, "embedding": vector},
+        }
+        for doc, vector in zip(docs, vectors)
+    ]
+    routings = None
+    if routed:
+        routings = [routing_for(doc["location"]) for doc in docs]
+        for action, routing in zip(actions, routings):
+            action["_routing"] = routing
+    start = time.perf_counter()
+    try:
+        _, errors = await async_bulk(es, actions, raise_on_error=False, refresh=False)
+        if errors:
+            print(f"ES Error: {len(errors)} failed docs, first: {json.dumps(errors[0])[:500]}")
+        if routed and delete_stale and not errors:
+            # Re-routing a job does not remove the copy on its old shard. Only
+            # partial runs re-write jobs whose location may have changed; the
+            # delete fans out to every shard, so full loads don't send it.
+            await es.delete_by_query(index=INDEX_NAME, query=stale_copies_query(docs, routings),
+                                     conflicts="proceed", refresh=False)
     except Exception as e:
-        print(f"AS Error {job_id}: {e}")
+        print(f"ES Error: {e}")
+        return False
+    finally:
+        stats.add("es_bulk", time.perf_counter() - start)
+    return not errors
 
-    # 3. Update Elasticsearch (Index Fields + Vector)
-    doc = {
-        "job_id": str(job_id),
-        "title": title,
-        "description": desc,
-        "skills": skills,
-        "location": loc,
-        "experience": exp,
-        "embedding": vector
-    }
-    
-    # ES Index
+async def write_as(as_client, docs, stats):
+    start = time.perf_counter()
     try:
-        es.index(index=INDEX_NAME, id=str(job_id), document=doc)
+        failed = await asyncio.to_thread(write_aerospike_batch, as_client, docs)
+        if failed:
+            print(f"AS Error: {failed} failed records in batch")
+        return not failed
     except Exception as e:
-        print(f"ES Error {job_id}: {e}")
+        print(f"AS Error: {e}")
+        return False
+    finally:
+        stats.add("as_batch", time.perf_counter() - start)
+
+async def sink_worker(sink_q, es, as_client, stats, tracker, failures, on_batch=None,
+                      routed=False, delete_stale=False):
+    while True:
+        item = await sink_q.get()
+        if item is None:
+            return
+        seq, docs, vectors, mark = item
+        # Both sinks are independent, write them concurrently.
+        start = time.perf_counter()
+        ok = all(await asyncio.gather(
+            write_es(es, docs, vectors, stats, routed, delete_stale),
+            write_as(as_client, docs, stats),
+        ))
+        stats.add("sink", time.perf_counter() - start, docs=len(docs))
+
+        if not ok:
+            # Never commit past a failed batch; the next run retries from here.
+            failures.append(seq)
+        else:
+            if tracker is not None and mark is not None:
+                await tracker.complete(seq, mark)
+            if on_batch is not None:
+                on_batch(len(docs))
+        print(".", end="", flush=True)
 
-    return job_id
+async def fetch_full_started_at(pool):
+    """Watermark for a full pass: rows changed after it are left to the next partial run."""
+    async with pool.acquire() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute("SELECT NOW() - INTERVAL %s SECOND", (CHECKPOINT_LAG_SECONDS,))
+            (started_at,) = await cur.fetchone()
+    return started_at
+
+async def index_pass(mode, pool, es, as_client, store, page_size, embed_workers,
+                     sink_workers, queue_size, use_embedding_store=True,
+                     shard=None, on_batch=None, routed=False):
+    """
+    Runs one full or incremental pass through the pipeline; returns
+    (stats, ok). A sharded full pass (shard=(index, count)) leaves the
+    checkpoint to the parent process, which saves it once every shard is done.
+    """
+    stats = StageStats()
+    # Fresh store per pass so the reuse ratio is reported per run.
+    embedding_store = EmbeddingStore(as_client) if use_embedding_store else None
+    embed_q = asyncio.Queue(maxsize=queue_size)
+    sink_q = asyncio.Queue(maxsize=queue_size)
+    failures = []
+    tracker = CheckpointTracker(store) if mode == "partial" else None
+
+    if mode == "full" and shard is None:
+        full_started_at = await fetch_full_started_at(pool)
+
+    embedders = [asyncio.create_task(embed_worker(embed_q, sink_q, stats, embedding_store))
+                 for _ in range(embed_workers)]
+    sinks = [asyncio.create_task(sink_worker(sink_q, es, as_client, stats, tracker, failures,
+                                             on_batch, routed, mode == "partial"))
+             for _ in range(sink_workers)]
+
+    if mode == "full":
+        await read_rows(pool, embed_q, stats, page_size, shard=shard)
+    else:
+        checkpoint = await asyncio.to_thread(store.load)
+        await read_changed_rows(pool, embed_q, stats, page_size, checkpoint)
+
+    # Drain stages in order
+    for _ in embedders:
+        await embed_q.put(None)
+    await asyncio.gather(*embedders)
+    for _ in sinks:
+        await sink_q.put(None)
+    await asyncio.gather(*sinks)
+
+    if embedding_store is not None and stats.docs:
+        embedding_store.report()
+
+    if failures:
+        print(f"\n⚠️ {len(failures)} batch(es) failed; checkpoint not advanced past them.")
+    elif mode == "full" and shard is None:
+        await asyncio.to_thread(store.save, format_checkpoint(full_started_at, ""))
+
+    return stats, not failures
+
+async def run_indexer(mode="full", page_size=BATCH_SIZE, embed_workers=EMBED_WORKERS,
+                      sink_workers=SINK_WORKERS, queue_size=QUEUE_SIZE,
+                      checkpoint_store="aerospike", follow=False, poll_interval=30,
+                      use_embedding_store=True):
+    print(f"Starting Indexer (Mode: {mode}{', follow' if follow else ''})...")
 
-async def run_indexer(mode="full"):
-    print(f"Starting Indexer (Mode: {mode})...")
-    
     pool = await get_mysql_pool()
     as_client = get_aerospike_client()
-    
+    es = AsyncElasticsearch(ES_HOST)
+    store = get_checkpoint_store(checkpoint_store, as_client)
+
     try:
-        async with pool.acquire() as conn:
-            async with conn.cursor() as cur:
-                if mode == "full":
-                    print("Fetching ALL jobs from MySQL...")
-                    await cur.execute("SELECT job_id, title, description, location, experience, skills FROM jobs")
-                else:
-                    # Partial: Fetch jobs updated in last 1 hour
-                    print("Fetching RECENT jobs from MySQL...")
-                    await cur.execute("SELECT job_id, title, description, location, experience, skills FROM jobs WHERE updated_at >= NOW() - INTERVAL 1 HOUR")
-                
-                rows = await cur.fetchall()
-                print(f"Found {len(rows)} jobs to process.")
-                
-                tasks = []
-                for row in rows:
-                    tasks.append(process_job(row, as_client))
-                    
-                    if len(tasks) >= 50:
-                        await asyncio.gather(*tasks)
-                        tasks = []
-                        print(".", end="", flush=True)
-                
-                if tasks:
-                    await asyncio.gather(*tasks)
-                    
-        print(f"\n✅ Indexing complete.")
-        
+        if not await es.indices.exists(index=INDEX_NAME):
+            # Strict mapping lives in index_jobs.py (create_index); run it first
+            # for a fresh cluster, otherwise ES falls back to dynamic mapping.
+            print(f"⚠️ Index '{INDEX_NAME}' does not exist; run index_jobs.py to create it.")
+        routed = await detect_location_routing(es)
+        if routed:
+            print("Index uses location routing; routing writes by normalized location.")
+
+        while True:
+            stats, _ = await index_pass(mode, pool, es, as_client, store, page_size,
+                                        embed_workers, sink_workers, queue_size,
+                                        use_embedding_store=use_embedding_store, routed=routed)
+            if stats.docs:
+                await es.indices.refresh(index=INDEX_NAME)
+                bump_generation(as_client)
+                stats.report()
+            print(f"\n✅ Indexing pass complete ({stats.docs} docs).")
+
+            if not follow:
+                break
+            # Continuous mode: poll for changes after the committed watermark.
+            mode = "partial"
+            await asyncio.sleep(poll_interval)
+
+    finally:
+        await es.close()
+        as_client.close()
+        pool.close()
+        await pool.wait_closed()
+
+# --------------------------------------------------------
+# SHARDED (MULTI-PROCESS) FULL REINDEX
+# --------------------------------------------------------
+async def run_shard(shard, n_shards, progress_q, page_size, embed_workers, sink_workers,
+                    queue_size, use_embedding_store):
+    pool = await get_mysql_pool()
+    as_client = get_aerospike_client()
+    es = AsyncElasticsearch(ES_HOST)
+    try:
+        stats, ok = await index_pass(
+            "full", pool, es, as_client, None, page_size, embed_workers, sink_workers,
+            queue_size, use_embedding_store=use_embedding_store,
+            shard=(shard, n_shards), on_batch=lambda n: progress_q.put((shard, n)),
+            routed=await detect_location_routing(es),
+        )
+        stats.report(f"Shard {shard} stats")
+        return {"ok": ok, "docs": stats.docs}
+    finally:
+        await es.close()
+        as_client.close()
+        pool.close()
+        await pool.wait_closed()
+
+def index_shard(shard, n_shards, progress_q, **kwargs):
+    """Process-pool entry point: one event loop and one set of connections per shard."""
+    return asyncio.run(run_shard(shard, n_shards, progress_q, **kwargs))
+
+async def run_sharded_indexer(workers, retries=SHARD_RETRIES, page_size=BATCH_SIZE,
+                              embed_workers=EMBED_WORKERS, sink_workers=SINK_WORKERS,
+                              queue_size=QUEUE_SIZE, checkpoint_store="aerospike",
+                              use_embedding_store=True):
+    """
+    Full reindex split across `workers` processes. The checkpoint is only
+    saved when every shard succeeded; failed shards are retried on their own.
+    Returns True on success.
+    """
+    print(f"Starting Indexer (Mode: full, {workers} worker processes)...")
+
+    pool = await get_mysql_pool()
+    as_client = get_aerospike_client()
+    es = AsyncElasticsearch(ES_HOST)
+    try:
+        full_started_at = await fetch_full_started_at(pool)
+        results = await asyncio.to_thread(
+            run_sharded, index_shard, workers, retries=retries,
+            page_size=page_size, embed_workers=embed_workers, sink_workers=sink_workers,
+            queue_size=queue_size, use_embedding_store=use_embedding_store,
+        )
+        ok = all(results.values())
+        docs = sum(r["docs"] for r in results.values() if r)
+
+        if ok:
+            store = get_checkpoint_store(checkpoint_store, as_client)
+            await asyncio.to_thread(store.save, format_checkpoint(full_started_at, ""))
+        else:
+            print("⚠️ Some shards failed; checkpoint not saved.")
+        if docs:
+            await es.indices.refresh(index=INDEX_NAME)
+            bump_generation(as_client)
+        print(f"\n✅ Sharded indexing complete ({docs} docs).")
+        return ok
     finally:
+        await es.close()
         as_client.close()
         pool.close()
         await pool.wait_closed()
@@ -135,14 +503,48 @@ async def run_indexer(mode="full"):
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--mode", choices=["full", "partial"], default="full")
+    parser.add_argument("--page-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--embed-workers", type=int, default=EMBED_WORKERS)
+    parser.add_argument("--sink-workers", type=int, default=SINK_WORKERS)
+    parser.add_argument("--queue-size", type=int, default=QUEUE_SIZE)
+    parser.add_argument("--checkpoint-store", choices=["aerospike", "file"], default="aerospike")
+    parser.add_argument("--follow", action="store_true",
+                        help="Keep polling for changed rows after the first pass.")
+    parser.add_argument("--poll-interval", type=float, default=30)
+    parser.add_argument("--no-embedding-store", action="store_true",
+                        help="Re-embed every row instead of reusing stored vectors.")
+    parser.add_argument("--workers", type=int, default=WORKERS,
+                        help="Split a full reindex across N processes (CRC32(job_id) shards).")
+    parser.add_argument("--shard-retries", type=int, default=SHARD_RETRIES,
+                        help="Retries for a failed shard (other shards are not redone).")
     args = parser.parse_args()
-    
-    # Ensure ES index exists
-    if not es.indices.exists(index=INDEX_NAME):
-        print("Creating ES index...")
-        # (Simplified creation, assuming strict schema mapping is in index_jobs.py, 
-        # but here we rely on dynamic mapping or pre-existing index. 
-        # Ideally we call the create_index logic from index_jobs.py)
-        pass 
-
-    asyncio.run(run_indexer(args.mode))
+
+    if args.workers > 1:
+        if args.mode != "full":
+            parser.error("--workers only applies to --mode full")
+        ok = asyncio.run(run_sharded_indexer(
+            args.workers,
+            retries=args.shard_retries,
+            page_size=args.page_size,
+            embed_workers=args.embed_workers,
+            sink_workers=args.sink_workers,
+            queue_size=args.queue_size,
+            checkpoint_store=args.checkpoint_store,
+            use_embedding_store=not args.no_embedding_store,
+        ))
+        if not (ok and args.follow):
+            raise SystemExit(0 if ok else 1)
+        # The sharded pass saved the checkpoint; keep following from there.
+        args.mode = "partial"
+
+    asyncio.run(run_indexer(
+        args.mode,
+        page_size=args.page_size,
+        embed_workers=args.embed_workers,
+        sink_workers=args.sink_workers,
+        queue_size=args.queue_size,
+        checkpoint_store=args.checkpoint_store,
+        follow=args.follow,
+        poll_interval=args.poll_interval,
+        use_embedding_store=not args.no_embedding_store,
+    ))
@@ -1,20 +1,77 @@
-import pandas as pd
 import requests
 from elasticsearch import Elasticsearch
+from elasticsearch.helpers import scan
 import time
 import json
 import os
-from math import ceil
+import sys
+import queue
+import threading
+import argparse
+from concurrent.futures import ThreadPoolExecutor
 import math
 
+# src/ lives next to scripts/ (same layout as the Docker image)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from src.tools.vector_index import VectorIndexWriter
+from src.tools.bm25_index import BM25IndexWriter
+from src.tools.routing import LOCATION_ROUTING, routing_for
+from src.tools.gazetteer import LOCATIONS_PATH, save_locations
+from indexer_common import (
+    bump_generation,
+    get_aerospike_client,
+    EmbeddingStore,
+    StageStats,
+    count_csv_rows,
+    iter_csv_chunks,
+    run_sharded,
+)
+
 # -----------------------------------------
 # CONFIG
 # -----------------------------------------
 ES_HOST = os.getenv("ES_HOST", "http://elasticsearch:9200")
 EMBED_URL = os.getenv("EMBEDDING_API", "http://embeddings:8002/encode")
-INDEX_NAME = "jobs"
+EMBED_BATCH_URL = os.getenv("EMBEDDING_BATCH_API", EMBED_URL.rsplit("/", 1)[0] + "/encode_batch")
+INDEX_NAME = "jobs"  # alias searched by hybrid_core; points at the live jobs_v<ts> index
+CSV_PATH = "jobs.csv"
 VECTOR_DIMS = 384
 BATCH_SIZE = 200  # safer for ES bulk ingestion
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", 64))  # texts per /encode_batch call
+EMBED_CONCURRENCY = int(os.getenv("EMBED_CONCURRENCY", 4))  # bulk batches embedded in parallel
+PIPELINE_DEPTH = int(os.getenv("PIPELINE_DEPTH", 8))  # embedded batches waiting for ES
+INDEX_WORKERS = int(os.getenv("INDEX_WORKERS", 1))  # processes, each indexing one CSV row range
+SHARD_RETRIES = int(os.getenv("SHARD_RETRIES", 2))
+
+# Settings applied once a full load is done (during the load: no refresh, no replicas)
+INDEX_REFRESH_INTERVAL = os.getenv("INDEX_REFRESH_INTERVAL", "1s")
+INDEX_REPLICAS = int(os.getenv("INDEX_REPLICAS", 1))
+KEEP_OLD_INDICES = int(os.getenv("KEEP_OLD_INDICES", 1))  # previous versions kept for rollback
+FORCEMERGE_TIMEOUT = int(os.getenv("FORCEMERGE_TIMEOUT", 1800))
+
+# dense_vector index options. int8_* types quantize vectors to one byte per
+# dimension (~4x less memory); m / ef_construction tune the HNSW graph
+# (unset = Elasticsearch defaults, 16 / 100). See knn_sweep.py to compare.
+VECTOR_INDEX_TYPES = ("hnsw", "int8_hnsw", "flat", "int8_flat")
+VECTOR_INDEX_TYPE = os.getenv("VECTOR_INDEX_TYPE", "hnsw")
+HNSW_M = int(os.getenv("HNSW_M")) if os.getenv("HNSW_M") else None
+HNSW_EF_CONSTRUCTION = int(os.getenv("HNSW_EF_CONSTRUCTION")) if os.getenv("HNSW_EF_CONSTRUCTION") else None
+
+# Shard layout. With location routing every job lives on the shard picked by
+# its normalized location (src/tools/routing.py), so location-filtered searches
+# hit one shard; hybrid_core must run with the same LOCATION_ROUTING setting.
+INDEX_SHARDS = int(os.getenv("INDEX_SHARDS")) if os.getenv("INDEX_SHARDS") else None
+
+# Optional exports for the in-process retrievers: embeddings as a
+# memory-mapped matrix (hybrid_core DENSE_RETRIEVER=mmap) and a BM25
+# inverted index (LEXICAL_RETRIEVER=local).
+VECTOR_INDEX_PATH = os.getenv("VECTOR_INDEX_PATH", os.path.join(BASE_DIR, "data", "vector_index"))
+BM25_INDEX_PATH = os.getenv("BM25_INDEX_PATH", os.path.join(BASE_DIR, "data", "bm25_index"))
+VECTOR_EXPORT_DTYPE = os.getenv("VECTOR_EXPORT_DTYPE", "float32")
+VECTOR_EXPORT_IVF_LISTS = int(os.getenv("VECTOR_EXPORT_IVF_LISTS", 0))
 
 es = Elasticsearch(ES_HOST)
 
@@ -37,12 +94,32 @@ def wait_for_es():
 # -----------------------------------------
 # CREATE INDEX (BM25 + VECTOR)
 # -----------------------------------------
-def create_index():
-    if es.indices.exists(index=INDEX_NAME):
-        print(f"Index '{INDEX_NAME}' already exists. Deleting...")
-        es.indices.delete(index=INDEX_NAME)
-
-    mapping = {
+# A full reindex builds a new jobs_v<timestamp> index tuned for bulk loading,
+# then finalize_index() restores search settings and atomically moves the
+# "jobs" alias, so searches never see a missing or half-built index.
+def vector_index_options(index_type=None, m=None, ef_construction=None):
+    index_type = index_type or VECTOR_INDEX_TYPE
+    if index_type not in VECTOR_INDEX_TYPES:
+        raise ValueError(f"Unknown vector index type '{index_type}', expected one of {VECTOR_INDEX_TYPES}")
+
+    options = {"type": index_type}
+    if index_type.endswith("hnsw"):
+        if m is not None:
+            options["m"] = m
+        if ef_construction is not None:
+            options["ef_construction"] = ef_construction
+    return options
+
+
+def build_index_body(index_type=None, m=None, ef_construction=None, shards=None, routed=False):
+    """Index settings (bulk-load tuned) + BM25/vector mapping."""
+    body = {
+        "settings": {
+            "index": {
+                "refresh_interval": "-1",
+                "number_of_replicas": 0,
+            }
+        },
         "mappings": {
             "properties": {
                 "job_id": {"type": "keyword"},
@@ -55,14 +132,148 @@ def create_index():
                     "type": "dense_vector",
                     "dims": VECTOR_DIMS,
                     "index": True,
-                    "similarity": "cosine"
+                    "similarity": "cosine",
+                    "index_options": vector_index_options(index_type, m, ef_construction),
                 }
             }
         }
     }
+    if shards:
+        body["settings"]["index"]["number_of_shards"] = shards
+    if routed:
+        # Rejects writes without routing (they would land on the wrong shard).
+        body["mappings"]["_routing"] = {"required": True}
+    return body
+
+
+def create_index(index_type=None, m=None, ef_construction=None, shards=None, routed=False):
+    """Creates a new versioned index for a full load and returns its name."""
+    index_name = f"{INDEX_NAME}_v{time.strftime('%Y%m%d%H%M%S')}"
+    body = build_index_body(index_type, m or HNSW_M, ef_construction or HNSW_EF_CONSTRUCTION,
+                            shards=shards, routed=routed)
+
+    es.indices.create(index=index_name, body=body)
+    vector_options = body["mappings"]["properties"]["embedding"]["index_options"]
+    print(f"Created index '{index_name}' with BM25 + dense vector {vector_options} "
+          f"(bulk-load settings, shards: {shards or 'default'}, location routing: {routed}).")
+    return index_name
+
+
+def finalize_index(index_name):
+    """Restores refresh/replicas, force-merges and swaps the alias onto index_name."""
+    print(f"Finalizing '{index_name}'...")
+    es.indices.put_settings(index=index_name, settings={
+        "index": {
+            "refresh_interval": INDEX_REFRESH_INTERVAL,
+            "number_of_replicas": INDEX_REPLICAS,
+        }
+    })
+    es.indices.refresh(index=index_name)
+    es.options(request_timeout=FORCEMERGE_TIMEOUT).indices.forcemerge(
+        index=index_name, max_num_segments=1
+    )
+    swap_alias(index_name)
+
+
+def swap_alias(index_name):
+    actions = []
+    old_indices = []
+
+    if es.indices.exists_alias(name=INDEX_NAME):
+        old_indices = sorted(es.indices.get_alias(name=INDEX_NAME))
+        actions += [{"remove": {"index": old, "alias": INDEX_NAME}} for old in old_indices]
+    elif es.indices.exists(index=INDEX_NAME):
+        # Legacy concrete "jobs" index: drop it in the same atomic update
+        # that creates the alias, since both cannot share the name.
+        print(f"Replacing concrete index '{INDEX_NAME}' with an alias.")
+        actions.append({"remove_index": {"index": INDEX_NAME}})
+
+    actions.append({"add": {"index": index_name, "alias": INDEX_NAME, "is_write_index": True}})
+    es.indices.update_aliases(actions=actions)
+    print(f"Alias '{INDEX_NAME}' -> '{index_name}'.")
+
+    cleanup_old_indices(keep={index_name})
+
+
+def cleanup_old_indices(keep):
+    """Deletes versioned indices beyond the KEEP_OLD_INDICES most recent ones."""
+    versions = sorted(
+        (name for name in es.indices.get(index=f"{INDEX_NAME}_v*") if name not in keep),
+        reverse=True,
+    )
+    for old in versions[KEEP_OLD_INDICES:]:
+        print(f"Deleting old index '{old}'.")
+        es.indices.delete(index=old)
+
+
+def discard_index(index_name):
+    """Drops a half-built index; the alias still points at the previous one."""
+    try:
+        es.indices.delete(index=index_name)
+        print(f"Deleted incomplete index '{index_name}'; alias '{INDEX_NAME}' unchanged.")
+    except Exception as e:
+        print(f"❌ Failed to delete incomplete index '{index_name}': {e}")
 
-    es.indices.create(index=INDEX_NAME, body=mapping)
-    print(f"Created index '{INDEX_NAME}' with BM25 + dense vector.")
+
+# -----------------------------------------
+# EXPORT IN-PROCESS INDEXES (MMAP VECTORS, BM25)
+# -----------------------------------------
+def export_local_indexes(index_name, vector_path=None, bm25_path=None, dtype=None, ivf_lists=None):
+    """Scrolls the freshly built index once and feeds the requested local index writers."""
+    dtype = dtype or VECTOR_EXPORT_DTYPE
+    ivf_lists = VECTOR_EXPORT_IVF_LISTS if ivf_lists is None else ivf_lists
+    vector_writer = VectorIndexWriter(vector_path, VECTOR_DIMS, dtype=dtype) if vector_path else None
+    bm25_writer = BM25IndexWriter(bm25_path) if bm25_path else None
+    if vector_writer is None and bm25_writer is None:
+        return
+
+    fields = ["location", "experience"]
+    if vector_writer is not None:
+        print(f"Exporting vectors from '{index_name}' to {vector_path} "
+              f"({dtype}, ivf lists: {ivf_lists or 'none'})...")
+        fields.append("embedding")
+    if bm25_writer is not None:
+        print(f"Exporting BM25 index from '{index_name}' to {bm25_path}...")
+        fields += list(bm25_writer.fields)
+
+    ids, docs = [], []
+
+    def flush():
+        if vector_writer is not None:
+            vectors = [d.get("embedding") or [0.0] * VECTOR_DIMS for d in docs]
+            vector_writer.add_batch(ids, vectors, docs)
+        if bm25_writer is not None:
+            bm25_writer.add_batch(ids, docs)
+        ids.clear()
+        docs.clear()
+
+    for hit in scan(es, index=index_name, size=1000, _source=fields):
+        ids.append(hit["_id"])
+        docs.append(hit["_source"])
+        if len(ids) >= 10000:
+            flush()
+    if ids:
+        flush()
+
+    if vector_writer is not None:
+        print(f"Exported {vector_writer.close(ivf_lists=ivf_lists)['count']} vectors.")
+    if bm25_writer is not None:
+        print(f"Exported BM25 index over {bm25_writer.close()['count']} docs.")
+
+
+def export_locations(index_name, path=None):
+    """Writes the distinct indexed location values for query_rewrite's gazetteer."""
+    path = path or LOCATIONS_PATH
+    try:
+        resp = es.search(index=index_name, size=0, aggs={
+            "locations": {"terms": {"field": "location", "size": 10000}}
+        })
+        buckets = resp["aggregations"]["locations"]["buckets"]
+        values = save_locations((b["key"] for b in buckets), path)
+        print(f"Exported {len(values)} locations to {path}.")
+    except Exception as e:
+        # Not fatal: the gazetteer falls back to its built-in list.
+        print(f"❌ Failed to export locations: {e}")
 
 
 # -----------------------------------------
@@ -100,99 +311,297 @@ def sanitize_document(d):
 
 
 # -----------------------------------------
-# EMBEDDING WITH RETRIES + VALIDATION
+# BATCH EMBEDDING WITH RETRIES + VALIDATION
+# (one request per EMBED_BATCH_SIZE texts)
 # -----------------------------------------
-def embed_text(text: str):
-    payload = {"text": text}
-
-    for attempt in range(5):
-        try:
-            resp = requests.post(EMBED_URL, json=payload, timeout=20)
+def clean_embedding(emb):
+    # Fix embed size mismatch
+    if len(emb) != VECTOR_DIMS:
+        print(f"⚠️ Warning: bad embedding dims {len(emb)}. Padding/truncating.")
+        emb = (emb + [0.0] * VECTOR_DIMS)[:VECTOR_DIMS]
 
-            if resp.status_code == 200:
-                emb = resp.json().get("embedding", [])
+    # Fix NaN / inf etc
+    return sanitize_embedding(emb)
 
-                # Fix embed size mismatch
-                if len(emb) != VECTOR_DIMS:
-                    print(f"⚠️ Warning: bad embedding dims {len(emb)}. Padding/truncating.")
-                    emb = (emb + [0.0] * VECTOR_DIMS)[:VECTOR_DIMS]
 
-                # Fix NaN / inf etc
-                emb = sanitize_embedding(emb)
+def embed_texts(texts):
+    payload = {"texts": texts}
 
-                return emb
+    for attempt in range(5):
+        try:
+            resp = requests.post(EMBED_BATCH_URL, json=payload, timeout=60)
 
-            print(f"❌ Embedding error status {resp.status_code}, retrying...")
+            if resp.status_code == 200:
+                embs = resp.json().get("embeddings", [])
+                if len(embs) == len(texts):
+                    return [clean_embedding(emb) for emb in embs]
+                print(f"❌ Embedding batch returned {len(embs)} vectors for {len(texts)} texts, retrying...")
+            else:
+                print(f"❌ Embedding batch error status {resp.status_code}, retrying...")
 
         except Exception as e:
-            print(f"❌ Embedding exception: {e}. Retrying...")
+            print(f"❌ Embedding batch exception: {e}. Retrying...")
 
         time.sleep(2)
 
-    print("❌ Failed to embed text after 5 retries. Using zero vector.")
-    return [0.0] * VECTOR_DIMS
+    print(f"❌ Failed to embed batch of {len(texts)} after 5 retries. Using zero vectors.")
+    return [[0.0] * VECTOR_DIMS for _ in texts]
 
 
-# -----------------------------------------
-# BULK INDEXING WITH DEBUG LOGS
-# -----------------------------------------
-def bulk_index(df):
-    total_batches = ceil(len(df) / BATCH_SIZE)
-    print(f"Starting bulk indexing in {total_batches} batches...")
+def embed_batch(texts):
+    vectors = []
+    for start in range(0, len(texts), EMBED_BATCH_SIZE):
+        vectors.extend(embed_texts(texts[start:start + EMBED_BATCH_SIZE]))
+    return vectors
 
-    for batch_idx in range(total_batches):
-        batch = df.iloc[batch_idx * BATCH_SIZE : (batch_idx + 1) * BATCH_SIZE]
 
-        ops = []
-        for _, row in batch.iterrows():
-            emb = embed_text(row["description"])
+def embed_records(records, stats, store=None):
+    texts = [str(r["description"]) for r in records]
+    with stats.timed("embed"):
+        if store is not None:
+            vectors = store.embed(texts, embed_batch)
+        else:
+            vectors = embed_batch(texts)
+    return records, vectors
 
-            action = {
-                "index": {
-                    "_index": INDEX_NAME,
-                    "_id": str(row["job_id"])
-                }
+
+def build_bulk_payload(records, vectors, index_name=INDEX_NAME, routed=False):
+    ops = []
+    for record, emb in zip(records, vectors):
+        action = {
+            "index": {
+                "_index": index_name,
+                "_id": str(record["job_id"])
             }
+        }
+        if routed:
+            action["index"]["routing"] = routing_for(record.get("location"))
 
-            # FIX: sanitize CSV NaN values
-            doc = sanitize_document(row.to_dict())
+        # FIX: sanitize CSV NaN values
+        doc = sanitize_document(record)
 
-            # Add embedding
-            doc["embedding"] = emb
+        # Add embedding
+        doc["embedding"] = emb
 
-            ops.append(json.dumps(action))
-            ops.append(json.dumps(doc))
+        ops.append(json.dumps(action))
+        ops.append(json.dumps(doc))
 
-        payload = "\n".join(ops) + "\n"
-        resp = es.bulk(body=payload)
+    return "\n".join(ops) + "\n"
 
-        print(f"Batch {batch_idx+1}/{total_batches} indexed. Errors: {resp.get('errors')}")
 
-        # If there are errors — print first and stop
-        if resp.get("errors"):
-            print("\n❌ ERROR DETAILS:")
-            for item in resp["items"]:
-                if "error" in item["index"]:
-                    print(json.dumps(item["index"]["error"], indent=2))
-                    break
-            print("‼️ Fix required — stopping indexing.")
-            return
+# -----------------------------------------
+# PIPELINED BULK INDEXING
+# -----------------------------------------
+# Batches flow: CSV chunk -> embedding pool (EMBED_CONCURRENCY workers)
+# -> bounded queue (PIPELINE_DEPTH) -> single ES bulk writer, so embedding
+# batch N+1 overlaps with bulk-indexing batch N.
+def bulk_index(batches, embed_concurrency=None, pipeline_depth=None, stats=None,
+               embedding_store=None, on_batch=None, label="", index_name=INDEX_NAME, routed=False):
+    """
+    Indexes an iterable of record batches (lists of dicts). The iterable is
+    consumed lazily, so a streaming CSV reader keeps memory flat.
+    on_batch(n_docs) is called after every successful bulk request.
+    """
+    embed_concurrency = embed_concurrency or EMBED_CONCURRENCY
+    pipeline_depth = pipeline_depth or PIPELINE_DEPTH
+
+    print(f"Starting bulk indexing (embed concurrency {embed_concurrency}, "
+          f"queue depth {pipeline_depth})...")
+
+    stats = stats or StageStats()
+    pending = queue.Queue(maxsize=pipeline_depth)
+    stop = threading.Event()
+
+    def writer():
+        batch_idx = 0
+        while True:
+            future = pending.get()
+            if future is None:
+                return
+            if stop.is_set():
+                continue  # drain remaining batches after a failure
+
+            batch_idx += 1
+            try:
+                records, vectors = future.result()
+                with stats.timed("build"):
+                    payload = build_bulk_payload(records, vectors, index_name, routed)
+                with stats.timed("bulk", docs=len(records)):
+                    resp = es.bulk(body=payload)
+            except Exception as e:
+                print(f"❌ Batch {batch_idx} failed: {e}")
+                stop.set()
+                continue
+
+            print(f"{label}Batch {batch_idx} indexed ({stats.docs} docs). Errors: {resp.get('errors')}")
+            if on_batch is not None and not resp.get("errors"):
+                on_batch(len(records))
+
+            # If there are errors — print first and stop
+            if resp.get("errors"):
+                print("\n❌ ERROR DETAILS:")
+                for item in resp["items"]:
+                    if "error" in item["index"]:
+                        print(json.dumps(item["index"]["error"], indent=2))
+                        break
+                print("‼️ Fix required — stopping indexing.")
+                stop.set()
+
+    writer_thread = threading.Thread(target=writer, name="bulk-writer")
+    writer_thread.start()
+
+    with ThreadPoolExecutor(max_workers=embed_concurrency, thread_name_prefix="embed") as pool:
+        for records in batches:
+            if stop.is_set():
+                break
+            # Blocks when the queue is full (backpressure on the embedding stage).
+            pending.put(pool.submit(embed_records, records, stats, embedding_store))
+        pending.put(None)
+        writer_thread.join()
+
+    stats.report(f"{label}Pipeline stats" if label else "Pipeline stats")
+    if embedding_store is not None:
+        embedding_store.report()
+    if stop.is_set():
+        return False
 
     print("🎉 All batches indexed successfully! No bulk errors.")
+    return True
+
+
+def open_embedding_store(enabled=True):
+    if not enabled:
+        return None, None
+    try:
+        as_client = get_aerospike_client()
+        return as_client, EmbeddingStore(as_client)
+    except Exception as e:
+        print(f"⚠️ Embedding store unavailable ({e}); embedding every row.")
+        return None, None
+
+
+def index_csv_range(index_name, start_row=0, nrows=None, embed_concurrency=None,
+                    pipeline_depth=None, use_embedding_store=True, on_batch=None, label="",
+                    routed=False):
+    """Streams one CSV row range (the whole file by default) through bulk_index."""
+    as_client, embedding_store = open_embedding_store(use_embedding_store)
+    stats = StageStats()
+    batches = (
+        [dict(zip(cols, row)) for row in rows]
+        for cols, rows in iter_csv_chunks(CSV_PATH, BATCH_SIZE, stats=stats,
+                                          start_row=start_row, nrows=nrows)
+    )
+    try:
+        ok = bulk_index(batches, embed_concurrency=embed_concurrency,
+                        pipeline_depth=pipeline_depth, stats=stats,
+                        embedding_store=embedding_store, on_batch=on_batch, label=label,
+                        index_name=index_name, routed=routed)
+    finally:
+        if as_client is not None:
+            as_client.close()
+    return ok, stats.docs
+
+
+# -----------------------------------------
+# SHARDED (MULTI-PROCESS) INDEXING
+# -----------------------------------------
+def shard_range(total_rows, shard, n_shards):
+    """Contiguous [start, start + nrows) data-row range for one shard."""
+    per_shard = math.ceil(total_rows / n_shards) if total_rows else 0
+    start = min(shard * per_shard, total_rows)
+    return start, min(per_shard, total_rows - start)
+
+
+def index_shard(shard, n_shards, progress_q, index_name, total_rows, embed_concurrency,
+                pipeline_depth, use_embedding_store, routed):
+    """Process-pool entry point: indexes one CSV row range with its own connections."""
+    start, nrows = shard_range(total_rows, shard, n_shards)
+    if nrows <= 0:
+        return {"ok": True, "docs": 0}
+
+    ok, docs = index_csv_range(
+        index_name, start_row=start, nrows=nrows,
+        embed_concurrency=embed_concurrency, pipeline_depth=pipeline_depth,
+        use_embedding_store=use_embedding_store,
+        on_batch=lambda n: progress_q.put((shard, n)),
+        label=f"[shard {shard}] ",
+        routed=routed,
+    )
+    return {"ok": ok, "docs": docs}
 
 
 # -----------------------------------------
 # MAIN
 # -----------------------------------------
 def main():
-    wait_for_es()
-    create_index()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--embed-concurrency", type=int, default=EMBED_CONCURRENCY)
+    parser.add_argument("--queue-depth", type=int, default=PIPELINE_DEPTH)
+    parser.add_argument("--no-embedding-store", action="store_true",
+                        help="Re-embed every row instead of reusing stored vectors.")
+    parser.add_argument("--workers", type=int, default=INDEX_WORKERS,
+                        help="Index CSV row ranges in N parallel processes.")
+    parser.add_argument("--shard-retries", type=int, default=SHARD_RETRIES,
+                        help="Retries for a failed shard (other shards are not redone).")
+    parser.add_argument("--vector-index-type", choices=VECTOR_INDEX_TYPES, default=VECTOR_INDEX_TYPE)
+    parser.add_argument("--hnsw-m", type=int, default=HNSW_M)
+    parser.add_argument("--hnsw-ef-construction", type=int, default=HNSW_EF_CONSTRUCTION)
+    parser.add_argument("--export-vectors", action="store_true",
+                        help="Also export embeddings to the mmap vector index (DENSE_RETRIEVER=mmap).")
+    parser.add_argument("--vector-path", default=VECTOR_INDEX_PATH)
+    parser.add_argument("--vector-dtype", choices=["float32", "float16", "int8"], default=VECTOR_EXPORT_DTYPE)
+    parser.add_argument("--ivf-lists", type=int, default=VECTOR_EXPORT_IVF_LISTS,
+                        help="Build an IVF index with N lists (0 = exact search only).")
+    parser.add_argument("--export-bm25", action="store_true",
+                        help="Also export the in-process BM25 index (LEXICAL_RETRIEVER=local).")
+    parser.add_argument("--bm25-path", default=BM25_INDEX_PATH)
+    parser.add_argument("--shards", type=int, default=INDEX_SHARDS,
+                        help="Primary shards for the new index (default: Elasticsearch default).")
+    parser.add_argument("--location-routing", action=argparse.BooleanOptionalAction,
+                        default=LOCATION_ROUTING,
+                        help="Route jobs to shards by normalized location (set LOCATION_ROUTING=1 for search).")
+    args = parser.parse_args()
 
-    print("Loading CSV file...")
-    df = pd.read_csv("jobs.csv")
-    print(f"Loaded {len(df)} job records.")
-
-    bulk_index(df)
+    wait_for_es()
+    index_name = create_index(args.vector_index_type, args.hnsw_m, args.hnsw_ef_construction,
+                              shards=args.shards, routed=args.location_routing)
+
+    if args.workers > 1:
+        total_rows = count_csv_rows(CSV_PATH, "job_id")
+        print(f"Indexing {total_rows} rows from {CSV_PATH} across {args.workers} processes...")
+        results = run_sharded(
+            index_shard, args.workers, retries=args.shard_retries,
+            index_name=index_name,
+            total_rows=total_rows,
+            embed_concurrency=args.embed_concurrency,
+            pipeline_depth=args.queue_depth,
+            use_embedding_store=not args.no_embedding_store,
+            routed=args.location_routing,
+        )
+        ok = all(results.values())
+    else:
+        print(f"Streaming {CSV_PATH} in chunks of {BATCH_SIZE} rows...")
+        ok, _ = index_csv_range(index_name, embed_concurrency=args.embed_concurrency,
+                                pipeline_depth=args.queue_depth,
+                                use_embedding_store=not args.no_embedding_store,
+                                routed=args.location_routing)
+
+    if not ok:
+        # Searches keep using the previous index; nothing cached went stale.
+        discard_index(index_name)
+        print("❌ Job ingestion incomplete.")
+        return
+
+    finalize_index(index_name)
+    export_locations(index_name)
+    export_local_indexes(
+        index_name,
+        vector_path=args.vector_path if args.export_vectors else None,
+        bm25_path=args.bm25_path if args.export_bm25 else None,
+        dtype=args.vector_dtype,
+        ivf_lists=args.ivf_lists,
+    )
+    bump_generation()
 
     print("✅ Job ingestion complete.")
 
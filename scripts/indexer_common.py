@@ -0,0 +1,253 @@
+import os
+import json
+import hashlib
+import multiprocessing
+import threading
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import aerospike
+from aerospike_helpers.batch.records import BatchRecords, Write
+from aerospike_helpers.operations import operations as as_ops
+
+# CSV streaming and stage timings live in ingest_common (no Aerospike
+# dependency, so seed_mysql can use them); re-exported for the indexers.
+from ingest_common import StageStats, count_csv_rows, iter_csv_chunks  # noqa: F401
+
+# -----------------------------------------
+# SHARED INDEXER HELPERS
+# -----------------------------------------
+AS_HOST = os.getenv("AEROSPIKE_HOST", "localhost")
+AS_PORT = int(os.getenv("AEROSPIKE_PORT", 3000))
+AS_NAMESPACE = "test"
+
+# Generation stamp read by src/tools/generation.py to invalidate
+# search-side caches (job records, ranked results).
+AS_META_SET = "meta"
+GENERATION_KEY = "jobs_generation"
+
+
+def get_aerospike_client():
+    config = {"hosts": [(AS_HOST, AS_PORT)]}
+    return aerospike.client(config).connect()
+
+
+def bump_generation(as_client=None):
+    """Tells search replicas that job data changed so they drop cached data."""
+    owns_client = as_client is None
+    key = (AS_NAMESPACE, AS_META_SET, GENERATION_KEY)
+    try:
+        if owns_client:
+            as_client = get_aerospike_client()
+        as_client.increment(key, "generation", 1)
+        _, _, bins = as_client.get(key)
+        print(f"Index generation bumped to {bins.get('generation')}.")
+    except Exception as e:
+        print(f"AS Error bumping generation: {e}")
+    finally:
+        if owns_client and as_client is not None:
+            as_client.close()
+
+
+# -----------------------------------------
+# INCREMENTAL INDEXING CHECKPOINTS
+# -----------------------------------------
+# A checkpoint is the high-water mark {"updated_at": iso-8601, "job_id": str}
+# of the last row whose batch was fully written to every sink.
+class FileCheckpointStore:
+    def __init__(self, path):
+        self.path = path
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, "r") as f:
+            return json.load(f)
+
+    def save(self, checkpoint):
+        # Write-then-rename so a crash never leaves a truncated checkpoint.
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp, self.path)
+
+
+class AerospikeCheckpointStore:
+    def __init__(self, as_client, name):
+        self.as_client = as_client
+        self.key = (AS_NAMESPACE, AS_META_SET, name)
+
+    def load(self):
+        try:
+            _, _, bins = self.as_client.get(self.key)
+        except aerospike.exception.RecordNotFound:
+            return None
+        return {"updated_at": bins["updated_at"], "job_id": bins["job_id"]}
+
+    def save(self, checkpoint):
+        self.as_client.put(self.key, dict(checkpoint))
+
+
+# -----------------------------------------
+# CONTENT-HASH EMBEDDING STORE
+# -----------------------------------------
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+EMBEDDING_STORE_SET = os.getenv("EMBEDDING_STORE_SET", "embedding_store")
+
+
+class EmbeddingStore:
+    """
+    Reindex-time vector store keyed by sha256(model name + exact embedded
+    text). Unchanged documents reuse their stored vector; only new or edited
+    text is sent to the embeddings service. Vectors are float32 bytes.
+    """
+
+    def __init__(self, as_client, model_name=EMBEDDING_MODEL, set_name=EMBEDDING_STORE_SET):
+        self.as_client = as_client
+        self.model_name = model_name
+        self.set_name = set_name
+        self._lock = threading.Lock()
+        self.reused = 0
+        self.embedded = 0
+
+    def content_key(self, text):
+        raw = f"{self.model_name}\x00{text}".encode("utf-8")
+        return (AS_NAMESPACE, self.set_name, hashlib.sha256(raw).hexdigest())
+
+    def get_many(self, texts):
+        keys = [self.content_key(t) for t in texts]
+        try:
+            records = self.as_client.get_many(keys)
+        except Exception as e:
+            print(f"Embedding store read error: {e}")
+            return [None] * len(texts)
+
+        vectors = []
+        for _, _, bins in records:
+            if bins and "vec" in bins:
+                vec = array("f")
+                vec.frombytes(bytes(bins["vec"]))
+                vectors.append(vec.tolist())
+            else:
+                vectors.append(None)
+        return vectors
+
+    def put_many(self, texts, vectors):
+        records = BatchRecords([
+            Write(
+                key=self.content_key(text),
+                ops=[as_ops.write("vec", bytearray(array("f", vector).tobytes()))],
+            )
+            for text, vector in zip(texts, vectors)
+        ])
+        try:
+            self.as_client.batch_write(records)
+        except Exception as e:
+            print(f"Embedding store write error: {e}")
+
+    def embed(self, texts, embed_fn):
+        """Returns vectors for texts, calling embed_fn only for texts not in the store."""
+        vectors = self.get_many(texts)
+        missing = [i for i, vec in enumerate(vectors) if vec is None]
+
+        if missing:
+            fresh = embed_fn([texts[i] for i in missing])
+            for i, vec in zip(missing, fresh):
+                vectors[i] = vec
+            # Zero vectors mean the embeddings service failed; never persist them.
+            stored = [(texts[i], vec) for i, vec in zip(missing, fresh) if any(vec)]
+            if stored:
+                self.put_many(*zip(*stored))
+
+        with self._lock:
+            self.reused += len(texts) - len(missing)
+            self.embedded += len(missing)
+        return vectors
+
+    def report(self):
+        total = self.reused + self.embedded
+        ratio = self.reused / total if total else 0.0
+        print(f"♻️ Embedding reuse: {self.reused}/{total} vectors from store "
+              f"({ratio:.1%}), {self.embedded} embedded.")
+
+
+# -----------------------------------------
+# MULTI-PROCESS SHARDED RUNS
+# -----------------------------------------
+def run_sharded(worker_fn, n_shards, retries=2, **kwargs):
+    """
+    Runs worker_fn(shard, n_shards, progress_q, **kwargs) for every shard in a
+    process pool (one process per shard, each opening its own ES/Aerospike/
+    embedding connections). Workers report progress as (shard, docs) on
+    progress_q and return a dict with at least "ok" and "docs".
+
+    Failed shards (exception, crashed process or ok=False) are retried up to
+    `retries` times; shards that succeeded are never redone.
+    Returns {shard: result or None if it never succeeded}.
+    """
+    ctx = multiprocessing.get_context("spawn")
+    results = {}
+    started = time.perf_counter()
+
+    with ctx.Manager() as manager:
+        progress_q = manager.Queue()
+        totals = [0] * n_shards
+
+        def aggregate_progress():
+            while True:
+                item = progress_q.get()
+                if item is None:
+                    return
+                shard, docs = item
+                if docs is None:
+                    totals[shard] = 0  # shard is being retried from scratch
+                    continue
+                totals[shard] += docs
+                elapsed = time.perf_counter() - started
+                print(f"Progress: {sum(totals)} docs ({sum(totals) / elapsed:.1f} docs/s) "
+                      f"| per shard: {totals}", flush=True)
+
+        progress_thread = threading.Thread(target=aggregate_progress, name="shard-progress")
+        progress_thread.start()
+
+        pending = list(range(n_shards))
+        for attempt in range(retries + 1):
+            if not pending:
+                break
+            if attempt:
+                print(f"🔁 Retrying shard(s) {pending} (attempt {attempt + 1}/{retries + 1})...")
+                for shard in pending:
+                    progress_q.put((shard, None))
+
+            failed = []
+            with ProcessPoolExecutor(max_workers=len(pending), mp_context=ctx) as pool:
+                futures = {
+                    pool.submit(worker_fn, shard, n_shards, progress_q, **kwargs): shard
+                    for shard in pending
+                }
+                for future in as_completed(futures):
+                    shard = futures[future]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        print(f"❌ Shard {shard} crashed: {e}")
+                        result = None
+                    if result and result.get("ok"):
+                        results[shard] = result
+                    else:
+                        failed.append(shard)
+            pending = failed
+
+        progress_q.put(None)
+        progress_thread.join()
+
+    for shard in pending:
+        print(f"❌ Shard {shard} failed after {retries + 1} attempts.")
+        results[shard] = None
+
+    elapsed = time.perf_counter() - started
+    docs = sum(r["docs"] for r in results.values() if r)
+    print(f"\n📊 Sharded run: {docs} docs in {elapsed:.1f}s "
+          f"({docs / elapsed if elapsed > 0 else 0.0:.1f} docs/s) across {n_shards} shards")
+    return results
@@ -0,0 +1,71 @@
+import threading
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+# -----------------------------------------
+# PIPELINE STATS
+# -----------------------------------------
+class StageStats:
+    """Thread-safe per-stage timings and document counts for indexing runs."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.perf_counter()
+        self.docs = 0
+        self.stages = {}  # name -> [seconds, calls]
+
+    def add(self, stage: str, seconds: float, docs: int = 0):
+        with self._lock:
+            entry = self.stages.setdefault(stage, [0.0, 0])
+            entry[0] += seconds
+            entry[1] += 1
+            self.docs += docs
+
+    @contextmanager
+    def timed(self, stage: str, docs: int = 0):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start, docs)
+
+    def report(self, title: str = "Indexing stats", unit: str = "docs"):
+        elapsed = time.perf_counter() - self.started
+        rate = self.docs / elapsed if elapsed > 0 else 0.0
+        print(f"\n📊 {title}: {self.docs} {unit} in {elapsed:.1f}s ({rate:.1f} {unit}/s)")
+        for stage, (seconds, calls) in self.stages.items():
+            avg_ms = seconds / calls * 1000 if calls else 0.0
+            print(f"   - {stage:<10} total {seconds:8.2f}s  calls {calls:6d}  avg {avg_ms:8.1f}ms")
+
+
+# -----------------------------------------
+# STREAMING CSV INGESTION
+# -----------------------------------------
+def iter_csv_chunks(path, chunk_size, columns=None, stats=None, start_row=0, nrows=None):
+    """
+    Streams a CSV in fixed-size chunks, yielding (columns, rows) where rows
+    is a list of plain tuples built column-wise (no per-row Series objects).
+    Memory stays bounded by chunk_size regardless of file size.
+    start_row/nrows select a data-row range (used for sharding).
+    """
+    skiprows = range(1, start_row + 1) if start_row else None
+    reader = pd.read_csv(path, chunksize=chunk_size, usecols=columns,
+                         skiprows=skiprows, nrows=nrows)
+    while True:
+        start = time.perf_counter()
+        try:
+            chunk = next(reader)
+        except StopIteration:
+            return
+        cols = columns or list(chunk.columns)
+        rows = list(zip(*(chunk[c].tolist() for c in cols)))
+        if stats is not None:
+            stats.add("read", time.perf_counter() - start)
+        yield cols, rows
+
+
+def count_csv_rows(path, key_column):
+    """Counts data rows by streaming a single column."""
+    return sum(len(rows) for _, rows in iter_csv_chunks(path, 50000, columns=[key_column]))
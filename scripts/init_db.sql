@@ -6,5 +6,6 @@ CREATE TABLE IF NOT EXISTS jobs (
     experience INTEGER,
     skills TEXT,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX idx_jobs_updated_at_job_id (updated_at, job_id)
 );
@@ -0,0 +1,227 @@
+"""
+kNN recall/latency sweep.
+
+Copies the live "jobs" index into one throwaway index per vector index
+configuration (via _reindex, so nothing is re-embedded), then for every
+num_candidates value runs a fixed query set and reports:
+
+- p50/p99 kNN latency (client wall time and ES "took")
+- disk footprint of the embedding field (indices.disk_usage) and the
+  estimated off-heap memory the vectors + HNSW graph need
+- recall@k against exact brute-force neighbours (script_score over the
+  source index)
+
+Usage:
+    python knn_sweep.py --configs hnsw int8_hnsw int8_hnsw:m=32:ef=200 \
+        --num-candidates 50,100,200,400 --k 10 --sample 100
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+from elasticsearch import Elasticsearch
+
+from index_jobs import (
+    ES_HOST,
+    INDEX_NAME,
+    VECTOR_DIMS,
+    FORCEMERGE_TIMEOUT,
+    build_index_body,
+    embed_batch,
+)
+
+SWEEP_PREFIX = "jobs_sweep"
+REINDEX_TIMEOUT = 3600
+
+es = Elasticsearch(ES_HOST)
+
+
+# -----------------------------------------
+# CONFIGS
+# -----------------------------------------
+def parse_config(spec):
+    """'int8_hnsw:m=32:ef=200' -> {"type": "int8_hnsw", "m": 32, "ef_construction": 200}"""
+    parts = spec.split(":")
+    config = {"type": parts[0], "m": None, "ef_construction": None}
+    for part in parts[1:]:
+        key, value = part.split("=")
+        config["ef_construction" if key in ("ef", "ef_construction") else key] = int(value)
+    return config
+
+
+def config_label(config):
+    label = config["type"]
+    if config["m"] is not None:
+        label += f"_m{config['m']}"
+    if config["ef_construction"] is not None:
+        label += f"_ef{config['ef_construction']}"
+    return label
+
+
+def build_sweep_index(config, source=INDEX_NAME):
+    index_name = f"{SWEEP_PREFIX}_{config_label(config)}"
+    if es.indices.exists(index=index_name):
+        es.indices.delete(index=index_name)
+
+    es.indices.create(index=index_name,
+                      body=build_index_body(config["type"], config["m"], config["ef_construction"]))
+    print(f"Reindexing '{source}' -> '{index_name}'...")
+    es.options(request_timeout=REINDEX_TIMEOUT).reindex(
+        source={"index": source}, dest={"index": index_name}, wait_for_completion=True
+    )
+    # Same finalization as a production load: searchable, then one segment.
+    es.indices.put_settings(index=index_name, settings={"index": {"refresh_interval": "1s"}})
+    es.indices.refresh(index=index_name)
+    es.options(request_timeout=FORCEMERGE_TIMEOUT).indices.forcemerge(
+        index=index_name, max_num_segments=1
+    )
+    return index_name
+
+
+# -----------------------------------------
+# QUERIES + GROUND TRUTH
+# -----------------------------------------
+def load_queries(path, sample, source=INDEX_NAME):
+    if path:
+        with open(path) as f:
+            return [line.strip() for line in f if line.strip()]
+
+    # No query file: use random job titles from the index as queries.
+    resp = es.search(index=source, size=sample, _source=["title"], query={
+        "function_score": {"query": {"match_all": {}}, "random_score": {"seed": 42, "field": "_seq_no"}}
+    })
+    return [hit["_source"]["title"] for hit in resp["hits"]["hits"] if hit["_source"].get("title")]
+
+
+def exact_neighbours(vector, k, source=INDEX_NAME):
+    resp = es.search(index=source, size=k, _source=False, query={
+        "script_score": {
+            "query": {"match_all": {}},
+            "script": {
+                "source": "cosineSimilarity(params.qv, 'embedding') + 1.0",
+                "params": {"qv": vector},
+            },
+        }
+    })
+    return [hit["_id"] for hit in resp["hits"]["hits"]]
+
+
+# -----------------------------------------
+# MEASUREMENTS
+# -----------------------------------------
+def run_knn(index_name, vector, k, num_candidates):
+    start = time.perf_counter()
+    resp = es.search(index=index_name, _source=False, knn={
+        "field": "embedding",
+        "query_vector": vector,
+        "k": k,
+        "num_candidates": num_candidates,
+    }, size=k)
+    wall_ms = (time.perf_counter() - start) * 1000
+    return [hit["_id"] for hit in resp["hits"]["hits"]], wall_ms, resp.get("took", 0)
+
+
+def measure(index_name, vectors, truth, k, num_candidates, repeats):
+    # Warm-up pass so the first configuration doesn't pay for cold page cache.
+    for vector in vectors:
+        run_knn(index_name, vector, k, num_candidates)
+
+    wall, took, recalls = [], [], []
+    for vector, exact in zip(vectors, truth):
+        for _ in range(repeats):
+            ids, wall_ms, took_ms = run_knn(index_name, vector, k, num_candidates)
+            wall.append(wall_ms)
+            took.append(took_ms)
+        recalls.append(len(set(ids) & set(exact)) / max(len(exact), 1))
+
+    return {
+        "p50_ms": float(np.percentile(wall, 50)),
+        "p99_ms": float(np.percentile(wall, 99)),
+        "took_p50_ms": float(np.percentile(took, 50)),
+        "took_p99_ms": float(np.percentile(took, 99)),
+        f"recall@{k}": float(np.mean(recalls)),
+    }
+
+
+def footprint(index_name, config):
+    usage = es.indices.disk_usage(index=index_name, run_expensive_tasks=True)[index_name]
+    field = usage.get("fields", {}).get("embedding", {})
+    num_docs = es.count(index=index_name)["count"]
+
+    # Vectors + graph are memory-mapped (off-heap); the page cache needs
+    # roughly this much to serve kNN without disk reads.
+    bytes_per_vector = VECTOR_DIMS + 4 if config["type"].startswith("int8") else VECTOR_DIMS * 4
+    graph_bytes = 4 * (config["m"] or 16) if config["type"].endswith("hnsw") else 0
+    return {
+        "docs": num_docs,
+        "store_bytes": usage.get("store_size_in_bytes", 0),
+        "embedding_disk_bytes": field.get("total_in_bytes", 0),
+        "est_offheap_bytes": num_docs * (bytes_per_vector + graph_bytes),
+    }
+
+
+def mb(n):
+    return f"{n / (1024 * 1024):.1f}MB"
+
+
+def print_table(rows, k):
+    print(f"\n{'config':<28}{'num_cand':>9}{'p50 ms':>9}{'p99 ms':>9}{'took50':>8}{'took99':>8}"
+          f"{'recall@' + str(k):>11}{'emb disk':>11}{'off-heap':>11}")
+    for row in rows:
+        print(f"{row['config']:<28}{row['num_candidates']:>9}{row['p50_ms']:>9.1f}{row['p99_ms']:>9.1f}"
+              f"{row['took_p50_ms']:>8.0f}{row['took_p99_ms']:>8.0f}{row[f'recall@{k}']:>11.3f}"
+              f"{mb(row['embedding_disk_bytes']):>11}{mb(row['est_offheap_bytes']):>11}")
+
+
+# -----------------------------------------
+# MAIN
+# -----------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Sweep dense_vector index options and num_candidates.")
+    parser.add_argument("--configs", nargs="+", default=["hnsw", "int8_hnsw"],
+                        help="type[:m=M][:ef=EF], e.g. int8_hnsw:m=32:ef=200")
+    parser.add_argument("--num-candidates", default="50,100,200,400")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", help="File with one query per line (default: sampled job titles).")
+    parser.add_argument("--sample", type=int, default=100)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--source", default=INDEX_NAME)
+    parser.add_argument("--output", help="Write results as JSON to this path.")
+    parser.add_argument("--keep-indices", action="store_true")
+    args = parser.parse_args()
+
+    candidates = [int(n) for n in args.num_candidates.split(",")]
+    configs = [parse_config(spec) for spec in args.configs]
+
+    queries = load_queries(args.queries, args.sample, args.source)
+    print(f"Embedding {len(queries)} queries...")
+    vectors = embed_batch(queries)
+    print("Computing exact neighbours (brute force)...")
+    truth = [exact_neighbours(vector, args.k, args.source) for vector in vectors]
+
+    rows = []
+    for config in configs:
+        index_name = build_sweep_index(config, args.source)
+        try:
+            size = footprint(index_name, config)
+            for num_candidates in candidates:
+                if num_candidates < args.k:
+                    continue
+                print(f"Measuring {config_label(config)} num_candidates={num_candidates}...")
+                result = measure(index_name, vectors, truth, args.k, num_candidates, args.repeats)
+                rows.append({"config": config_label(config), "num_candidates": num_candidates,
+                             **result, **size})
+        finally:
+            if not args.keep_indices:
+                es.indices.delete(index=index_name)
+
+    print_table(rows, args.k)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(rows, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
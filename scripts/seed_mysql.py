@@ -1,7 +1,9 @@
-import pandas as pd
 import pymysql
 import os
 import time
+import math
+
+from ingest_common import StageStats, iter_csv_chunks
 
 # Config
 MYSQL_HOST = os.getenv("MYSQL_HOST", "localhost")
@@ -9,6 +11,8 @@ MYSQL_USER = os.getenv("MYSQL_USER", "root")
 MYSQL_PASSWORD = os.getenv("MYSQL_PASSWORD", "root")
 MYSQL_DB = os.getenv("MYSQL_DB", "jobs_db")
 CSV_PATH = "jobs.csv"
+CHUNK_SIZE = int(os.getenv("SEED_CHUNK_SIZE", 1000))
+COLUMNS = ["job_id", "title", "description", "location", "experience", "skills"]
 
 def wait_for_mysql():
     print("Waiting for MySQL...")
@@ -45,31 +49,34 @@ def seed_data():
     
     conn.commit()
 
-    # Load CSV
-    print(f"Loading {CSV_PATH}...")
-    df = pd.read_csv(CSV_PATH)
-
-    # Insert data
-    print("Inserting data...")
+    # Stream CSV in chunks and insert each chunk
+    print(f"Streaming {CSV_PATH} in chunks of {CHUNK_SIZE} rows...")
     sql = """
     INSERT IGNORE INTO jobs (job_id, title, description, location, experience, skills)
     VALUES (%s, %s, %s, %s, %s, %s)
     """
     
-    values = []
-    for _, row in df.iterrows():
-        values.append((
-            str(row["job_id"]),
-            row["title"],
-            row["description"],
-            row["location"],
-            row["experience"],
-            row["skills"] if pd.notna(row["skills"]) else ""
-        ))
-    
-    cursor.executemany(sql, values)
-    conn.commit()
-    print(f"✅ Seeded {len(values)} jobs into MySQL.")
+    stats = StageStats()
+    for _, rows in iter_csv_chunks(CSV_PATH, CHUNK_SIZE, columns=COLUMNS, stats=stats):
+        values = [
+            (
+                str(job_id),
+                title,
+                description,
+                location,
+                experience,
+                skills if not (isinstance(skills, float) and math.isnan(skills)) else ""
+            )
+            for job_id, title, description, location, experience, skills in rows
+        ]
+
+        with stats.timed("insert", docs=len(values)):
+            cursor.executemany(sql, values)
+            conn.commit()
+        print(f"Inserted {stats.docs} rows...")
+
+    stats.report("Seeding stats", unit="rows")
+    print(f"✅ Seeded {stats.docs} jobs into MySQL.")
 
     conn.close()
 
@@ -0,0 +1,202 @@
+"""
+Train the feature reranker (src/tools/feature_rerank.py) from click logs.
+
+Each line of the log is one search impression, in one of two forms:
+
+1. Served impressions logged by rerank (RERANK_LOG_PATH) with clicks joined
+   on the ids. These carry the exact feature matrix that was scored, so
+   training and serving see identical values (preferred):
+
+    {"query": {...}, "ids": ["<job id>", ...], "feature_names": [...],
+     "features": [[...], ...], "clicked": ["<job id>", ...]}
+
+2. Raw impressions, whose features are recomputed here:
+
+    {"query": {"rewritten_query": "python developer", "location": "Pune", "experience": 5},
+     "jobs": [<job_search hits, in the order shown>],
+     "clicked": ["<job id>", ...]}
+
+   "query" may also be a plain string. Pass --vector-path so the cosine of
+   jobs the dense leg missed is looked up from the mmap index, the same way
+   serving does (rerank.cosine_lookup_for); without it those cosines are 0
+   and the learned cosine weight won't match what serving feeds it.
+
+Fits an L2-regularized logistic regression (clicked vs. not) on the
+standardized features, reports MRR of the first click on a held-out split
+against the incoming fused order, and writes the model to RERANK_MODEL_PATH
+(use RERANK_MODE=features to serve it).
+
+Usage:
+    python train_reranker.py --logs clicks.jsonl --epochs 300 --l2 0.01
+    python train_reranker.py --logs raw_clicks.jsonl --vector-path ../data/vector_index
+"""
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+# src/ lives next to scripts/ (same layout as the Docker image)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from src.tools.feature_rerank import FEATURES, RERANK_MODEL_PATH, LinearReranker, features
+
+EMBED_URL = os.getenv("EMBEDDING_API", "http://embeddings:8002/encode")
+
+
+def load_impressions(path):
+    """[(query, ids, jobs or None, logged matrix or None, clicked ids)] for impressions with a click."""
+    impressions = []
+    with open(path) as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                print(f"Skipping line {line_no}: {e}")
+                continue
+            clicked = {str(jid) for jid in record.get("clicked") or []}
+            # Impressions without a click carry no ranking signal.
+            if not clicked:
+                continue
+            if record.get("features"):
+                matrix = aligned_features(record["features"], record.get("feature_names") or FEATURES)
+                impressions.append((record.get("query"), [str(i) for i in record["ids"]], None, matrix, clicked))
+            elif record.get("jobs"):
+                jobs = record["jobs"]
+                impressions.append((record.get("query"), [str(j.get("id")) for j in jobs], jobs, None, clicked))
+    return impressions
+
+
+def aligned_features(rows, names):
+    """Logged rows re-ordered to the current FEATURES (features added since then are 0)."""
+    logged = np.asarray(rows, dtype=np.float64).reshape(len(rows), len(names))
+    matrix = np.zeros((len(rows), len(FEATURES)))
+    for col, name in enumerate(FEATURES):
+        if name in names:
+            matrix[:, col] = logged[:, names.index(name)]
+    return matrix
+
+
+def make_cosine_lookup(vector_path, embed_url):
+    """Returns query -> cosine_lookup, mirroring rerank.cosine_lookup_for with the mmap index."""
+    import requests
+    from src.tools.vector_index import VectorIndex
+
+    index = VectorIndex(vector_path)
+    vectors = {}
+
+    def lookup_for(query):
+        text = query.get("rewritten_query") if isinstance(query, dict) else query
+        if not text:
+            return None
+        if text not in vectors:
+            try:
+                resp = requests.post(embed_url, json={"text": text}, timeout=30)
+                vectors[text] = resp.json()["embedding"]
+            except Exception as e:
+                print(f"Embedding failed for {text!r}: {e}")
+                vectors[text] = None
+        vector = vectors[text]
+        return None if vector is None else (lambda ids: index.cosine_for_ids(vector, ids))
+
+    return lookup_for
+
+
+def build_dataset(impressions, cosine_lookup_for=None):
+    blocks, labels = [], []
+    for query, ids, jobs, matrix, clicked in impressions:
+        if matrix is None:
+            lookup = cosine_lookup_for(query) if cosine_lookup_for else None
+            matrix = features(jobs, query, lookup)
+        blocks.append(matrix)
+        labels.append(np.array([jid in clicked for jid in ids], dtype=np.float64))
+    return blocks, labels
+
+
+def fit_logistic(x, y, epochs=300, lr=0.1, l2=0.01):
+    """Full-batch gradient descent; x is already standardized."""
+    weights = np.zeros(x.shape[1])
+    bias = 0.0
+    # Clicks are rare: weight positives so both classes count equally.
+    pos = y.sum()
+    sample_weight = np.where(y > 0, (len(y) - pos) / max(pos, 1.0), 1.0)
+    sample_weight /= sample_weight.mean()
+    for _ in range(epochs):
+        p = 1.0 / (1.0 + np.exp(-(x @ weights + bias)))
+        err = (p - y) * sample_weight
+        weights -= lr * (x.T @ err / len(y) + l2 * weights)
+        bias -= lr * err.mean()
+    return weights, bias
+
+
+def mean_reciprocal_rank(blocks, labels, scorer=None):
+    """MRR of the first clicked job; scorer=None keeps the logged order."""
+    total = 0.0
+    for matrix, label in zip(blocks, labels):
+        order = np.arange(len(label)) if scorer is None else np.argsort(-scorer(matrix), kind="stable")
+        hits = np.flatnonzero(label[order] > 0)
+        total += 1.0 / (hits[0] + 1) if len(hits) else 0.0
+    return total / len(blocks) if blocks else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the feature reranker from click logs.")
+    parser.add_argument("--logs", required=True, help="JSONL click log (see module docstring).")
+    parser.add_argument("--output", default=RERANK_MODEL_PATH)
+    parser.add_argument("--epochs", type=int, default=300)
+    parser.add_argument("--lr", type=float, default=0.1)
+    parser.add_argument("--l2", type=float, default=0.01)
+    parser.add_argument("--holdout", type=float, default=0.2, help="Fraction of impressions held out.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--vector-path", default=None,
+                        help="mmap vector index for cosine of jobs the dense leg missed (raw impressions).")
+    parser.add_argument("--embed-url", default=EMBED_URL)
+    args = parser.parse_args()
+
+    impressions = load_impressions(args.logs)
+    if not impressions:
+        print("❌ No impressions with clicks found.")
+        return
+    cosine_lookup_for = None
+    raw = sum(matrix is None for *_, matrix, _ in impressions)
+    if raw and args.vector_path:
+        cosine_lookup_for = make_cosine_lookup(args.vector_path, args.embed_url)
+    elif raw:
+        print(f"⚠️  {raw} raw impressions and no --vector-path: cosine is 0 for jobs the dense "
+              f"leg missed, unlike serving with DENSE_RETRIEVER=mmap.")
+
+    order = np.random.default_rng(args.seed).permutation(len(impressions))
+    impressions = [impressions[i] for i in order]
+    n_holdout = int(len(impressions) * args.holdout) if len(impressions) > 1 else 0
+    test_blocks, test_labels = build_dataset(impressions[:n_holdout], cosine_lookup_for)
+    train_blocks, train_labels = build_dataset(impressions[n_holdout:], cosine_lookup_for)
+
+    x = np.vstack(train_blocks)
+    y = np.concatenate(train_labels)
+    mean = x.mean(axis=0)
+    std = x.std(axis=0)
+    std[std == 0] = 1.0
+    weights, bias = fit_logistic((x - mean) / std, y, args.epochs, args.lr, args.l2)
+
+    model = LinearReranker(dict(zip(FEATURES, weights)), bias, mean, std)
+    print(f"Trained on {len(train_blocks)} impressions ({int(y.sum())} clicks / {len(y)} jobs).")
+    for name, weight in zip(FEATURES, weights):
+        print(f"  {name:<20} {weight:+.4f}")
+
+    blocks, labels = (test_blocks, test_labels) if test_blocks else (train_blocks, train_labels)
+    split = "held-out" if test_blocks else "training"
+    print(f"MRR ({split}, {len(blocks)} impressions): "
+          f"logged order {mean_reciprocal_rank(blocks, labels):.4f}, "
+          f"reranked {mean_reciprocal_rank(blocks, labels, model.score):.4f}")
+
+    model.save(args.output)
+    print(f"✅ Model written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import json
+import os
+import re
+import threading
+import time
+from typing import Optional, Tuple
+
+from src.tools.gazetteer import GAZETTEER
+from src.tools.vocabulary import JOB_WORDS, ROLE_WORDS, SKILL_WORDS
+
+# Rule-based planner for the common job-search intent. Queries it recognizes
+# get the standard query_rewrite -> job_search -> rerank plan without an LLM
+# call; anything ambiguous (or matching another tool's intent) returns None
+# so orchestrate() falls back to the model.
+FAST_PATH_ENABLED = os.getenv("FAST_PATH_ENABLED", "1") == "1"
+FAST_PATH_MIN_CONFIDENCE = float(os.getenv("FAST_PATH_MIN_CONFIDENCE", 0.6))
+FAST_PATH_MAX_TOKENS = int(os.getenv("FAST_PATH_MAX_TOKENS", 20))
+
+JOB_SEARCH_STEPS = [
+    {"tool": "query_rewrite", "input": None},  # filled with the user query
+    {"tool": "job_search", "input": "$PREVIOUS_OUTPUT"},
+    {"tool": "rerank", "input": "$PREVIOUS_OUTPUT"},
+]
+
+EXPERIENCE_RE = re.compile(
+    r"\b(\d+\s*(\+|-\s*\d+|to\s*\d+)?\s*(years?|yrs?|yoe)|fresher|entry[- ]level|senior|junior)\b",
+    re.IGNORECASE,
+)
+
+# Phrases that belong to other tools in SYSTEM_PROMPT: always let the LLM plan these.
+OTHER_INTENT_RE = re.compile(
+    r"\b(salary|salaries|pay|ctc|compensation|package|resume|cv|my profile|job description|"
+    r"jd|search the web|web search|google|check online|external sources?|database|db|run sql|sql query|"
+    r"records|calculate|compute|execute|code|script|plot)\b",
+    re.IGNORECASE,
+)
+TOKEN_RE = re.compile(r"[a-z0-9+#\-]+")
+
+
+def classify(query: str) -> Tuple[float, dict]:
+    """Returns (confidence that this is a plain job search, matched signals)."""
+    text = (query or "").strip()
+    tokens = TOKEN_RE.findall(text.lower())
+    signals = {
+        "job_word": any(t in JOB_WORDS for t in tokens),
+        "role": any(t in ROLE_WORDS for t in tokens),
+        "skill": any(t in SKILL_WORDS for t in tokens),
+        "location": GAZETTEER.find(text) is not None,
+        "experience": EXPERIENCE_RE.search(text) is not None,
+        "other_intent": OTHER_INTENT_RE.search(text) is not None,
+    }
+    if not tokens or signals["other_intent"] or len(tokens) > FAST_PATH_MAX_TOKENS:
+        return 0.0, signals
+
+    confidence = (
+        0.4 * signals["job_word"]
+        + 0.4 * signals["role"]
+        + 0.3 * signals["skill"]
+        + 0.2 * signals["location"]
+        + 0.2 * signals["experience"]
+    )
+    # Without a role/skill/job word there is nothing to search for.
+    if not (signals["job_word"] or signals["role"] or signals["skill"]):
+        confidence = min(confidence, 0.3)
+    return min(confidence, 1.0), signals
+
+
+def job_search_plan(query: str) -> str:
+    steps = [dict(step) for step in JOB_SEARCH_STEPS]
+    steps[0]["input"] = query.strip()
+    return json.dumps({"steps": steps})
+
+
+class FastPathStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.total = 0
+        self.fast = 0
+        self.fast_seconds = 0.0
+
+    def record(self, fast: bool, seconds: float):
+        with self.lock:
+            self.total += 1
+            if fast:
+                self.fast += 1
+                self.fast_seconds += seconds
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "queries": self.total,
+                "fast_path": self.fast,
+                "llm": self.total - self.fast,
+                "fast_path_fraction": self.fast / self.total if self.total else 0.0,
+                "avg_fast_path_us": self.fast_seconds / self.fast * 1e6 if self.fast else 0.0,
+            }
+
+
+STATS = FastPathStats()
+
+
+def plan(query: str, min_confidence: Optional[float] = None) -> Optional[str]:
+    """Plan JSON (same shape the LLM returns) for confident job searches, else None."""
+    if not FAST_PATH_ENABLED:
+        return None
+    start = time.perf_counter()
+    threshold = FAST_PATH_MIN_CONFIDENCE if min_confidence is None else min_confidence
+    confidence, _ = classify(query)
+    result = job_search_plan(query) if confidence >= threshold else None
+    STATS.record(result is not None, time.perf_counter() - start)
+    return result
+
+
+def fast_path_stats() -> dict:
+    return STATS.stats()
@@ -1,17 +1,37 @@
 import os
 import ollama
-from src.orchestrator.prompts import SYSTEM_PROMPT
+from src.orchestrator.prompts import COMBINED_SYSTEM_PROMPT, SYSTEM_PROMPT
+from src.orchestrator import fast_path
+from src.orchestrator.plan_cache import PLAN_CACHE_ENABLED, PLAN_CACHE_SIZE, PLAN_CACHE_TTL, PlanCache
 
 OLLAMA_HOST = os.getenv("OLLAMA_HOST", "http://host.docker.internal:11434")
+# "combined": the planner also returns query_rewrite's parameters ("params"),
+# so run_workflow skips the separate query_rewrite LLM call.
+PLANNER_MODE = os.getenv("PLANNER_MODE", "separate")
 client = ollama.Client(host=OLLAMA_HOST)
+PLAN_CACHE = PlanCache(max_entries=PLAN_CACHE_SIZE, ttl=PLAN_CACHE_TTL)
 
 def orchestrate(user_query: str) -> str:
+    # Standard job searches are planned locally; only the rest pays for the LLM.
+    plan = fast_path.plan(user_query)
+    if plan is not None:
+        return plan
+
+    # Queries that differ from an earlier one only in location/number/skill reuse its plan.
+    if PLAN_CACHE_ENABLED:
+        plan = PLAN_CACHE.get(user_query)
+        if plan is not None:
+            return plan
+
     response = client.chat(
         model="qwen2.5:3b-instruct",
         format="json",
         messages=[
-            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "system", "content": COMBINED_SYSTEM_PROMPT if PLANNER_MODE == "combined" else SYSTEM_PROMPT},
             {"role": "user", "content": user_query},
         ],
     )
-    return response["message"]["content"]
+    content = response["message"]["content"]
+    if PLAN_CACHE_ENABLED:
+        PLAN_CACHE.put(user_query, content)
+    return content
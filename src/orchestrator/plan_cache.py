@@ -0,0 +1,202 @@
+import json
+import os
+import re
+from typing import Iterable, List, Optional, Tuple
+
+from src.tools.vocabulary import SKILL_WORDS
+from src.tools.cache import LRUCache
+from src.tools.gazetteer import GAZETTEER
+
+PLAN_CACHE_ENABLED = os.getenv("PLAN_CACHE_ENABLED", "1") == "1"
+PLAN_CACHE_SIZE = int(os.getenv("PLAN_CACHE_SIZE", 1000))
+PLAN_CACHE_TTL = float(os.getenv("PLAN_CACHE_TTL", 3600))
+
+# Caches LLM plans by query *shape*: locations, numbers and known skills are
+# masked into slots, so "python jobs in pune for 5 years" and "java jobs in
+# mumbai for 3 years" share one entry. The stored plan has the original slot
+# values replaced by markers and is re-filled with the new query's values.
+NUMBER_RE = re.compile(r"^\d+(\.\d+)?(-\d+)?\+?$")
+TOKEN_RE = re.compile(r"[a-z0-9+#]+(?:[-.][a-z0-9+#]+)*")
+MARKER = "<<{}>>"
+MARKER_RE = re.compile(r"<<\w+>>")
+
+Slot = Tuple[str, str]  # (slot type, surface text)
+
+
+def canonicalize(query: str) -> Tuple[str, List[Slot]]:
+    """Returns (shape key, slots in order of appearance)."""
+    text = query or ""
+    shape: List[str] = []
+    slots: List[Slot] = []
+    pos = 0
+    # Locations are matched on the raw text since aliases can span words ("work from home").
+    for match in GAZETTEER.find_all(text) + [None]:
+        end = match.start if match else len(text)
+        for token in TOKEN_RE.findall(text[pos:end].lower()):
+            if NUMBER_RE.match(token):
+                slots.append(("num", token))
+                shape.append("<num>")
+            elif token in SKILL_WORDS:
+                slots.append(("skill", token))
+                shape.append("<skill>")
+            else:
+                shape.append(token)
+        if match:
+            slots.append(("loc", text[match.start:match.end]))
+            shape.append("<loc>")
+            pos = match.end
+    return " ".join(shape), slots
+
+
+def _slot_names(slots: List[Slot]) -> List[str]:
+    counts = {}
+    names = []
+    for kind, _ in slots:
+        names.append(f"{kind}{counts.get(kind, 0)}")
+        counts[kind] = counts.get(kind, 0) + 1
+    return names
+
+
+def _template(value: str, slots: List[Slot]) -> str:
+    """Replaces slot surface texts in a plan input with markers (longest values first)."""
+    named = sorted(zip(_slot_names(slots), slots), key=lambda item: -len(item[1][1]))
+    for name, (_, surface) in named:
+        value = re.sub(rf"(?<![\w-]){re.escape(surface)}(?![\w-])", MARKER.format(name),
+                       value, flags=re.IGNORECASE)
+    return value
+
+
+def _has_stale_literals(value: str) -> bool:
+    """True if a templated value still holds a location/number/skill not taken from the query."""
+    _, leftover = canonicalize(MARKER_RE.sub(" ", value))
+    return bool(leftover)
+
+
+def _instantiate(value: str, slots: List[Slot]) -> str:
+    for name, (_, surface) in zip(_slot_names(slots), slots):
+        value = value.replace(MARKER.format(name), surface)
+    return value
+
+
+def _is_text_or_int(value) -> bool:
+    return isinstance(value, str) or (isinstance(value, int) and not isinstance(value, bool))
+
+
+def validate_plan(plan, tools: Iterable[str]) -> bool:
+    """A plan is reusable only if every step names a known tool with a string input."""
+    if not isinstance(plan, dict) or not isinstance(plan.get("steps"), list):
+        return False
+    tools = set(tools)
+    if plan.get("params") is not None and not isinstance(plan["params"], dict):
+        return False
+    return all(
+        isinstance(step, dict) and step.get("tool") in tools and isinstance(step.get("input"), str)
+        for step in plan["steps"]
+    )
+
+
+def _router_tools() -> set:
+    # Imported lazily: the router pulls in the whole search stack.
+    from src.orchestrator.router import TOOL_MAP
+    return set(TOOL_MAP)
+
+
+class PlanCache:
+    def __init__(self, tools: Optional[Iterable[str]] = None, max_entries: int = 1000,
+                 ttl: Optional[float] = 3600):
+        self._tools = set(tools) if tools is not None else None
+        self.cache = LRUCache(max_entries=max_entries, ttl=ttl)
+        self.exact_hits = 0
+        self.template_hits = 0
+        self.misses = 0
+        self.stored = 0
+        self.rejected = 0
+        self.invalid_on_reuse = 0
+
+    @property
+    def tools(self) -> set:
+        """Tools a cached plan may reference (router.TOOL_MAP unless given)."""
+        if self._tools is None:
+            self._tools = _router_tools()
+        return self._tools
+
+    def get(self, query: str) -> Optional[str]:
+        """Plan JSON for a query of a known shape, or None."""
+        shape, slots = canonicalize(query)
+        entry = self.cache.get(shape)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        steps = [
+            {**step, "input": _instantiate(step["input"], slots)}
+            for step in entry["steps"]
+        ]
+        plan = {"steps": steps}
+        if entry["params"] is not None:
+            plan["params"] = {
+                key: _instantiate(value, slots) if isinstance(value, str) else value
+                for key, value in entry["params"].items()
+            }
+        # Tool set may have changed since the plan was stored; never reuse a stale plan.
+        if not validate_plan(plan, self.tools) or "<<" in json.dumps(plan):
+            self.invalid_on_reuse += 1
+            self.cache.pop(shape)
+            return None
+
+        if [surface for _, surface in slots] == entry["slot_values"]:
+            self.exact_hits += 1
+        else:
+            self.template_hits += 1
+        return json.dumps(plan)
+
+    def put(self, query: str, plan_json: str) -> bool:
+        """Stores a plan (as returned by the LLM) if it validates; returns whether it was cached."""
+        try:
+            plan = json.loads(plan_json)
+        except (TypeError, ValueError):
+            plan = None
+        if not validate_plan(plan, self.tools):
+            self.rejected += 1
+            return False
+
+        shape, slots = canonicalize(query)
+        params = plan.get("params")
+        if params is not None:
+            # Numbers are stored as text so they can be re-filled; query_rewrite parses them back.
+            params = {
+                key: _template(str(value), slots) if _is_text_or_int(value) else value
+                for key, value in params.items()
+            }
+        steps = [{**step, "input": _template(step["input"], slots)} for step in plan["steps"]]
+        # A literal the LLM wrote itself (e.g. "Bangalore" for "bengaluru") would be
+        # replayed verbatim for every query of this shape, so such plans aren't cached.
+        templated = [step["input"] for step in steps]
+        templated += [value for value in (params or {}).values() if isinstance(value, str)]
+        if any(_has_stale_literals(value) for value in templated):
+            self.rejected += 1
+            return False
+
+        self.cache.put(shape, {
+            "params": params,
+            "steps": steps,
+            "slot_values": [surface for _, surface in slots],
+        })
+        self.stored += 1
+        return True
+
+    def stats(self) -> dict:
+        lookups = self.exact_hits + self.template_hits + self.misses
+        return {
+            "entries": len(self.cache),
+            "lookups": lookups,
+            "exact_hits": self.exact_hits,
+            "template_hits": self.template_hits,
+            "misses": self.misses,
+            "hit_rate": (self.exact_hits + self.template_hits) / lookups if lookups else 0.0,
+            "stored": self.stored,
+            "rejected": self.rejected,
+            "invalid_on_reuse": self.invalid_on_reuse,
+            "evictions": self.cache.stats()["evictions"],
+            "expirations": self.cache.stats()["expirations"],
+        }
@@ -135,3 +135,51 @@ STRICT OUTPUT RULE
 Your ENTIRE response MUST be valid JSON parseable by json.loads().
 No text, no reasoning, no markdown outside the JSON.
 """
+
+# Combined planner: one response carries both the plan and the search
+# parameters query_rewrite would otherwise extract with its own LLM call.
+COMBINED_SYSTEM_PROMPT = SYSTEM_PROMPT.replace(
+    """{
+  "steps": [
+     { "tool": "tool_name", "input": "string input" }
+  ]
+}
+""",
+    """{
+  "steps": [
+     { "tool": "tool_name", "input": "string input" }
+  ],
+  "params": {
+     "keywords": "string",
+     "location": "string or null",
+     "experience": "integer, range string like \\"3-5\\", or null"
+  }
+}
+""",
+).replace(
+    """========================================================
+FAIL-SAFE RULE""",
+    """--------------------------------------------------------
+G. SEARCH PARAMETERS
+--------------------------------------------------------
+Whenever the plan calls query_rewrite, ALSO fill "params" from the user's query:
+
+- keywords: core search terms (roles, skills, tech stack). Remove location/experience words.
+- location: the city or region specified, else null.
+- experience: years of experience mentioned, a single number (5) or a range ("3-5"), else null.
+
+   Example for "frontend dev 3-5 years exp in pune":
+   {
+     "steps": [
+       { "tool": "query_rewrite", "input": "frontend dev 3-5 years exp in pune" },
+       { "tool": "job_search", "input": "$PREVIOUS_OUTPUT" },
+       { "tool": "rerank", "input": "$PREVIOUS_OUTPUT" }
+     ],
+     "params": {"keywords": "frontend developer", "location": "pune", "experience": "3-5"}
+   }
+
+If the plan does not call query_rewrite, set "params" to null.
+
+========================================================
+FAIL-SAFE RULE""",
+)
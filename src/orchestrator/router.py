@@ -1,5 +1,5 @@
 import json
-from src.tools.query_rewrite import run as query_rewrite
+from src.tools.query_rewrite import run as query_rewrite, normalize as normalize_rewrite
 from src.tools.job_search import run as job_search
 from src.tools.rerank import run as rerank
 
@@ -11,6 +11,8 @@ TOOL_MAP = {
 
 def run_workflow(json_text: str):
     workflow = json.loads(json_text)
+    # Parameters the combined planner already extracted (see PLANNER_MODE)
+    params = workflow.get("params")
 
     results = []
     context = {}
@@ -19,6 +21,7 @@ def run_workflow(json_text: str):
     for step in workflow.get("steps", []):
         tool_name = step["tool"]
         inp = step["input"]
+        kwargs = {}
         
         # --------------------------------------------------------
         # INTELLIGENT CONTEXT PASSING (Piping)
@@ -37,16 +40,21 @@ def run_workflow(json_text: str):
                 inp = job_output["jobs"]
             elif isinstance(job_output, list):
                 inp = job_output
+            # The feature reranker scores candidates against the extracted query.
+            if isinstance(context.get("query_rewrite"), dict):
+                kwargs["query"] = context["query_rewrite"]
 
         # --------------------------------------------------------
         # EXECUTION
         # --------------------------------------------------------
         if tool_name not in TOOL_MAP:
             output = {"error": f"Tool {tool_name} not found"}
+        elif tool_name == "query_rewrite" and isinstance(params, dict):
+            output = normalize_rewrite(params, inp)
         else:
             fn = TOOL_MAP[tool_name]
             try:
-                output = fn(inp)
+                output = fn(inp, **kwargs)
             except Exception as e:
                 output = {"error": f"Error executing {tool_name}: {str(e)}"}
 
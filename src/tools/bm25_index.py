@@ -0,0 +1,207 @@
+import json
+import math
+import os
+import re
+from array import array
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.tools.filter_columns import FilterColumns, FilterColumnsWriter, replace_npy
+
+# In-process BM25 over the same fields/boosts hybrid_search sends to ES
+# (multi_match best_fields: title^3, skills^2, description).
+#
+# On-disk layout (one directory, every array opened with mmap_mode="r"):
+#   meta.json                 doc count, per-field vocab/avgdl/boost, filter fields (written last)
+#   ids.npy                   document ids, row-aligned
+#   <field>_offsets.npy       int64 [n_terms + 1] posting list boundaries per term id
+#   <field>_docs.npy          int32 doc rows, grouped by term id
+#   <field>_tfs.npy           float32 term frequencies, aligned with _docs
+#   <field>_doclen.npy        float32 token count per doc
+#   field_<name>.npy          filter columns (see filter_columns.py)
+META_FILE = "meta.json"
+IDS_FILE = "ids.npy"
+DEFAULT_FIELDS = {"title": 3.0, "skills": 2.0, "description": 1.0}
+K1 = 1.2
+B = 0.75
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: Any) -> List[str]:
+    """Lowercased word tokens (close to the ES standard analyzer for this data)."""
+    if text is None or (isinstance(text, float) and math.isnan(text)):
+        return []
+    return TOKEN_RE.findall(str(text).lower())
+
+
+class BM25IndexWriter:
+    """Accumulates postings in compact arrays and writes the index on close()."""
+
+    def __init__(self, path: str, fields: Optional[Dict[str, float]] = None,
+                 keyword_fields: Sequence[str] = ("location",),
+                 integer_fields: Sequence[str] = ("experience",)):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.fields = dict(fields or DEFAULT_FIELDS)
+        self.count = 0
+        self.ids: List[str] = []
+        self.filters = FilterColumnsWriter(keyword_fields, integer_fields)
+        self.vocab: Dict[str, Dict[str, int]] = {f: {} for f in self.fields}
+        self.term_ids = {f: array("i") for f in self.fields}
+        self.docs = {f: array("i") for f in self.fields}
+        self.tfs = {f: array("f") for f in self.fields}
+        self.doclen = {f: array("f") for f in self.fields}
+
+    def add_batch(self, ids: Sequence[Any], docs: Sequence[Dict[str, Any]]):
+        for doc_id, doc in zip(ids, docs):
+            row = self.count
+            for field in self.fields:
+                tokens = tokenize(doc.get(field))
+                self.doclen[field].append(len(tokens))
+                vocab = self.vocab[field]
+                for term, tf in Counter(tokens).items():
+                    self.term_ids[field].append(vocab.setdefault(term, len(vocab)))
+                    self.docs[field].append(row)
+                    self.tfs[field].append(tf)
+            self.filters.add(doc)
+            self.ids.append(str(doc_id))
+            self.count += 1
+
+    def close(self) -> dict:
+        """Publishes the index; meta.json is replaced last so readers never see a partial one."""
+        field_meta = {}
+        for field, boost in self.fields.items():
+            term_ids = np.frombuffer(self.term_ids[field], dtype=np.int32)
+            n_terms = len(self.vocab[field])
+            # Stable sort keeps doc rows ascending inside each posting list.
+            order = np.argsort(term_ids, kind="stable")
+            offsets = np.zeros(n_terms + 1, dtype=np.int64)
+            offsets[1:] = np.cumsum(np.bincount(term_ids, minlength=n_terms))
+            doclen = np.frombuffer(self.doclen[field], dtype=np.float32)
+
+            replace_npy(os.path.join(self.path, f"{field}_offsets.npy"), offsets)
+            replace_npy(os.path.join(self.path, f"{field}_docs.npy"),
+                        np.frombuffer(self.docs[field], dtype=np.int32)[order])
+            replace_npy(os.path.join(self.path, f"{field}_tfs.npy"),
+                        np.frombuffer(self.tfs[field], dtype=np.float32)[order])
+            replace_npy(os.path.join(self.path, f"{field}_doclen.npy"), doclen)
+
+            with_field = int(np.count_nonzero(doclen))
+            field_meta[field] = {
+                "boost": boost,
+                "terms": list(self.vocab[field]),
+                "doc_count": with_field,
+                "avgdl": float(doclen.sum() / with_field) if with_field else 0.0,
+            }
+
+        replace_npy(os.path.join(self.path, IDS_FILE), np.array(self.ids, dtype=str))
+        meta = {
+            "count": self.count,
+            "k1": K1,
+            "b": B,
+            "fields": field_meta,
+            "filters": self.filters.save(self.path),
+        }
+        tmp = os.path.join(self.path, META_FILE + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, os.path.join(self.path, META_FILE))
+        return meta
+
+
+class BM25Index:
+    """
+    Read-only BM25 retriever. Scores each field separately (Lucene BM25
+    idf/tf normalization with per-field stats), applies the field boost and
+    keeps the best field per document, like multi_match best_fields.
+    """
+
+    def __init__(self, path: str):
+        with open(os.path.join(path, META_FILE)) as f:
+            self.meta = json.load(f)
+        self.count = self.meta["count"]
+        self.k1 = self.meta["k1"]
+        self.b = self.meta["b"]
+        self.ids = np.load(os.path.join(path, IDS_FILE), mmap_mode="r")
+        self.filters = FilterColumns(path, self.meta["filters"], self.count)
+
+        self.fields = {}
+        for field, spec in self.meta["fields"].items():
+            doclen = np.load(os.path.join(path, f"{field}_doclen.npy"), mmap_mode="r")
+            avgdl = spec["avgdl"] or 1.0
+            self.fields[field] = {
+                "boost": spec["boost"],
+                "doc_count": spec["doc_count"],
+                "terms": {term: i for i, term in enumerate(spec["terms"])},
+                "offsets": np.load(os.path.join(path, f"{field}_offsets.npy"), mmap_mode="r"),
+                "docs": np.load(os.path.join(path, f"{field}_docs.npy"), mmap_mode="r"),
+                "tfs": np.load(os.path.join(path, f"{field}_tfs.npy"), mmap_mode="r"),
+                # Per-doc length normalization, precomputed once at load.
+                "norm": (self.k1 * (1 - self.b + self.b * doclen / avgdl)).astype(np.float32),
+            }
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _field_scores(self, field: dict, terms: List[str]) -> Optional[np.ndarray]:
+        scores = None
+        for term in terms:
+            term_id = field["terms"].get(term)
+            if term_id is None:
+                continue
+            start, end = field["offsets"][term_id], field["offsets"][term_id + 1]
+            docs = field["docs"][start:end]
+            tfs = field["tfs"][start:end]
+            df = end - start
+            idf = math.log(1 + (field["doc_count"] - df + 0.5) / (df + 0.5))
+            if scores is None:
+                scores = np.zeros(self.count, dtype=np.float32)
+            # Doc rows are unique within a posting list, so fancy-index += is safe.
+            scores[docs] += idf * tfs * (self.k1 + 1) / (tfs + field["norm"][docs])
+        return scores
+
+    def scores(self, query: str) -> np.ndarray:
+        """best_fields score per document (0 = no query term matched)."""
+        terms = tokenize(query)
+        best = np.zeros(self.count, dtype=np.float32)
+        for field in self.fields.values():
+            field_scores = self._field_scores(field, terms)
+            if field_scores is not None:
+                np.maximum(best, field["boost"] * field_scores, out=best)
+        return best
+
+    def _search_rows(self, query: str, k: int,
+                     filters: Optional[List[dict]]) -> Tuple[np.ndarray, np.ndarray]:
+        """(rows, scores) of the top k, best first."""
+        mask = self.filters.mask(filters)
+        if not tokenize(query):
+            # No text clause: ES returns the filtered docs with a constant score.
+            rows = np.flatnonzero(mask) if mask is not None else np.arange(self.count)
+            rows = rows[:k]
+            return rows, np.zeros(len(rows), dtype=np.float32)
+
+        scores = self.scores(query)
+        matched = scores > 0
+        if mask is not None:
+            matched &= mask
+        rows = np.flatnonzero(matched)
+        if len(rows) > k:
+            rows = rows[np.argpartition(-scores[rows], k - 1)[:k]]
+        rows = rows[np.argsort(-scores[rows], kind="stable")]
+        return rows, scores[rows]
+
+    def search(self, query: str, k: int = 50,
+               filters: Optional[List[dict]] = None) -> List[Tuple[str, float]]:
+        """Returns up to k (id, score) pairs, best first."""
+        rows, scores = self._search_rows(query, k, filters)
+        return [(str(self.ids[r]), float(s)) for r, s in zip(rows, scores)]
+
+    def search_hits(self, query: str, k: int = 50, filters: Optional[List[dict]] = None) -> dict:
+        """search() shaped like an ES search response; _source carries the stored filter fields."""
+        rows, scores = self._search_rows(query, k, filters)
+        hits = [{"_id": str(self.ids[r]), "_score": float(s), "_source": source}
+                for r, s, source in zip(rows, scores, self.filters.sources(rows))]
+        return {"hits": {"hits": hits}}
@@ -0,0 +1,109 @@
+import hashlib
+import re
+from array import array
+from typing import List, Optional
+
+from src.tools.cache import LRUCache
+
+
+def normalize_text(text: str) -> str:
+    """Lowercases and collapses whitespace so trivially different queries share a key."""
+    return re.sub(r"\s+", " ", (text or "").strip().lower())
+
+
+def pack_vector(vector: List[float]) -> bytes:
+    """Encodes a vector as compact float32 bytes (4 bytes per dimension)."""
+    return array("f", vector).tobytes()
+
+
+def unpack_vector(data: bytes) -> List[float]:
+    vec = array("f")
+    vec.frombytes(bytes(data))
+    return vec.tolist()
+
+
+class EmbeddingCache:
+    """
+    Two-tier cache for query embeddings.
+
+    L1 is an in-process LRU (per orchestrator replica), L2 is an Aerospike set
+    shared by all replicas. Both are keyed by (model name, normalized text).
+    """
+
+    def __init__(self, as_client, namespace: str, set_name: str, model_name: str,
+                 max_entries: int = 10000, ttl: float = 3600, l2_ttl: int = 86400):
+        self.as_client = as_client
+        self.namespace = namespace
+        self.set_name = set_name
+        self.model_name = model_name
+        self.l2_ttl = l2_ttl
+        self.l1 = LRUCache(max_entries=max_entries, ttl=ttl)
+        self.l2_hits = 0
+        self.l2_misses = 0
+        self.l2_errors = 0
+
+    def _key(self, text: str) -> str:
+        raw = f"{self.model_name}\x00{normalize_text(text)}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def get(self, text: str) -> Optional[List[float]]:
+        key = self._key(text)
+
+        packed = self.l1.get(key)
+        if packed is not None:
+            return unpack_vector(packed)
+
+        packed = self._l2_get(key)
+        if packed is None:
+            return None
+
+        self.l1.put(key, packed)
+        return unpack_vector(packed)
+
+    def put(self, text: str, vector: List[float]):
+        if not vector:
+            return
+        key = self._key(text)
+        packed = pack_vector(vector)
+        self.l1.put(key, packed)
+        self._l2_put(key, packed)
+
+    def _l2_get(self, key: str) -> Optional[bytes]:
+        if not self.as_client:
+            return None
+        try:
+            _, _, bins = self.as_client.get((self.namespace, self.set_name, key))
+            packed = bins.get("vec") if bins else None
+        except Exception:
+            # RecordNotFound and transport errors are both treated as a miss.
+            packed = None
+
+        if packed is None:
+            self.l2_misses += 1
+            return None
+        self.l2_hits += 1
+        return bytes(packed)
+
+    def _l2_put(self, key: str, packed: bytes):
+        if not self.as_client:
+            return
+        try:
+            self.as_client.put(
+                (self.namespace, self.set_name, key),
+                {"vec": bytearray(packed)},
+                meta={"ttl": self.l2_ttl},
+            )
+        except Exception as e:
+            self.l2_errors += 1
+            print(f"Embedding cache write error: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "model": self.model_name,
+            "l1": self.l1.stats(),
+            "l2": {
+                "hits": self.l2_hits,
+                "misses": self.l2_misses,
+                "errors": self.l2_errors,
+            },
+        }
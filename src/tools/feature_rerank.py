@@ -0,0 +1,201 @@
+import json
+import os
+import re
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# CPU-only alternative to the LLM listwise rerank: a handful of cheap
+# features per candidate, computed as arrays over the whole list, scored by
+# a linear model. Weights come from RERANK_MODEL_PATH (written by
+# scripts/train_reranker.py from click logs); DEFAULT_WEIGHTS are used
+# until a model has been trained.
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+RERANK_MODEL_PATH = os.getenv("RERANK_MODEL_PATH", os.path.join(BASE_DIR, "data", "reranker.json"))
+# When set, every served impression (query, candidate ids, the exact feature
+# matrix scored) is appended here as JSONL; join clicks on the ids and train
+# on these rows so training sees the same feature values serving does.
+RERANK_LOG_PATH = os.getenv("RERANK_LOG_PATH", "")
+
+FEATURES = [
+    "fused_score",       # fusion score, scaled by the list's best score
+    "bm25_rrank",        # 1 / BM25 rank (0 when BM25 missed the job)
+    "dense_rrank",       # 1 / kNN rank (0 when kNN missed the job)
+    "skills_overlap",    # share of query tokens found in the job's skills
+    "title_overlap",     # share of query tokens found in the job's title
+    "title_phrase",      # whole query appears in the title
+    "experience_distance",  # years outside the requested experience, capped at 10, / 10
+    "cosine",            # query/job embedding cosine (0 when unknown)
+]
+DEFAULT_WEIGHTS = {
+    "fused_score": 1.0,
+    "bm25_rrank": 0.3,
+    "dense_rrank": 0.3,
+    "skills_overlap": 0.5,
+    "title_overlap": 0.8,
+    "title_phrase": 0.4,
+    "experience_distance": -0.6,
+    "cosine": 0.5,
+}
+TOKEN_RE = re.compile(r"[a-z0-9+#]+")
+
+
+def tokens(text) -> set:
+    if isinstance(text, (list, tuple)):
+        text = " ".join(str(t) for t in text)
+    return set(TOKEN_RE.findall(str(text or "").lower()))
+
+
+def _reciprocal_ranks(candidates: Sequence[dict], key: str) -> np.ndarray:
+    ranks = np.array([c.get(key) or 0 for c in candidates], dtype=np.float64)
+    return np.divide(1.0, ranks, out=np.zeros_like(ranks), where=ranks > 0)
+
+
+def _experience_distance(candidates: Sequence[dict], experience) -> np.ndarray:
+    job_exp = np.array(
+        [_as_number(c.get("source", {}).get("experience")) for c in candidates], dtype=np.float64
+    )
+    if experience is None:
+        return np.zeros(len(candidates))
+    if isinstance(experience, dict):
+        low = float(experience.get("gte", experience.get("gt", -np.inf)))
+        high = float(experience.get("lte", experience.get("lt", np.inf)))
+    else:
+        low = high = float(experience)
+    distance = np.maximum(low - job_exp, 0) + np.maximum(job_exp - high, 0)
+    # Jobs without an experience value count as the worst match.
+    distance = np.where(np.isnan(job_exp), 10.0, distance)
+    return np.minimum(distance, 10.0) / 10.0
+
+
+def _as_number(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def features(candidates: Sequence[dict], query: Optional[dict] = None,
+             cosine_lookup: Optional[Callable[[List[str]], Optional[np.ndarray]]] = None) -> np.ndarray:
+    """
+    (n_candidates, len(FEATURES)) matrix for job_search hits.
+
+    query is query_rewrite's output (rewritten_query / experience). cosine
+    uses the kNN score when the dense leg returned the job (ES and the mmap
+    index both score (1 + cos) / 2); cosine_lookup(ids) may supply cosines
+    from stored embeddings for the rest.
+    """
+    n = len(candidates)
+    matrix = np.zeros((n, len(FEATURES)), dtype=np.float64)
+    if not n:
+        return matrix
+    query = query if isinstance(query, dict) else {"rewritten_query": query or ""}
+    query_text = str(query.get("rewritten_query") or "").lower().strip()
+    query_tokens = tokens(query_text)
+
+    scores = np.array([c.get("score") or 0.0 for c in candidates], dtype=np.float64)
+    best = scores.max()
+    matrix[:, 0] = scores / best if best > 0 else 0.0
+    matrix[:, 1] = _reciprocal_ranks(candidates, "bm25_rank")
+    matrix[:, 2] = _reciprocal_ranks(candidates, "dense_rank")
+
+    if query_tokens:
+        sources = [c.get("source", {}) for c in candidates]
+        matrix[:, 3] = [len(query_tokens & tokens(s.get("skills"))) / len(query_tokens) for s in sources]
+        matrix[:, 4] = [len(query_tokens & tokens(s.get("title"))) / len(query_tokens) for s in sources]
+        matrix[:, 5] = [query_text in str(s.get("title") or "").lower() for s in sources]
+    matrix[:, 6] = _experience_distance(candidates, query.get("experience"))
+
+    dense = np.array([c.get("dense_score") or 0.0 for c in candidates], dtype=np.float64)
+    has_dense = matrix[:, 2] > 0
+    cosine = np.where(has_dense, 2.0 * dense - 1.0, 0.0)
+    if cosine_lookup is not None and not has_dense.all():
+        missing = np.flatnonzero(~has_dense)
+        looked_up = cosine_lookup([str(candidates[i].get("id")) for i in missing])
+        if looked_up is not None:
+            cosine[missing] = np.nan_to_num(np.asarray(looked_up, dtype=np.float64))
+    matrix[:, 7] = cosine
+    return matrix
+
+
+class LinearReranker:
+    """score = features @ weights + bias (inputs standardized with the training mean/std)."""
+
+    def __init__(self, weights: Dict[str, float], bias: float = 0.0,
+                 mean: Optional[Sequence[float]] = None, std: Optional[Sequence[float]] = None):
+        self.weights = np.array([weights.get(name, 0.0) for name in FEATURES], dtype=np.float64)
+        self.bias = float(bias)
+        self.mean = np.zeros(len(FEATURES)) if mean is None else np.asarray(mean, dtype=np.float64)
+        self.std = np.ones(len(FEATURES)) if std is None else np.asarray(std, dtype=np.float64)
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> "LinearReranker":
+        """Model from path, or DEFAULT_WEIGHTS if none has been trained yet."""
+        path = path or RERANK_MODEL_PATH
+        if not os.path.exists(path):
+            return cls(DEFAULT_WEIGHTS)
+        try:
+            with open(path) as f:
+                model = json.load(f)
+            return cls(dict(zip(model["features"], model["weights"])), model.get("bias", 0.0),
+                       _aligned(model, "mean", 0.0), _aligned(model, "std", 1.0))
+        except Exception as e:
+            print(f"Failed to load reranker model from {path}, using default weights: {e}")
+            return cls(DEFAULT_WEIGHTS)
+
+    def to_dict(self) -> dict:
+        return {
+            "features": FEATURES,
+            "weights": self.weights.tolist(),
+            "bias": self.bias,
+            "mean": self.mean.tolist(),
+            "std": self.std.tolist(),
+        }
+
+    def save(self, path: Optional[str] = None):
+        path = path or RERANK_MODEL_PATH
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(tmp, path)
+
+    def score(self, matrix: np.ndarray) -> np.ndarray:
+        std = np.where(self.std > 0, self.std, 1.0)
+        return ((matrix - self.mean) / std) @ self.weights + self.bias
+
+    def order(self, matrix: np.ndarray) -> np.ndarray:
+        """Row order by model score, best first (ties keep the incoming order)."""
+        return np.argsort(-self.score(matrix), kind="stable")
+
+    def rerank(self, candidates: List[dict], query: Optional[dict] = None,
+               cosine_lookup=None) -> List[dict]:
+        """Candidates sorted by model score."""
+        if len(candidates) < 2:
+            return list(candidates)
+        order = self.order(features(candidates, query, cosine_lookup))
+        return [candidates[i] for i in order]
+
+
+def log_impression(query, candidates: Sequence[dict], matrix: np.ndarray, path: Optional[str] = None):
+    """Appends one served impression (see RERANK_LOG_PATH) for scripts/train_reranker.py."""
+    path = path or RERANK_LOG_PATH
+    if not path or not len(candidates):
+        return
+    record = {
+        "query": query,
+        "ids": [str(c.get("id")) for c in candidates],
+        "feature_names": FEATURES,
+        "features": matrix.tolist(),
+    }
+    try:
+        with open(path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+    except Exception as e:
+        print(f"Failed to log rerank impression: {e}")
+
+
+def _aligned(model: dict, key: str, default: float) -> List[float]:
+    """Per-feature values from a saved model, in FEATURES order (tolerates added features)."""
+    values = dict(zip(model["features"], model.get(key) or [default] * len(model["features"])))
+    return [values.get(name, default) for name in FEATURES]
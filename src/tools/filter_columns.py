@@ -0,0 +1,118 @@
+import os
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# Row-aligned filter columns shared by the in-process retrievers
+# (vector_index, bm25_index). Keyword fields are stored as int32 codes into
+# a vocabulary kept in the index meta, integer fields as int32 with MISSING
+# for absent values. Filters use the same clause shapes the ES query
+# builder emits, so retrievers can be handed builder.filter_clauses as-is.
+MISSING = np.iinfo(np.int32).min
+
+
+def column_file(name: str) -> str:
+    return f"field_{name}.npy"
+
+
+def replace_npy(path: str, array: np.ndarray):
+    """np.save to a temp file, then rename over `path` (readers never see a partial file)."""
+    tmp = path + ".tmp.npy"
+    np.save(tmp, array)
+    os.replace(tmp, path)
+
+
+class FilterColumnsWriter:
+    def __init__(self, keyword_fields: Sequence[str] = ("location",),
+                 integer_fields: Sequence[str] = ("experience",)):
+        self.keyword_fields = list(keyword_fields)
+        self.integer_fields = list(integer_fields)
+        self.vocab: Dict[str, Dict[str, int]] = {f: {} for f in self.keyword_fields}
+        self.columns: Dict[str, List[int]] = {f: [] for f in self.keyword_fields + self.integer_fields}
+
+    def add(self, row: Dict[str, Any]):
+        for name in self.keyword_fields:
+            value = row.get(name)
+            if value is None or value == "":
+                self.columns[name].append(-1)
+            else:
+                vocab = self.vocab[name]
+                self.columns[name].append(vocab.setdefault(str(value), len(vocab)))
+        for name in self.integer_fields:
+            value = row.get(name)
+            try:
+                self.columns[name].append(int(value))
+            except (TypeError, ValueError):
+                self.columns[name].append(MISSING)
+
+    def save(self, path: str) -> dict:
+        """Writes the columns and returns their meta entry."""
+        for name, values in self.columns.items():
+            replace_npy(os.path.join(path, column_file(name)), np.array(values, dtype=np.int32))
+        return {
+            **{name: {"type": "keyword", "values": list(self.vocab[name])}
+               for name in self.keyword_fields},
+            **{name: {"type": "integer"} for name in self.integer_fields},
+        }
+
+
+class FilterColumns:
+    """Memory-mapped filter columns with ES-style filter clause evaluation."""
+
+    def __init__(self, path: str, fields_meta: Dict[str, dict], count: int):
+        self.count = count
+        self.columns = {
+            name: np.load(os.path.join(path, column_file(name)), mmap_mode="r")
+            for name in fields_meta
+        }
+        self.vocab = {
+            name: spec["values"] for name, spec in fields_meta.items() if spec["type"] == "keyword"
+        }
+        self.codes = {
+            name: {value: code for code, value in enumerate(values)}
+            for name, values in self.vocab.items()
+        }
+
+    def sources(self, rows: Sequence[int]) -> List[Dict[str, Any]]:
+        """Stored field values per row, shaped like an ES _source (absent values omitted)."""
+        rows = np.asarray(rows, dtype=np.int64)
+        out = [{} for _ in range(len(rows))]
+        for name, column in self.columns.items():
+            values = column[rows].tolist()
+            vocab = self.vocab.get(name)
+            for source, value in zip(out, values):
+                if vocab is not None:
+                    if value >= 0:
+                        source[name] = vocab[value]
+                elif value != MISSING:
+                    source[name] = value
+        return out
+
+    def mask(self, filters: Optional[List[dict]]) -> Optional[np.ndarray]:
+        """Boolean row mask for match/term/range clauses, or None when unfiltered."""
+        mask = None
+        for clause in filters or []:
+            kind, body = next(iter(clause.items()))
+            field, condition = next(iter(body.items()))
+            if field not in self.columns:
+                raise ValueError(f"Field '{field}' is not stored in the index")
+            column = self.columns[field]
+
+            if kind in ("match", "term"):
+                value = condition.get("query", condition.get("value")) if isinstance(condition, dict) else condition
+                if field in self.codes:
+                    code = self.codes[field].get(str(value))
+                    clause_mask = column == code if code is not None else np.zeros(self.count, dtype=bool)
+                else:
+                    clause_mask = column == int(value)
+            elif kind == "range":
+                clause_mask = column != MISSING
+                bounds = {"gte": np.greater_equal, "gt": np.greater, "lte": np.less_equal, "lt": np.less}
+                for op, value in condition.items():
+                    if op in bounds:
+                        clause_mask &= bounds[op](column, value)
+            else:
+                raise ValueError(f"Unsupported filter clause '{kind}'")
+
+            mask = clause_mask if mask is None else mask & clause_mask
+        return mask
@@ -0,0 +1,142 @@
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+class RankedList:
+    """One retriever's output: ids in rank order plus their raw scores."""
+
+    def __init__(self, name: str, ids: Sequence, scores: Optional[Sequence[float]] = None):
+        self.name = name
+        self.ids = np.asarray([str(i) for i in ids], dtype=object)
+        if scores is None:
+            scores = np.zeros(len(self.ids))
+        self.scores = np.asarray([s if s is not None else np.nan for s in scores], dtype=np.float64)
+
+    @classmethod
+    def from_hits(cls, name: str, hits: List[dict]):
+        """Builds a list from Elasticsearch-style hits ({"_id", "_score", ...})."""
+        return cls(name, [h["_id"] for h in hits], [h.get("_score") for h in hits])
+
+    def __len__(self):
+        return len(self.ids)
+
+
+class FusionResult:
+    """
+    Fused ranking. Row i describes ids[i]:
+    - scores[i]: fused score
+    - ranks[i, j]: 1-based rank in retriever j (0 if the retriever did not return it)
+    - raw_scores[i, j]: retriever j's own score (NaN if absent)
+    """
+
+    def __init__(self, names: List[str], ids: np.ndarray, scores: np.ndarray,
+                 ranks: np.ndarray, raw_scores: np.ndarray):
+        self.names = names
+        self.ids = ids
+        self.scores = scores
+        self.ranks = ranks
+        self.raw_scores = raw_scores
+
+    def __len__(self):
+        return len(self.ids)
+
+    def rank_of(self, name: str) -> np.ndarray:
+        return self.ranks[:, self.names.index(name)]
+
+    def raw_score_of(self, name: str) -> np.ndarray:
+        return self.raw_scores[:, self.names.index(name)]
+
+
+def normalize_scores(scores: np.ndarray, method: str = "minmax") -> np.ndarray:
+    """Normalizes one retriever's scores; NaNs (missing scores) map to 0."""
+    out = np.zeros_like(scores)
+    present = ~np.isnan(scores)
+    if not present.any():
+        return out
+
+    values = scores[present]
+    if method == "minmax":
+        lo, hi = values.min(), values.max()
+        out[present] = (values - lo) / (hi - lo) if hi > lo else 1.0
+    elif method == "zscore":
+        std = values.std()
+        out[present] = (values - values.mean()) / std if std > 0 else 0.0
+    else:
+        raise ValueError(f"Unknown normalization: {method}")
+    return out
+
+
+def fuse(lists: List[RankedList], method: str = "rrf", weights: Optional[Dict[str, float]] = None,
+         k: int = 60, normalization: str = "minmax", top_k: Optional[int] = None) -> FusionResult:
+    """
+    Fuses N ranked lists into one ranking.
+
+    method="rrf":    score = sum_j w_j / (k + rank_j)
+    method="linear": score = sum_j w_j * normalize(raw_score_j)   (minmax or zscore)
+
+    Ids are mapped to a dense index once; all scoring is done on arrays.
+    Ties keep the order in which ids were first seen (earlier lists first).
+    """
+    names = [rl.name for rl in lists]
+    weights = weights or {}
+    w = np.array([weights.get(name, 1.0) for name in names], dtype=np.float64)
+
+    # Deduplicate within each list (keep the best rank), then concatenate.
+    per_list_ids, per_list_pos, per_list_col = [], [], []
+    for col, rl in enumerate(lists):
+        if not len(rl):
+            continue
+        _, first = np.unique(rl.ids, return_index=True)
+        first.sort()
+        per_list_ids.append(rl.ids[first])
+        per_list_pos.append(first)
+        per_list_col.append(np.full(len(first), col))
+
+    n_lists = len(lists)
+    if not per_list_ids:
+        empty = np.empty(0, dtype=object)
+        return FusionResult(names, empty, np.empty(0), np.zeros((0, n_lists), dtype=np.int64),
+                            np.empty((0, n_lists)))
+
+    all_ids = np.concatenate(per_list_ids)
+    all_pos = np.concatenate(per_list_pos)
+    all_col = np.concatenate(per_list_col)
+
+    # Dense doc index in order of first appearance.
+    uniq, first_seen, inverse = np.unique(all_ids, return_index=True, return_inverse=True)
+    appearance = np.argsort(first_seen, kind="stable")
+    remap = np.empty_like(appearance)
+    remap[appearance] = np.arange(len(appearance))
+    doc = remap[inverse]
+    ids = uniq[appearance]
+    n_docs = len(ids)
+
+    ranks = np.zeros((n_docs, n_lists), dtype=np.int64)
+    ranks[doc, all_col] = all_pos + 1
+    raw_scores = np.full((n_docs, n_lists), np.nan)
+    for col, rl in enumerate(lists):
+        mask = all_col == col
+        raw_scores[doc[mask], col] = rl.scores[all_pos[mask]]
+
+    if method == "rrf":
+        contrib = np.where(ranks > 0, 1.0 / (k + ranks), 0.0)
+    elif method == "linear":
+        contrib = np.column_stack([
+            normalize_scores(raw_scores[:, col], normalization) for col in range(n_lists)
+        ])
+    else:
+        raise ValueError(f"Unknown fusion method: {method}")
+    scores = contrib @ w
+
+    # Top-k selection: partition first, then order only the survivors.
+    # Ties at the cut-off are resolved by first appearance, like the full sort.
+    candidates = np.arange(n_docs)
+    if top_k is not None and top_k < n_docs:
+        cutoff = np.partition(scores, n_docs - top_k)[n_docs - top_k]
+        above = np.flatnonzero(scores > cutoff)
+        tied = np.flatnonzero(scores == cutoff)[: top_k - len(above)]
+        candidates = np.concatenate([above, tied])
+    order = candidates[np.lexsort((candidates, -scores[candidates]))]
+
+    return FusionResult(names, ids[order], scores[order], ranks[order], raw_scores[order])
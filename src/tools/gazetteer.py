@@ -0,0 +1,100 @@
+import json
+import os
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+# Locations present in the jobs index, in their indexed spelling (the ES
+# location filter is an exact keyword match, so extracted values must use it).
+# index_jobs.py writes the live values to LOCATIONS_PATH after every full
+# load; KNOWN_LOCATIONS is the fallback when that file is missing.
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+LOCATIONS_PATH = os.getenv("LOCATIONS_PATH", os.path.join(BASE_DIR, "data", "locations.json"))
+KNOWN_LOCATIONS = ["Bangalore", "Chennai", "Gurgaon", "Hyderabad", "Mumbai", "Pune", "Remote"]
+
+# Common alternative names -> indexed value
+LOCATION_ALIASES = {
+    "bengaluru": "Bangalore",
+    "blr": "Bangalore",
+    "gurugram": "Gurgaon",
+    "ggn": "Gurgaon",
+    "hyd": "Hyderabad",
+    "bombay": "Mumbai",
+    "madras": "Chennai",
+    "wfh": "Remote",
+    "work from home": "Remote",
+    "remotely": "Remote",
+}
+
+
+class LocationMatch(NamedTuple):
+    location: str  # indexed spelling
+    start: int
+    end: int
+
+
+class Gazetteer:
+    """Whole-word, case-insensitive lookup of known locations and their aliases."""
+
+    def __init__(self, locations: Iterable[str] = KNOWN_LOCATIONS,
+                 aliases: Optional[Dict[str, str]] = None):
+        self.names = {loc.lower(): loc for loc in locations if loc}
+        for alias, loc in (LOCATION_ALIASES if aliases is None else aliases).items():
+            if loc.lower() in self.names:
+                self.names.setdefault(alias.lower(), self.names[loc.lower()])
+        # Longest names first so "work from home" wins over shorter overlaps.
+        alternation = "|".join(re.escape(n) for n in sorted(self.names, key=len, reverse=True))
+        self.pattern = re.compile(rf"\b({alternation})\b", re.IGNORECASE) if self.names else None
+
+    @property
+    def locations(self):
+        return sorted(set(self.names.values()))
+
+    def find(self, text: str) -> Optional[LocationMatch]:
+        """First location mentioned in text, or None."""
+        if not self.pattern or not text:
+            return None
+        match = self.pattern.search(text)
+        if not match:
+            return None
+        return LocationMatch(self.names[match.group(1).lower()], match.start(), match.end())
+
+    def find_all(self, text: str) -> List[LocationMatch]:
+        """Every location mention in text, in order."""
+        if not self.pattern or not text:
+            return []
+        return [LocationMatch(self.names[m.group(1).lower()], m.start(), m.end())
+                for m in self.pattern.finditer(text)]
+
+    def canonical(self, location: Optional[str]) -> Optional[str]:
+        """Maps any known spelling ('pune', 'Bengaluru') to the indexed value; unknown -> None."""
+        if not location:
+            return None
+        return self.names.get(" ".join(str(location).split()).lower())
+
+
+def load_locations(path: Optional[str] = None) -> List[str]:
+    """Indexed location values from path, or KNOWN_LOCATIONS if it can't be read."""
+    path = path or LOCATIONS_PATH
+    if not os.path.exists(path):
+        return list(KNOWN_LOCATIONS)
+    try:
+        with open(path) as f:
+            locations = [str(loc) for loc in json.load(f) if loc]
+        return locations or list(KNOWN_LOCATIONS)
+    except Exception as e:
+        print(f"Failed to load locations from {path}, using defaults: {e}")
+        return list(KNOWN_LOCATIONS)
+
+
+def save_locations(locations: Iterable[str], path: Optional[str] = None) -> List[str]:
+    path = path or LOCATIONS_PATH
+    values = sorted({" ".join(str(loc).split()) for loc in locations if loc and str(loc).strip()})
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(values, f)
+    os.replace(tmp, path)
+    return values
+
+
+GAZETTEER = Gazetteer(load_locations())
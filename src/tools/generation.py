@@ -0,0 +1,39 @@
+import threading
+import time
+
+# The indexers bump this counter after every run that writes job data;
+# readers use it to invalidate anything cached from the previous data.
+META_SET = "meta"
+GENERATION_KEY = "jobs_generation"
+GENERATION_BIN = "generation"
+
+
+class GenerationWatcher:
+    """Reads the index generation stamp from Aerospike, at most once per check_interval."""
+
+    def __init__(self, as_client, namespace: str, set_name: str = META_SET,
+                 key: str = GENERATION_KEY, check_interval: float = 5.0):
+        self.as_client = as_client
+        self.key = (namespace, set_name, key)
+        self.check_interval = check_interval
+        self._generation = 0
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    def current(self) -> int:
+        now = time.monotonic()
+        with self._lock:
+            if self._checked_at is not None and now - self._checked_at < self.check_interval:
+                return self._generation
+            self._checked_at = now
+
+        if self.as_client:
+            try:
+                _, _, bins = self.as_client.get(self.key)
+                generation = int((bins or {}).get(GENERATION_BIN, 0))
+                with self._lock:
+                    self._generation = generation
+            except Exception:
+                # Missing stamp (never indexed) or transient error: keep the last value.
+                pass
+        return self._generation
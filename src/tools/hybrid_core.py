@@ -2,7 +2,19 @@ from elasticsearch import Elasticsearch
 import requests
 import aerospike
 import os
+import math
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 from src.tools.query_builder import ElasticsearchQueryBuilder
+from src.tools.embedding_cache import EmbeddingCache
+from src.tools.fusion import RankedList, fuse
+from src.tools.cache import LRUCache
+from src.tools.generation import GenerationWatcher
+from src.tools.vector_index import VectorIndex
+from src.tools.bm25_index import BM25Index
+from src.tools.routing import LOCATION_ROUTING, normalize_location
 
 # 1. Connect to ES
 ES = Elasticsearch("http://elasticsearch:9200")
@@ -21,44 +33,213 @@ except Exception as e:
     AS_CLIENT = None
 
 EMBED_API = "http://embeddings:8002/encode"
+EMBED_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
 AS_NAMESPACE = "test"
 AS_SET = "jobs"
 
-def embed(text: str):
-    response = requests.post(EMBED_API, json={"text": text})
-    return response.json()["embedding"]
+# Query embedding cache: in-process LRU in front of a shared Aerospike set.
+EMBED_CACHE = EmbeddingCache(
+    AS_CLIENT,
+    AS_NAMESPACE,
+    os.getenv("EMBED_CACHE_SET", "query_embeddings"),
+    model_name=EMBED_MODEL,
+    max_entries=int(os.getenv("EMBED_CACHE_SIZE", 10000)),
+    ttl=float(os.getenv("EMBED_CACHE_TTL", 3600)),
+    l2_ttl=int(os.getenv("EMBED_CACHE_L2_TTL", 86400)),
+)
 
-def get_aerospike_details(job_ids):
+# Job record cache (L1 in front of Aerospike). Records only change when an
+# indexer runs, so the cache is dropped whenever the index generation moves.
+def record_size(bins) -> int:
+    return sys.getsizeof(bins) + sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in bins.items())
+
+RECORD_CACHE = LRUCache(
+    max_entries=int(os.getenv("RECORD_CACHE_SIZE", 5000)),
+    ttl=float(os.getenv("RECORD_CACHE_TTL", 600)),
+    sizeof=record_size,
+)
+GENERATION = GenerationWatcher(
+    AS_CLIENT,
+    AS_NAMESPACE,
+    check_interval=float(os.getenv("GENERATION_CHECK_INTERVAL", 5)),
+)
+_record_cache_generation = None
+_record_cache_lock = threading.Lock()
+
+# Retrieval legs (embedding + kNN, BM25) run concurrently on this pool.
+# Each leg has its own deadline; a late dense leg degrades to BM25-only results.
+SEARCH_POOL = ThreadPoolExecutor(
+    max_workers=int(os.getenv("SEARCH_POOL_SIZE", 16)),
+    thread_name_prefix="hybrid-search",
+)
+BM25_TIMEOUT = float(os.getenv("BM25_TIMEOUT", 2.0))
+DENSE_TIMEOUT = float(os.getenv("DENSE_TIMEOUT", 1.5))
+
+# Retrieval mode:
+# - "parallel": separate BM25 and kNN requests, fanned out concurrently.
+# - "msearch": one _msearch round-trip carrying both requests (issued once
+#   the query vector is available, so it pairs well with a warm embedding cache).
+RETRIEVAL_MODE = os.getenv("HYBRID_RETRIEVAL_MODE", "parallel")
+
+# kNN leg: k results from num_candidates HNSW candidates per shard
+# (higher num_candidates = better recall, more latency; see scripts/knn_sweep.py).
+KNN_K = int(os.getenv("KNN_K", 50))
+KNN_NUM_CANDIDATES = int(os.getenv("KNN_NUM_CANDIDATES", 100))
+
+# Dense retriever: "es" (Elasticsearch kNN) or "mmap" (in-process, memory-mapped
+# matrix exported by index_jobs.py --export-vectors). If the mmap index can't
+# be loaded, the dense leg stays on Elasticsearch.
+DENSE_RETRIEVER = os.getenv("DENSE_RETRIEVER", "es")
+VECTOR_INDEX = None
+if DENSE_RETRIEVER == "mmap":
+    try:
+        VECTOR_INDEX = VectorIndex(
+            os.getenv("VECTOR_INDEX_PATH", "data/vector_index"),
+            nprobe=int(os.getenv("VECTOR_INDEX_NPROBE", 8)),
+        )
+    except Exception as e:
+        print(f"Failed to load vector index, using Elasticsearch kNN: {e}")
+
+# Lexical retriever: "es" or "local" (in-process BM25 index exported by
+# index_jobs.py --export-bm25). Same fallback to Elasticsearch as above.
+LEXICAL_RETRIEVER = os.getenv("LEXICAL_RETRIEVER", "es")
+BM25_INDEX = None
+if LEXICAL_RETRIEVER == "local":
+    try:
+        BM25_INDEX = BM25Index(os.getenv("BM25_INDEX_PATH", "data/bm25_index"))
+    except Exception as e:
+        print(f"Failed to load BM25 index, using Elasticsearch BM25: {e}")
+
+# Hydration: which Aerospike bins to read for returned hits, and whether
+# Aerospike can be skipped when ES _source already carries them.
+HYDRATE_BINS = [b.strip() for b in os.getenv(
+    "HYDRATE_BINS", "job_id,title,description,location,experience,skills"
+).split(",") if b.strip()]
+HYDRATE_MODE = os.getenv("HYDRATE_MODE", "aerospike")
+
+# Rank fusion: "rrf" (weighted reciprocal rank) or "linear" (normalized scores).
+FUSION_METHOD = os.getenv("FUSION_METHOD", "rrf")
+FUSION_K = int(os.getenv("FUSION_K", 60))
+FUSION_NORMALIZATION = os.getenv("FUSION_NORMALIZATION", "minmax")
+# e.g. "bm25=1.0,dense=1.5"
+FUSION_WEIGHTS = {
+    name.strip(): float(weight)
+    for name, weight in (
+        pair.split("=") for pair in os.getenv("FUSION_WEIGHTS", "").split(",") if "=" in pair
+    )
+}
+
+def embed(text: str, timeout: float = None):
+    """
+    Query vector (cached). timeout bounds the embeddings request: an abandoned
+    dense leg can't be cancelled, so without it a hung service would keep
+    SEARCH_POOL workers busy and starve the BM25 legs too.
+    """
+    cached = EMBED_CACHE.get(text)
+    if cached is not None:
+        return cached
+
+    timeout = DENSE_TIMEOUT if timeout is None else timeout
+    response = requests.post(EMBED_API, json={"text": text}, timeout=max(timeout, 0.05))
+    vector = response.json()["embedding"]
+    EMBED_CACHE.put(text, vector)
+    return vector
+
+def check_record_generation():
+    """Drops cached job records if an indexer run has bumped the generation."""
+    global _record_cache_generation
+    generation = GENERATION.current()
+    with _record_cache_lock:
+        if generation != _record_cache_generation:
+            RECORD_CACHE.clear()
+            _record_cache_generation = generation
+
+def record_cache_stats():
+    stats = RECORD_CACHE.stats()
+    stats["generation"] = _record_cache_generation
+    return stats
+
+def get_aerospike_details(job_ids, bins=None):
+    """
+    Batch-reads job records; `bins` projects the read to those bins only.
+    Records are served from RECORD_CACHE when possible and only the misses
+    are fetched from Aerospike, in one batch.
+    """
     if not AS_CLIENT or not job_ids:
         return {}
+
+    check_record_generation()
+    # job_id is needed to map records back to hits
+    projection = sorted(set(bins) | {"job_id"}) if bins else None
+    projection_key = tuple(projection) if projection else None
+
+    results = {}
+    missing = []
+    for jid in job_ids:
+        cached = RECORD_CACHE.get((str(jid), projection_key))
+        if cached is None:
+            missing.append(str(jid))
+        else:
+            results[str(jid)] = cached
+    if not missing:
+        return results
     
-    keys = [(AS_NAMESPACE, AS_SET, str(jid)) for jid in job_ids]
+    keys = [(AS_NAMESPACE, AS_SET, jid) for jid in missing]
     
-    # get_many returns: ((key_tuple), meta, bins)
+    # get_many / select_many return: ((key_tuple), meta, bins)
     try:
-        records = AS_CLIENT.get_many(keys)
-        results = {}
+        if projection:
+            records = AS_CLIENT.select_many(keys, projection)
+        else:
+            records = AS_CLIENT.get_many(keys)
         for rec in records:
             # rec is ((ns, set, digest, pk), meta, bins)
             # If record not found, bins is None
-            key_tuple, meta, bins = rec
-            if bins:
+            key_tuple, meta, rec_bins = rec
+            if rec_bins:
                 # key_tuple[3] might be the PK if stored, or we rely on order.
                 # get_many usually preserves order or we can map by PK if we have it?
                 # Actually key_tuple[3] is the user_key if policy.send_key is true.
                 # Let's map by job_id inside bins if available, or just trust the input list?
                 # Safer: bins['job_id']
-                if "job_id" in bins:
-                    results[bins["job_id"]] = bins
+                if "job_id" in rec_bins:
+                    results[rec_bins["job_id"]] = rec_bins
+                    RECORD_CACHE.put((str(rec_bins["job_id"]), projection_key), rec_bins)
         return results
     except Exception as e:
         print(f"Aerospike batch fetch error: {e}")
-        return {}
+        return results
 
-def hybrid_search(query: str, location: str = None, experience: int = None):
-    vector = embed(query)
-    
-    # Initialize Builder
+def hydrate(hits, bins=None, mode: str = None):
+    """
+    Fills hit["source"] with Aerospike job details for the given (already
+    ranked and truncated) hits.
+
+    mode="aerospike": always read the projected bins from Aerospike.
+    mode="auto":      skip Aerospike when the ES _source already has every bin.
+    mode="none":      keep the ES _source as-is.
+    """
+    bins = HYDRATE_BINS if bins is None else bins
+    mode = mode or HYDRATE_MODE
+    if mode == "none" or not hits:
+        return hits
+
+    missing = hits
+    if mode == "auto":
+        missing = [h for h in hits if not all(b in h["source"] for b in bins)]
+        if not missing:
+            return hits
+
+    details_map = get_aerospike_details([h["id"] for h in missing], bins=bins)
+    for hit in missing:
+        details = details_map.get(hit["id"])
+        if details:
+            # Source Priority: Aerospike > Elasticsearch
+            hit["source"] = {**hit["source"], **details}
+    return hits
+
+def build_search_query(query: str, location: str = None, experience=None):
+    """Builds the shared BM25/filter part of the hybrid query (kNN is set later)."""
     builder = ElasticsearchQueryBuilder()
     builder.set_source_excludes(["embedding"])
     
@@ -68,6 +249,9 @@ def hybrid_search(query: str, location: str = None, experience: int = None):
     
     # 2. Filters
     builder.add_filter("location", location)
+    if LOCATION_ROUTING and normalize_location(location):
+        # Jobs are routed by location: only that shard can hold matches.
+        builder.set_routing(normalize_location(location))
     
     if experience is not None:
         if isinstance(experience, dict):
@@ -80,69 +264,176 @@ def hybrid_search(query: str, location: str = None, experience: int = None):
              range_dict = {"gte": min_exp, "lte": max_exp}
              builder.add_range_filter("experience", range_dict)
 
-    # 3. KNN Config
-    builder.set_knn(vector, k=50, num_candidates=100)
+    return builder
 
-    # Execute Searches
+def search_bm25_local(builder, query: str):
+    """In-process BM25 leg; falls back to ES if the index can't serve the filters."""
     try:
-        bm25 = ES.search(
+        return BM25_INDEX.search_hits(query, k=50, filters=builder.filter_clauses)
+    except Exception as e:
+        print(f"BM25 index search error, falling back to Elasticsearch: {e}")
+        return search_bm25(builder.build_bm25_query(), builder.routing)
+
+def search_bm25(body, routing=None, timeout: float = None):
+    """BM25 leg; the ES request gives up with the leg so it doesn't hold a SEARCH_POOL worker."""
+    timeout = BM25_TIMEOUT if timeout is None else timeout
+    try:
+        return ES.options(request_timeout=max(timeout, 0.1)).search(
             index="jobs",
             size=50,
-            **builder.build_bm25_query()
+            routing=routing,
+            **body
         )
     except Exception as e:
         print(f"BM25 Search Error: {e}")
-        bm25 = {"hits": {"hits": []}}
+        return {"hits": {"hits": []}}
+
+def search_dense(builder, query: str, timeout: float = None):
+    """Embeds the query and sends the kNN request as soon as the vector is available."""
+    start = time.monotonic()
+    timeout = DENSE_TIMEOUT if timeout is None else timeout
+    vector = embed(query, timeout=timeout)
+    if VECTOR_INDEX is not None:
+        try:
+            return VECTOR_INDEX.search_hits(vector, k=KNN_K, filters=builder.filter_clauses)
+        except Exception as e:
+            print(f"Vector index search error, falling back to Elasticsearch: {e}")
 
+    builder.set_knn(vector, k=KNN_K, num_candidates=KNN_NUM_CANDIDATES)
+    remaining = timeout - (time.monotonic() - start)
     try:
-        dense = ES.search(
+        return ES.options(request_timeout=max(remaining, 0.1)).search(
             index="jobs",
+            routing=builder.routing,
             **builder.build_knn_query()
         )
     except Exception as e:
         print(f"Dense Search Error: {e}")
-        dense = {"hits": {"hits": []}}
+        return {"hits": {"hits": []}}
 
-    # RRF (Reciprocal Rank Fusion)
-    # score = 1 / (k + rank)
-    k = 60
-    scores = {}
-    es_source_map = {}
+def search_msearch(builder, query: str, bm25_timeout: float = None, dense_timeout: float = None):
+    """
+    Embeds the query, then runs BM25 and kNN in a single _msearch request.
+
+    If embedding fails the request carries only the BM25 search. One request
+    can't have per-leg deadlines, so it gets whatever is left of the larger
+    leg budget as its request timeout.
+    """
+    start = time.monotonic()
+    bm25_timeout = BM25_TIMEOUT if bm25_timeout is None else bm25_timeout
+    dense_timeout = DENSE_TIMEOUT if dense_timeout is None else dense_timeout
+    try:
+        vector = embed(query, timeout=dense_timeout)
+        builder.set_knn(vector, k=KNN_K, num_candidates=KNN_NUM_CANDIDATES)
+    except Exception as e:
+        print(f"Embedding Error, running BM25 only: {e}")
 
-    def add_score(hits, rank_type):
-        for i, hit in enumerate(hits):
-            jid = hit["_id"]
-            if jid not in scores:
-                scores[jid] = 0
-                es_source_map[jid] = hit["_source"]
-            
-            # 1 / (k + rank), rank is 1-based usually, or 0-based. 
-            # using i+1 for 1-based rank
-            scores[jid] += 1 / (k + i + 1)
+    empty = {"hits": {"hits": []}}
+    remaining = max(bm25_timeout, dense_timeout) - (time.monotonic() - start)
+    try:
+        resp = ES.options(request_timeout=max(remaining, 0.1)).msearch(
+            searches=builder.build_msearch_body("jobs", bm25_size=50)
+        )
+    except Exception as e:
+        print(f"Msearch Error: {e}")
+        return empty, empty
+
+    legs = []
+    for name, leg in zip(("BM25", "Dense"), resp["responses"]):
+        if "error" in leg:
+            print(f"{name} Search Error: {leg['error']}")
+            leg = empty
+        legs.append(leg)
+    while len(legs) < 2:
+        legs.append(empty)
+    return legs[0], legs[1]
+
+def wait_leg(future, deadline: float, name: str):
+    """Waits for a retrieval leg until its deadline; a late leg contributes no hits."""
+    try:
+        return future.result(timeout=max(0.0, deadline - time.monotonic()))
+    except FutureTimeout:
+        print(f"{name} leg timed out, continuing without it.")
+    except Exception as e:
+        print(f"{name} leg failed: {e}")
+    return {"hits": {"hits": []}}
 
-    add_score(bm25["hits"]["hits"], "bm25")
-    add_score(dense["hits"]["hits"], "dense")
+def hybrid_search(query: str, location: str = None, experience: int = None,
+                  bm25_timeout: float = None, dense_timeout: float = None,
+                  mode: str = None, hydrate_results: bool = True):
+    """
+    Runs hybrid retrieval and returns fused hits sorted by fused score.
 
-    # Fetch Details from Aerospike (Preferred Source)
-    all_ids = list(scores.keys())
-    details_map = get_aerospike_details(all_ids)
+    With hydrate_results=False the hits carry only the ES _source; callers
+    that truncate the list should hydrate() just the hits they return.
+    """
+    builder = build_search_query(query, location, experience)
+    mode = mode or RETRIEVAL_MODE
 
+    # With an in-process retriever at most one leg goes to ES, so there is
+    # nothing for _msearch to combine.
+    if mode == "msearch" and VECTOR_INDEX is None and BM25_INDEX is None:
+        bm25, dense = search_msearch(builder, query, bm25_timeout, dense_timeout)
+    else:
+        bm25, dense = search_parallel(builder, query, bm25_timeout, dense_timeout)
+
+    results = fuse_results({"bm25": bm25, "dense": dense})
+    if hydrate_results:
+        hydrate(results)
+    return results
+
+def search_parallel(builder, query: str, bm25_timeout: float = None, dense_timeout: float = None):
+    """Runs the BM25 leg and the embedding + kNN leg concurrently."""
+    # Build the BM25 body before the dense leg mutates the builder with the vector.
+    bm25_body = builder.build_bm25_query()
+
+    # Execute Searches concurrently: BM25 does not need the vector, so it
+    # starts alongside the embedding call instead of after it.
+    start = time.monotonic()
+    bm25_timeout = BM25_TIMEOUT if bm25_timeout is None else bm25_timeout
+    dense_timeout = DENSE_TIMEOUT if dense_timeout is None else dense_timeout
+    dense_future = SEARCH_POOL.submit(search_dense, builder, query, dense_timeout)
+
+    if BM25_INDEX is not None:
+        # Sub-millisecond in-process lookup: run it inline while the dense leg is in flight.
+        bm25 = search_bm25_local(builder, query)
+    else:
+        bm25_future = SEARCH_POOL.submit(search_bm25, bm25_body, builder.routing, bm25_timeout)
+        bm25 = wait_leg(bm25_future, start + bm25_timeout, "BM25")
+    dense = wait_leg(dense_future, start + dense_timeout, "Dense")
+
+    return bm25, dense
+
+def fuse_results(legs):
+    """Fuses retriever responses ({name: ES response}) into one ranked list."""
+    lists = [RankedList.from_hits(name, resp["hits"]["hits"]) for name, resp in legs.items()]
+    fused = fuse(
+        lists,
+        method=FUSION_METHOD,
+        weights=FUSION_WEIGHTS,
+        k=FUSION_K,
+        normalization=FUSION_NORMALIZATION,
+    )
+
+    # First retriever to return an id provides its ES source.
+    es_source_map = {}
+    for resp in reversed(list(legs.values())):
+        es_source_map.update({hit["_id"]: hit["_source"] for hit in resp["hits"]["hits"]})
+
+    all_ids = fused.ids.tolist()
+
+    # Per-retriever raw scores / 1-based ranks (None when a retriever missed the id)
+    raw = {name: fused.raw_score_of(name).tolist() for name in fused.names}
+    ranks = {name: fused.rank_of(name).tolist() for name in fused.names}
+
+    # Already sorted by fused score descending. In-process retrievers only
+    # carry the stored filter fields; hydrate() fills in the rest.
     final_results = []
-    for jid, score in scores.items():
-        # Source Priority: Aerospike > Elasticsearch
-        source = details_map.get(jid) or es_source_map.get(jid)
-        
-        if source:
-            final_results.append({
-                "id": jid,
-                "source": source,
-                "score": score,
-                # Keep raw scores for debug if needed, but RRF is the main one now
-                "bm25_score": 0, # Not tracking individual raw scores anymore for simplicity
-                "dense_score": 0
-            })
-    
-    # Sort by RRF score descending
-    final_results.sort(key=lambda x: x["score"], reverse=True)
-    
+    for i, (jid, score) in enumerate(zip(all_ids, fused.scores.tolist())):
+        hit = {"id": jid, "source": es_source_map.get(jid) or {}, "score": score}
+        for name in fused.names:
+            hit[f"{name}_score"] = 0.0 if math.isnan(raw[name][i]) else raw[name][i]
+            hit[f"{name}_rank"] = ranks[name][i] or None
+        final_results.append(hit)
+
     return final_results
@@ -1,4 +1,20 @@
-from src.tools.hybrid_core import hybrid_search
+import os
+from src.tools.hybrid_core import hybrid_search, hydrate, AS_CLIENT, AS_NAMESPACE, GENERATION
+from src.tools.result_cache import ResultCache, canonical_search_key
+
+# Ranked results per canonical (keywords, location, experience), scoped to
+# the index generation. SEARCH_CACHE_SHARED=1 shares entries via Aerospike.
+RESULT_CACHE = ResultCache(
+    as_client=AS_CLIENT if os.getenv("SEARCH_CACHE_SHARED", "0") == "1" else None,
+    namespace=AS_NAMESPACE,
+    set_name=os.getenv("SEARCH_CACHE_SET", "search_results"),
+    max_entries=int(os.getenv("SEARCH_CACHE_SIZE", 2000)),
+    ttl=float(os.getenv("SEARCH_CACHE_TTL", 300)),
+)
+
+def copy_hits(hits):
+    """Per-hit copies with their own source dict (hydrate replaces hit["source"])."""
+    return [dict(hit, source=dict(hit.get("source") or {})) for hit in hits]
 
 def run(query_obj):
     # Support both string and dictionary input
@@ -22,7 +38,18 @@ def run(query_obj):
     if not query and not loc and exp is None:
          return {"jobs": []}
 
-    candidate_list = hybrid_search(query, location=loc, experience=exp)
+    cache_key = canonical_search_key(query, loc, exp)
+    generation = GENERATION.current()
+    cached = RESULT_CACHE.get(cache_key, generation)
+    if cached is not None:
+        # Entries hold the full pre-hydration source, so a hit hydrates exactly
+        # like the miss that stored it and rerank sees the same fields.
+        top = copy_hits(cached)
+        hydrate(top)
+        return {"jobs": top}
+
+    # Hydration is deferred until after ranking so only returned jobs are read.
+    candidate_list = hybrid_search(query, location=loc, experience=exp, hydrate_results=False)
 
     # Rank by Experience (Ascending) then by RRF Score (Descending)
     # We use valid experience values first. Missing experience maps to infinity (end of list).
@@ -33,4 +60,7 @@ def run(query_obj):
             -x["score"]
         )
     )
-    return {"jobs": ranked[:20]}
+    top = ranked[:20]
+    RESULT_CACHE.put(cache_key, generation, copy_hits(top))
+    hydrate(top)
+    return {"jobs": top}
@@ -7,6 +7,7 @@ class ElasticsearchQueryBuilder:
         self.should_clauses = []
         self.knn_config = {}
         self._source_excludes = []
+        self.routing = None
         
     def add_text_search(self, text: str, fields: List[str], boost: float = 1.0):
         """Adds a multi_match query for full-text search."""
@@ -79,6 +80,11 @@ class ElasticsearchQueryBuilder:
         }
         return self
 
+    def set_routing(self, routing: Optional[str]):
+        """Limits the searches to the shard(s) holding this routing value."""
+        self.routing = routing
+        return self
+
     def set_source_excludes(self, excludes: List[str]):
         self._source_excludes = excludes
         return self
@@ -125,3 +131,24 @@ class ElasticsearchQueryBuilder:
             body["_source"] = {"excludes": self._source_excludes}
             
         return body
+
+    def build_msearch_body(self, index: str, bm25_size: int = 50) -> List[Dict[str, Any]]:
+        """
+        Builds an _msearch payload carrying both the BM25 and the KNN search,
+        so hybrid retrieval needs a single round-trip to Elasticsearch.
+        Responses come back in the same order: [bm25, knn].
+        """
+        header = {"index": index}
+        if self.routing is not None:
+            header["routing"] = self.routing
+
+        bm25_body = self.build_bm25_query()
+        bm25_body["size"] = bm25_size
+
+        searches = [header, bm25_body]
+
+        knn_body = self.build_knn_query()
+        if knn_body:
+            searches.extend([dict(header), knn_body])
+
+        return searches
@@ -1,9 +1,23 @@
 import os
+import re
+import threading
+import time
+from typing import Optional, Tuple
+
 import ollama
 
+from src.tools.gazetteer import GAZETTEER
+from src.tools.vocabulary import JOB_WORDS, QUALIFIER_WORDS, ROLE_WORDS, SKILL_WORDS
+
 OLLAMA_HOST = os.getenv("OLLAMA_HOST", "http://host.docker.internal:11434")
 client = ollama.Client(host=OLLAMA_HOST)
 
+# Rule-based extraction (gazetteer + experience patterns) answers most
+# queries locally; the LLM is only asked when its confidence is low.
+REWRITE_RULES_ENABLED = os.getenv("REWRITE_RULES_ENABLED", "1") == "1"
+REWRITE_MIN_CONFIDENCE = float(os.getenv("REWRITE_MIN_CONFIDENCE", 0.6))
+REWRITE_MAX_KEYWORDS = int(os.getenv("REWRITE_MAX_KEYWORDS", 6))
+
 import json
 
 PROMPT = """
@@ -26,7 +40,167 @@ Input: "frontend dev 3-5 years exp in pune"
 Output: {"keywords": "frontend developer", "location": "pune", "experience": "3-5"}
 """
 
-def run(text: str):
+def parse_experience(exp):
+    """5 / "5" -> 5, "3-5" / "3 to 5" -> {"gte": 3, "lte": 5}, "5+" -> {"gte": 5}; unparseable -> None."""
+    if exp is None or isinstance(exp, bool):
+        return None
+    if isinstance(exp, (int, float)):
+        return int(exp)
+    if isinstance(exp, dict):
+        return exp
+    if not isinstance(exp, str):
+        return None
+
+    value = exp.strip().lower()
+    parts = []
+    if "-" in value:
+        parts = value.split("-")
+    elif "to" in value:
+        parts = value.split("to")
+    try:
+        if len(parts) == 2:
+            return {"gte": int(parts[0].strip()), "lte": int(parts[1].strip())}
+        if value.endswith("+"):
+            return {"gte": int(value[:-1].strip())}
+        return int(value)
+    except ValueError:
+        return None
+
+
+def normalize(data: dict, text: str) -> dict:
+    """Extracted fields (LLM or planner params) -> the dict job_search expects."""
+    return {
+        "rewritten_query": data.get("keywords", text),
+        "location": GAZETTEER.canonical(data.get("location")) or data.get("location"),
+        "experience": parse_experience(data.get("experience")),
+    }
+
+
+YEARS = r"(?:years?|yrs?|yoe)"
+EXPERIENCE_WORDS = r"(?:\s*(?:of\s+)?(?:exp|experience)\b)?"
+# Tried in order; the first match wins and is cut out of the keywords.
+EXPERIENCE_PATTERNS = [
+    (re.compile(rf"\b(\d{{1,2}})\s*(?:-|to)\s*(\d{{1,2}})\s*\+?\s*{YEARS}\b{EXPERIENCE_WORDS}", re.IGNORECASE),
+     lambda m: {"gte": int(m.group(1)), "lte": int(m.group(2))}),
+    (re.compile(rf"\b(?:under|below|less\s+than|fewer\s+than)\s+(\d{{1,2}})\s*{YEARS}\b{EXPERIENCE_WORDS}", re.IGNORECASE),
+     lambda m: {"lt": int(m.group(1))}),
+    (re.compile(rf"\b(?:up\s*to|max(?:imum)?|at\s+most|not\s+more\s+than)\s+(\d{{1,2}})\s*{YEARS}\b{EXPERIENCE_WORDS}", re.IGNORECASE),
+     lambda m: {"lte": int(m.group(1))}),
+    (re.compile(rf"\b(?:at\s+least|min(?:imum)?|over|more\s+than)\s+(\d{{1,2}})\s*\+?\s*{YEARS}\b{EXPERIENCE_WORDS}", re.IGNORECASE),
+     lambda m: {"gte": int(m.group(1))}),
+    (re.compile(rf"\b(\d{{1,2}})\s*\+\s*(?:{YEARS}\b{EXPERIENCE_WORDS}|(?:exp|experience)\b)", re.IGNORECASE),
+     lambda m: {"gte": int(m.group(1))}),
+    (re.compile(rf"\b(\d{{1,2}})\s*{YEARS}\b{EXPERIENCE_WORDS}", re.IGNORECASE),
+     lambda m: int(m.group(1))),
+    (re.compile(r"\b(?:freshers?|entry[- ]level|no\s+experience)\b", re.IGNORECASE),
+     lambda m: {"gte": 0, "lte": 1}),
+]
+STOP_WORDS = {
+    "a", "an", "the", "in", "at", "for", "with", "of", "near", "around", "based", "from", "and",
+    "or", "i", "me", "my", "am", "show", "find", "get", "looking", "search", "need", "want",
+    "any", "some", "please", "located", "location", "city", "exp", "experience", "experienced",
+}
+KEYWORD_RE = re.compile(r"[a-z0-9+#][a-z0-9+#.\-]*")
+# Negation/exclusion right before (or after) a location or experience match
+# means the filter would be inverted; such queries go to the LLM.
+NEGATION_BEFORE_RE = re.compile(
+    r"\b(?:not|no|outside|except|excluding|exclude|other\s+than|besides|apart\s+from)\s+(?:\w+\s+){0,2}$",
+    re.IGNORECASE,
+)
+NEGATION_AFTER_RE = re.compile(r"^\s*(?:not|excluded|excepted)\b", re.IGNORECASE)
+
+
+def _negated(text: str, start: int, end: int) -> bool:
+    return bool(NEGATION_BEFORE_RE.search(text[:start]) or NEGATION_AFTER_RE.search(text[end:]))
+
+
+def extract(text: str) -> Tuple[dict, float]:
+    """Local extraction: (rewrite dict, confidence in [0, 1])."""
+    text = text or ""
+    spans = []
+
+    locations = GAZETTEER.find_all(text)
+    spans += [(m.start, m.end) for m in locations]
+
+    experience = None
+    for pattern, convert in EXPERIENCE_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            experience = convert(match)
+            spans.append(match.span())
+            break
+
+    remaining = text
+    for start, end in sorted(spans, reverse=True):
+        remaining = remaining[:start] + " " + remaining[end:]
+    tokens = [t.rstrip(".-") for t in KEYWORD_RE.findall(remaining.lower())]
+    keywords = [t for t in tokens if t and t not in STOP_WORDS and t not in JOB_WORDS]
+
+    result = {
+        "rewritten_query": " ".join(keywords),
+        "location": locations[0].location if locations else None,
+        "experience": experience,
+    }
+
+    if not keywords:
+        confidence = 0.8 if (locations or experience is not None) else 0.0
+    else:
+        known = sum(t in ROLE_WORDS or t in SKILL_WORDS for t in keywords)
+        confidence = 0.5 + 0.5 * known / len(keywords) if known else 0.4
+        unknown = [t for t in keywords if t not in ROLE_WORDS and t not in SKILL_WORDS
+                   and t not in QUALIFIER_WORDS]
+        if unknown:
+            # Could be a city the gazetteer doesn't know ("python jobs in delhi"):
+            # the rules would search it as a keyword instead of filtering on it.
+            confidence = min(confidence, 0.4)
+    if len(keywords) > REWRITE_MAX_KEYWORDS:
+        confidence = min(confidence, 0.4)
+    if any(t.isdigit() for t in keywords):
+        # A number the experience patterns did not understand
+        confidence = min(confidence, 0.2)
+    if len({m.location for m in locations}) > 1:
+        confidence = min(confidence, 0.3)
+    if any(_negated(text, start, end) for start, end in spans):
+        confidence = min(confidence, 0.3)
+    return result, confidence
+
+
+class RewriteStats:
+    """Per-path counts and latency: 'rules' (local extractor) vs 'llm'."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.count = {"rules": 0, "llm": 0}
+        self.seconds = {"rules": 0.0, "llm": 0.0}
+
+    def record(self, path: str, seconds: float):
+        with self.lock:
+            self.count[path] += 1
+            self.seconds[path] += seconds
+
+    def stats(self) -> dict:
+        with self.lock:
+            total = sum(self.count.values())
+            out = {
+                "queries": total,
+                "llm_skipped_fraction": self.count["rules"] / total if total else 0.0,
+            }
+            for path in ("rules", "llm"):
+                out[path] = self.count[path]
+                out[f"avg_{path}_ms"] = (
+                    self.seconds[path] / self.count[path] * 1e3 if self.count[path] else 0.0
+                )
+            return out
+
+
+STATS = RewriteStats()
+
+
+def rewrite_stats() -> dict:
+    return STATS.stats()
+
+
+def run_llm(text: str):
     response = client.chat(
         model="qwen2.5:3b-instruct",
         format="json",
@@ -36,42 +210,21 @@ def run(text: str):
         ]
     )
     try:
-        data = json.loads(response["message"]["content"])
-        
-        # Handle Experience Parsing
-        exp = data.get("experience")
-        final_exp = exp
-        
-        if isinstance(exp, str):
-            # Try to parse "min-max" or "min to max"
-            is_range = False
-            parts = []
-            
-            if "-" in exp:
-                parts = exp.split("-")
-                is_range = True
-            elif "to" in exp.lower():
-                parts = exp.lower().split("to")
-                is_range = True
-                
-            if is_range and len(parts) == 2:
-                try:
-                    min_e = int(parts[0].strip())
-                    max_e = int(parts[1].strip())
-                    final_exp = {"gte": min_e, "lte": max_e}
-                except:
-                    final_exp = None
-            else:
-                # If it's a string but NOT a range (e.g. "5+"), maybe try to parse single int?
-                # For now, if fallback is needed, we could try extracting the first int.
-                # But let's stick to what we know.
-                pass
-        
-        return {
-            "rewritten_query": data.get("keywords", text),
-            "location": data.get("location"),
-            "experience": final_exp
-        }
+        return normalize(json.loads(response["message"]["content"]), text)
     except:
         # Fallback
         return {"rewritten_query": text, "location": None, "experience": None}
+
+
+def run(text: str, min_confidence: Optional[float] = None):
+    start = time.perf_counter()
+    if REWRITE_RULES_ENABLED:
+        threshold = REWRITE_MIN_CONFIDENCE if min_confidence is None else min_confidence
+        result, confidence = extract(text)
+        if confidence >= threshold:
+            STATS.record("rules", time.perf_counter() - start)
+            return result
+
+    result = run_llm(text)
+    STATS.record("llm", time.perf_counter() - start)
+    return result
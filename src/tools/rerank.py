@@ -2,14 +2,45 @@ import os
 import ollama
 import json
 
+from src.tools.feature_rerank import LinearReranker, features, log_impression
+
 OLLAMA_HOST = os.getenv("OLLAMA_HOST", "http://host.docker.internal:11434")
 client = ollama.Client(host=OLLAMA_HOST)
 
-def run(candidates):
+# "llm": listwise rerank by the model below. "features": local linear model
+# over retrieval/text features (src/tools/feature_rerank.py), no LLM call.
+RERANK_MODE = os.getenv("RERANK_MODE", "llm")
+FEATURE_RERANKER = LinearReranker.load() if RERANK_MODE == "features" else None
+
+def cosine_lookup_for(query):
+    """Cosines from the mmap vector index, if it is loaded and the query embedding is cached."""
+    text = query.get("rewritten_query") if isinstance(query, dict) else query
+    if not text:
+        return None
+    from src.tools import hybrid_core
+    vector = hybrid_core.EMBED_CACHE.get(text)
+    if hybrid_core.VECTOR_INDEX is None or vector is None:
+        return None
+    return lambda ids: hybrid_core.VECTOR_INDEX.cosine_for_ids(vector, ids)
+
+def run_features(candidates, query=None):
+    reranker = FEATURE_RERANKER or LinearReranker.load()
+    try:
+        matrix = features(candidates, query, cosine_lookup_for(query))
+        log_impression(query, candidates, matrix)
+        return {"jobs": [candidates[i] for i in reranker.order(matrix)]}
+    except Exception as e:
+        print(f"Feature rerank failed: {e}")
+        return {"jobs": candidates, "error": str(e)}
+
+def run(candidates, query=None):
     # Ensure input is a list
     if not isinstance(candidates, list):
          return {"error": "Input must be a list of job candidates.", "jobs": []}
 
+    if RERANK_MODE == "features":
+        return run_features(candidates, query)
+
     # Simplify context to save tokens
     simple_list = []
     for c in candidates:
@@ -0,0 +1,103 @@
+import hashlib
+import json
+from typing import List, Optional
+
+from src.tools.cache import LRUCache
+from src.tools.embedding_cache import normalize_text
+
+
+def canonical_search_key(query: str, location=None, experience=None) -> str:
+    """Canonicalizes the (keywords, location, experience) triple produced by query_rewrite."""
+    if isinstance(experience, dict):
+        experience = sorted(experience.items())
+    elif isinstance(experience, float) and experience.is_integer():
+        experience = int(experience)
+    # Location stays case-sensitive: the ES location filter is an exact keyword match.
+    loc = " ".join(location.split()) if isinstance(location, str) else location
+    return json.dumps([normalize_text(query), loc or None, experience])
+
+
+class ResultCache:
+    """
+    Caches ranked search results (ids, scores and a few source fields) per canonical
+    query. Entries are scoped to an index generation, so an indexer run makes
+    every older entry unreachable. Optionally shared across replicas through
+    an Aerospike set.
+    """
+
+    def __init__(self, as_client=None, namespace: str = "test", set_name: str = "search_results",
+                 max_entries: int = 2000, ttl: float = 300):
+        self.as_client = as_client
+        self.namespace = namespace
+        self.set_name = set_name
+        self.ttl = ttl
+        self.l1 = LRUCache(max_entries=max_entries, ttl=ttl)
+        self.generation = None
+        self.l2_hits = 0
+        self.l2_misses = 0
+
+    def _key(self, canonical: str, generation: int) -> str:
+        raw = f"{generation}\x00{canonical}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _sync_generation(self, generation: int):
+        if generation != self.generation:
+            self.l1.clear()
+            self.generation = generation
+
+    def get(self, canonical: str, generation: int) -> Optional[List[dict]]:
+        self._sync_generation(generation)
+        key = self._key(canonical, generation)
+
+        hits = self.l1.get(key)
+        if hits is not None:
+            return hits
+
+        hits = self._l2_get(key)
+        if hits is not None:
+            self.l1.put(key, hits)
+        return hits
+
+    def put(self, canonical: str, generation: int, hits: List[dict]):
+        self._sync_generation(generation)
+        key = self._key(canonical, generation)
+        self.l1.put(key, hits)
+        self._l2_put(key, hits)
+
+    def _l2_get(self, key: str) -> Optional[List[dict]]:
+        if not self.as_client:
+            return None
+        try:
+            _, _, bins = self.as_client.get((self.namespace, self.set_name, key))
+            hits = json.loads(bins["hits"]) if bins else None
+        except Exception:
+            hits = None
+
+        if hits is None:
+            self.l2_misses += 1
+        else:
+            self.l2_hits += 1
+        return hits
+
+    def _l2_put(self, key: str, hits: List[dict]):
+        if not self.as_client:
+            return
+        try:
+            self.as_client.put(
+                (self.namespace, self.set_name, key),
+                {"hits": json.dumps(hits)},
+                meta={"ttl": int(self.ttl)},
+            )
+        except Exception as e:
+            print(f"Result cache write error: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "generation": self.generation,
+            "l1": self.l1.stats(),
+            "l2": {
+                "enabled": bool(self.as_client),
+                "hits": self.l2_hits,
+                "misses": self.l2_misses,
+            },
+        }
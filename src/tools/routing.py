@@ -0,0 +1,24 @@
+import os
+from typing import Optional
+
+# Custom routing by location: indexers send every job to the shard chosen by
+# its normalized location, and hybrid_search passes the same value when the
+# query filters on location, so the search touches one shard instead of all.
+# Must match how the live index was built (index_jobs.py --location-routing).
+LOCATION_ROUTING = os.getenv("LOCATION_ROUTING", "0") == "1"
+
+# Jobs without a location still need a routing value once _routing is required.
+NO_LOCATION = "_none"
+
+
+def normalize_location(location) -> Optional[str]:
+    """'  New  Delhi ' -> 'new delhi'; empty/missing -> None."""
+    if location is None or (isinstance(location, float) and location != location):
+        return None
+    value = " ".join(str(location).split()).lower()
+    return value or None
+
+
+def routing_for(location) -> str:
+    """Routing value used when indexing a job."""
+    return normalize_location(location) or NO_LOCATION
@@ -0,0 +1,262 @@
+import json
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.tools.filter_columns import FilterColumns, FilterColumnsWriter, replace_npy
+
+# On-disk layout of an exported index (one directory):
+#   meta.json             dims, count, dtype, filter fields, ivf info (written last)
+#   vectors.bin           raw row-major matrix, unit-normalized, dtype as in meta
+#   ids.npy               document ids, row-aligned
+#   ids_sorted.npy        ids in sorted order, ids_rows.npy their rows (id -> row lookup)
+#   field_<name>.npy      filter columns (see filter_columns.py)
+#   ivf_*.npy             optional inverted-file index (centroids, row order, list offsets)
+#
+# Everything is opened with mmap, so several worker processes serving the
+# same directory share one copy of the matrix through the OS page cache.
+META_FILE = "meta.json"
+VECTORS_FILE = "vectors.bin"
+IDS_FILE = "ids.npy"
+SORTED_IDS_FILE = "ids_sorted.npy"
+SORTED_ROWS_FILE = "ids_rows.npy"
+DTYPES = {"float32": np.float32, "float16": np.float16, "int8": np.int8}
+INT8_SCALE = 127.0  # unit vectors have components in [-1, 1]
+SCORE_CHUNK_ROWS = 65536  # rows upcast to float32 at a time (bounds memory for float16/int8)
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class VectorIndexWriter:
+    """
+    Streams (id, vector, filter fields) rows into an index directory.
+    Rows are appended to disk as they arrive, so exporting a large catalogue
+    never holds the whole matrix in memory.
+    """
+
+    def __init__(self, path: str, dims: int, dtype: str = "float32",
+                 keyword_fields: Sequence[str] = ("location",),
+                 integer_fields: Sequence[str] = ("experience",)):
+        if dtype not in DTYPES:
+            raise ValueError(f"Unsupported dtype '{dtype}', expected one of {list(DTYPES)}")
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.dims = dims
+        self.dtype = dtype
+        self.count = 0
+        self.ids: List[str] = []
+        self.filters = FilterColumnsWriter(keyword_fields, integer_fields)
+        self._vectors_tmp = os.path.join(path, VECTORS_FILE + ".tmp")
+        self._out = open(self._vectors_tmp, "wb")
+
+    def add_batch(self, ids: Sequence[Any], vectors: Sequence[Sequence[float]],
+                  fields: Sequence[Dict[str, Any]]):
+        matrix = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dims)
+        matrix = _normalize_rows(matrix)
+        if self.dtype == "int8":
+            matrix = np.round(matrix * INT8_SCALE)
+        matrix.astype(DTYPES[self.dtype]).tofile(self._out)
+
+        self.ids.extend(str(i) for i in ids)
+        for row in fields:
+            self.filters.add(row)
+        self.count += len(matrix)
+
+    def close(self, ivf_lists: int = 0, ivf_iterations: int = 10, seed: int = 42) -> dict:
+        """Publishes the index; meta.json is replaced last so readers never see a partial one."""
+        self._out.close()
+        os.replace(self._vectors_tmp, os.path.join(self.path, VECTORS_FILE))
+        ids = np.array(self.ids, dtype=str)
+        replace_npy(os.path.join(self.path, IDS_FILE), ids)
+        rows = np.argsort(ids, kind="stable").astype(np.int64)
+        replace_npy(os.path.join(self.path, SORTED_IDS_FILE), ids[rows])
+        replace_npy(os.path.join(self.path, SORTED_ROWS_FILE), rows)
+        meta = {
+            "dims": self.dims,
+            "count": self.count,
+            "dtype": self.dtype,
+            "fields": self.filters.save(self.path),
+            "ivf": None,
+        }
+        if ivf_lists and self.count:
+            matrix = np.memmap(os.path.join(self.path, VECTORS_FILE), dtype=DTYPES[self.dtype],
+                               mode="r", shape=(self.count, self.dims))
+            meta["ivf"] = build_ivf(self.path, matrix, self.dtype, ivf_lists, ivf_iterations, seed)
+
+        tmp = os.path.join(self.path, META_FILE + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, os.path.join(self.path, META_FILE))
+        return meta
+
+
+def _as_float(block: np.ndarray, dtype: str) -> np.ndarray:
+    block = block.astype(np.float32, copy=False)
+    return block / INT8_SCALE if dtype == "int8" else block
+
+
+def build_ivf(path: str, matrix: np.ndarray, dtype: str, n_lists: int,
+              iterations: int = 10, seed: int = 42) -> dict:
+    """Spherical k-means on a sample, then assigns every row to its nearest centroid."""
+    count = len(matrix)
+    n_lists = max(1, min(n_lists, count))
+    rng = np.random.default_rng(seed)
+    sample_rows = np.sort(rng.choice(count, size=min(count, n_lists * 64), replace=False))
+    sample = _as_float(matrix[sample_rows], dtype)
+
+    centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)]
+    for _ in range(iterations):
+        assign = np.argmax(sample @ centroids.T, axis=1)
+        for c in range(n_lists):
+            members = sample[assign == c]
+            if len(members):
+                centroids[c] = members.mean(axis=0)
+        centroids = _normalize_rows(centroids)
+
+    assign = np.empty(count, dtype=np.int32)
+    for start in range(0, count, SCORE_CHUNK_ROWS):
+        block = _as_float(matrix[start:start + SCORE_CHUNK_ROWS], dtype)
+        assign[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+
+    order = np.argsort(assign, kind="stable").astype(np.int64)
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(assign, minlength=n_lists))]).astype(np.int64)
+    replace_npy(os.path.join(path, "ivf_centroids.npy"), centroids.astype(np.float32))
+    replace_npy(os.path.join(path, "ivf_order.npy"), order)
+    replace_npy(os.path.join(path, "ivf_offsets.npy"), offsets)
+    return {"lists": n_lists}
+
+
+class VectorIndex:
+    """
+    Read-only, memory-mapped dense retriever: exact (or IVF-probed) cosine
+    top-k with Elasticsearch-style filter clauses (match/term on keyword
+    fields, range on integer fields).
+    """
+
+    def __init__(self, path: str, nprobe: int = 8):
+        with open(os.path.join(path, META_FILE)) as f:
+            self.meta = json.load(f)
+        self.path = path
+        self.dims = self.meta["dims"]
+        self.count = self.meta["count"]
+        self.dtype = self.meta["dtype"]
+        self.nprobe = nprobe
+        self.matrix = np.memmap(os.path.join(path, VECTORS_FILE), dtype=DTYPES[self.dtype],
+                                mode="r", shape=(self.count, self.dims))
+        self.ids = np.load(os.path.join(path, IDS_FILE), mmap_mode="r")
+        self.filters = FilterColumns(path, self.meta["fields"], self.count)
+        # id -> row lookup for cosine_for_ids: binary search over mmapped sorted ids,
+        # so it is shared through the page cache like the matrix.
+        self._sorted_ids = self._sorted_rows = None
+        if os.path.exists(os.path.join(path, SORTED_IDS_FILE)):
+            self._sorted_ids = np.load(os.path.join(path, SORTED_IDS_FILE), mmap_mode="r")
+            self._sorted_rows = np.load(os.path.join(path, SORTED_ROWS_FILE), mmap_mode="r")
+        self.ivf = None
+        if self.meta.get("ivf"):
+            self.ivf = {
+                name: np.load(os.path.join(path, f"ivf_{name}.npy"), mmap_mode="r")
+                for name in ("centroids", "order", "offsets")
+            }
+
+    def __len__(self) -> int:
+        return self.count
+
+    # ----------------------------
+    # Scoring
+    # ----------------------------
+    def _query(self, vector: Sequence[float]) -> np.ndarray:
+        query = np.asarray(vector, dtype=np.float32).reshape(-1)
+        if query.shape[0] != self.dims:
+            raise ValueError(f"Query has {query.shape[0]} dims, index has {self.dims}")
+        norm = np.linalg.norm(query)
+        return query / norm if norm else query
+
+    def _scores(self, query: np.ndarray, rows: Optional[np.ndarray]) -> np.ndarray:
+        """Cosine similarity of `query` against the given rows (all rows when None)."""
+        n = self.count if rows is None else len(rows)
+        scores = np.empty(n, dtype=np.float32)
+        for start in range(0, n, SCORE_CHUNK_ROWS):
+            end = min(start + SCORE_CHUNK_ROWS, n)
+            block = self.matrix[start:end] if rows is None else self.matrix[rows[start:end]]
+            scores[start:end] = _as_float(block, self.dtype) @ query
+        return scores
+
+    def _probe_rows(self, query: np.ndarray, nprobe: int) -> np.ndarray:
+        centroid_scores = self.ivf["centroids"] @ query
+        nprobe = min(nprobe, len(centroid_scores))
+        lists = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+        offsets = self.ivf["offsets"]
+        rows = np.concatenate([self.ivf["order"][offsets[c]:offsets[c + 1]] for c in lists])
+        return np.sort(rows)  # sequential mmap access
+
+    def _search_rows(self, vector: Sequence[float], k: int, filters: Optional[List[dict]],
+                     nprobe: Optional[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """(row positions, cosines) of the top k, best first."""
+        query = self._query(vector)
+        mask = self.filters.mask(filters)
+
+        if self.ivf is not None and (nprobe or self.nprobe):
+            rows = self._probe_rows(query, nprobe or self.nprobe)
+            if mask is not None:
+                rows = rows[mask[rows]]
+        else:
+            rows = np.flatnonzero(mask) if mask is not None else None
+
+        scores = self._scores(query, rows)
+        if len(scores) == 0:
+            return np.empty(0, dtype=np.int64), scores
+        if len(scores) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind="stable")]
+        positions = top if rows is None else rows[top]
+        return positions, scores[top]
+
+    def search(self, vector: Sequence[float], k: int = 50, filters: Optional[List[dict]] = None,
+               nprobe: Optional[int] = None) -> List[Tuple[str, float]]:
+        """Returns up to k (id, cosine) pairs, best first."""
+        positions, scores = self._search_rows(vector, k, filters, nprobe)
+        return [(str(self.ids[p]), float(s)) for p, s in zip(positions, scores)]
+
+    def cosine_for_ids(self, vector: Sequence[float], ids: Sequence[Any]) -> np.ndarray:
+        """Cosine of vector against the stored embeddings of ids (NaN for unknown ids)."""
+        rows = self._rows_for_ids(ids)
+        out = np.full(len(rows), np.nan, dtype=np.float32)
+        known = rows >= 0
+        if known.any():
+            out[known] = self._scores(self._query(vector), rows[known])
+        return out
+
+    def _rows_for_ids(self, ids: Sequence[Any]) -> np.ndarray:
+        """Row of each id, -1 when it isn't in the index."""
+        if self._sorted_ids is None:
+            # Index written before the sorted id files existed: sort in memory once.
+            self._sorted_rows = np.argsort(self.ids, kind="stable")
+            self._sorted_ids = np.asarray(self.ids)[self._sorted_rows]
+        keys = np.array([str(doc_id) for doc_id in ids], dtype=str)
+        rows = np.full(len(keys), -1, dtype=np.int64)
+        if not len(keys) or not self.count:
+            return rows
+        pos = np.minimum(np.searchsorted(self._sorted_ids, keys), self.count - 1)
+        found = self._sorted_ids[pos] == keys
+        rows[found] = self._sorted_rows[pos[found]]
+        return rows
+
+    def search_hits(self, vector: Sequence[float], k: int = 50, filters: Optional[List[dict]] = None,
+                    nprobe: Optional[int] = None) -> dict:
+        """
+        search() shaped like an ES kNN response (cosine mapped to ES's (1 + cos) / 2
+        score). _source carries the stored filter fields (location, experience).
+        """
+        positions, scores = self._search_rows(vector, k, filters, nprobe)
+        hits = [
+            {"_id": str(self.ids[p]), "_score": (1.0 + float(s)) / 2.0, "_source": source}
+            for p, s, source in zip(positions, scores, self.filters.sources(positions))
+        ]
+        return {"hits": {"hits": hits}}
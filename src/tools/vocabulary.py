@@ -0,0 +1,22 @@
+# Search vocabulary shared by the planner fast path, the plan cache and the
+# rule-based query_rewrite extractor.
+JOB_WORDS = {
+    "job", "jobs", "role", "roles", "opening", "openings", "position", "positions",
+    "vacancy", "vacancies", "hiring", "opportunity", "opportunities", "career", "careers",
+}
+ROLE_WORDS = {
+    "developer", "developers", "dev", "engineer", "engineers", "engineering", "scientist",
+    "analyst", "architect", "programmer", "sre", "devops", "qa", "tester", "intern",
+    "backend", "frontend", "fullstack", "full-stack", "mobile", "android", "ios", "cloud",
+    "ml", "data", "lead", "consultant", "administrator", "designer",
+}
+SKILL_WORDS = {
+    "python", "java", "javascript", "typescript", "react", "node", "golang", "kotlin",
+    "swift", "django", "flask", "fastapi", "kubernetes", "docker", "aws", "terraform",
+    "kafka", "sql", "pandas", "spark", "rust", "c++", "scala", "redis", "linux",
+}
+# Seniority / employment-type modifiers: safe to leave in the keywords.
+QUALIFIER_WORDS = {
+    "senior", "sr", "junior", "jr", "mid", "principal", "staff", "head", "chief",
+    "full-time", "part-time", "contract", "freelance", "permanent", "internship",
+}
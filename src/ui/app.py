@@ -12,6 +12,9 @@ if BASE_DIR not in sys.path:
     sys.path.insert(0, BASE_DIR)
 
 from src.executor.execute import execute
+from src.orchestrator.fast_path import fast_path_stats
+from src.orchestrator.model import PLAN_CACHE
+from src.tools.query_rewrite import rewrite_stats
 
 # ------------------------------------------------------------------
 # CONFIG
@@ -157,6 +160,26 @@ sidebar = st.sidebar
 sidebar.title("Navigation")
 page = sidebar.radio("Go to:", ["Orchestrator", "Data Browser"])
 
+fp = fast_path_stats()
+if fp["queries"]:
+    sidebar.caption(
+        f"Planner fast path: {fp['fast_path']}/{fp['queries']} queries "
+        f"({fp['fast_path_fraction']:.0%}), LLM: {fp['llm']}"
+    )
+pc = PLAN_CACHE.stats()
+if pc["lookups"]:
+    sidebar.caption(
+        f"Plan cache: {pc['exact_hits']} exact + {pc['template_hits']} templated hits / "
+        f"{pc['lookups']} lookups ({pc['hit_rate']:.0%}), {pc['entries']} plans"
+    )
+rw = rewrite_stats()
+if rw["queries"]:
+    sidebar.caption(
+        f"Query rewrite: rules {rw['rules']} ({rw['avg_rules_ms']:.2f} ms avg), "
+        f"LLM {rw['llm']} ({rw['avg_llm_ms']:.0f} ms avg), "
+        f"LLM skipped {rw['llm_skipped_fraction']:.0%}"
+    )
+
 if page == "Orchestrator":
     page_orchestrator()
 else:
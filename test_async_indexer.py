@@ -0,0 +1,54 @@
+import asyncio
+import os
+import sys
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+for name in ["aiomysql", "aerospike", "aerospike_helpers", "aerospike_helpers.batch",
+             "aerospike_helpers.batch.records", "aerospike_helpers.operations",
+             "elasticsearch", "elasticsearch.helpers", "requests", "pandas"]:
+    sys.modules.setdefault(name, MagicMock())
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts"))
+import async_indexer
+
+ROWS = [(1, "Python Developer", "desc", "Pune", 3, "python"),
+        (2, "Java Developer", "desc", "Mumbai", 5, "java")]
+
+
+async def fake_read(pool, embed_q, stats, page_size, *args, **kwargs):
+    await embed_q.put((0, ROWS, async_indexer.format_checkpoint(async_indexer.EPOCH, "2")))
+
+
+class TestRoutedWrites(unittest.TestCase):
+    def setUp(self):
+        for name in ["read_rows", "read_changed_rows", "fetch_full_started_at",
+                     "embed_batch_sync", "async_bulk", "write_aerospike_batch"]:
+            self.addCleanup(setattr, async_indexer, name, getattr(async_indexer, name))
+        async_indexer.read_rows = fake_read
+        async_indexer.read_changed_rows = fake_read
+        async_indexer.fetch_full_started_at = AsyncMock(return_value=async_indexer.EPOCH)
+        async_indexer.embed_batch_sync = lambda texts: [[0.0] for _ in texts]
+        async_indexer.async_bulk = AsyncMock(return_value=(len(ROWS), []))
+        async_indexer.write_aerospike_batch = lambda as_client, docs: 0
+
+    def run_pass(self, mode):
+        es = MagicMock(delete_by_query=AsyncMock())
+        store = MagicMock(load=MagicMock(return_value=None))
+        _, ok = asyncio.run(async_indexer.index_pass(
+            mode, MagicMock(), es, MagicMock(), store, page_size=200, embed_workers=1,
+            sink_workers=1, queue_size=2, use_embedding_store=False, routed=True))
+        self.assertTrue(ok)
+        actions = async_indexer.async_bulk.call_args.args[1]
+        self.assertEqual([a["_routing"] for a in actions],
+                         [async_indexer.routing_for("Pune"), async_indexer.routing_for("Mumbai")])
+        return es
+
+    def test_full_pass_never_deletes_stale_copies(self):
+        self.run_pass("full").delete_by_query.assert_not_called()
+
+    def test_partial_pass_deletes_stale_copies(self):
+        self.run_pass("partial").delete_by_query.assert_awaited_once()
+
+if __name__ == '__main__':
+    unittest.main()
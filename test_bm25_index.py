@@ -0,0 +1,74 @@
+
+import math
+import tempfile
+import unittest
+from src.tools.bm25_index import BM25Index, BM25IndexWriter, tokenize
+
+DOCS = [
+    {"title": "Python Developer", "skills": "python, django", "description": "Build APIs in Python.",
+     "location": "Pune", "experience": 3},
+    {"title": "Java Engineer", "skills": "java, spring", "description": "Python is a plus.",
+     "location": "Remote", "experience": 5},
+    {"title": "Data Scientist", "skills": "python, pandas, ml", "description": "Modeling work.",
+     "location": "Pune", "experience": 7},
+    {"title": "Frontend Developer", "skills": "react", "description": None,
+     "location": "Mumbai", "experience": None},
+]
+
+def reference_field_score(docs, field, terms, row):
+    """Textbook Lucene BM25 for one field, used to check the vectorized scorer."""
+    lengths = [len(tokenize(d.get(field))) for d in docs]
+    with_field = sum(1 for n in lengths if n)
+    avgdl = sum(lengths) / with_field
+    tokens = tokenize(docs[row].get(field))
+    score = 0.0
+    for term in terms:
+        df = sum(1 for d in docs if term in tokenize(d.get(field)))
+        tf = tokens.count(term)
+        if not df or not tf:
+            continue
+        idf = math.log(1 + (with_field - df + 0.5) / (df + 0.5))
+        score += idf * tf * 2.2 / (tf + 1.2 * (1 - 0.75 + 0.75 * len(tokens) / avgdl))
+    return score
+
+class TestBM25Index(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        writer = BM25IndexWriter(self.tmp.name)
+        writer.add_batch(["j1", "j2"], DOCS[:2])
+        writer.add_batch(["j3", "j4"], DOCS[2:])
+        writer.close()
+        self.index = BM25Index(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_best_fields_scores_match_reference(self):
+        results = dict(self.index.search("python developer"))
+        for row, doc_id in enumerate(["j1", "j2", "j3", "j4"]):
+            expected = max(
+                boost * reference_field_score(DOCS, field, ["python", "developer"], row)
+                for field, boost in {"title": 3.0, "skills": 2.0, "description": 1.0}.items()
+            )
+            self.assertAlmostEqual(results.get(doc_id, 0.0), expected, places=4)
+
+    def test_title_boost_ranks_title_match_first(self):
+        ids = [doc_id for doc_id, _ in self.index.search("python")]
+        self.assertEqual(ids[0], "j1")
+        self.assertEqual(set(ids), {"j1", "j2", "j3"})
+
+    def test_filters(self):
+        filters = [{"match": {"location": "Pune"}}, {"range": {"experience": {"gte": 5, "lte": 10}}}]
+        self.assertEqual([d for d, _ in self.index.search("python", filters=filters)], ["j3"])
+        self.assertEqual(self.index.search("react", filters=[{"range": {"experience": {"lte": 10}}}]), [])
+
+    def test_no_text_returns_filtered_docs(self):
+        hits = self.index.search_hits("", filters=[{"match": {"location": "Pune"}}])["hits"]["hits"]
+        self.assertEqual([h["_id"] for h in hits], ["j1", "j3"])
+        self.assertEqual(hits[0]["_score"], 0.0)
+
+    def test_top_k(self):
+        self.assertEqual(len(self.index.search("python", k=2)), 2)
+
+if __name__ == '__main__':
+    unittest.main()
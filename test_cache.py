@@ -0,0 +1,110 @@
+
+import time
+import unittest
+from src.tools.cache import LRUCache
+from src.tools.embedding_cache import EmbeddingCache, pack_vector, unpack_vector
+from src.tools.generation import GenerationWatcher
+from src.tools.result_cache import ResultCache, canonical_search_key
+
+class FakeAerospike:
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key):
+        if key not in self.store:
+            raise KeyError(key)
+        return key, {}, self.store[key]
+
+    def put(self, key, bins, meta=None):
+        self.store[key] = bins
+
+class TestLRUCache(unittest.TestCase):
+    def test_eviction_order(self):
+        cache = LRUCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_ttl_expiry(self):
+        cache = LRUCache(max_entries=10, ttl=0.01)
+        cache.put("a", 1)
+        time.sleep(0.02)
+        self.assertIsNone(cache.get("a"))
+        stats = cache.stats()
+        self.assertEqual(stats["expirations"], 1)
+        self.assertEqual(stats["misses"], 1)
+
+    def test_sizeof_tracking(self):
+        cache = LRUCache(max_entries=1, sizeof=len)
+        cache.put("a", b"1234")
+        cache.put("b", b"12")
+        self.assertEqual(cache.stats()["bytes"], 2)
+
+class TestEmbeddingCache(unittest.TestCase):
+    def test_pack_roundtrip(self):
+        packed = pack_vector([0.5, -1.25, 2.0])
+        self.assertEqual(len(packed), 12)
+        self.assertEqual(unpack_vector(packed), [0.5, -1.25, 2.0])
+
+    def test_normalized_key_hits_l1(self):
+        cache = EmbeddingCache(None, "test", "emb", model_name="m")
+        cache.put("Python  Developer Bangalore", [1.0, 2.0])
+        self.assertEqual(cache.get(" python developer bangalore"), [1.0, 2.0])
+        self.assertEqual(cache.l1.stats()["hits"], 1)
+
+    def test_l2_shared_between_replicas(self):
+        client = FakeAerospike()
+        writer = EmbeddingCache(client, "test", "emb", model_name="m")
+        reader = EmbeddingCache(client, "test", "emb", model_name="m")
+        writer.put("backend", [0.25])
+        self.assertEqual(reader.get("backend"), [0.25])
+        self.assertEqual(reader.stats()["l2"]["hits"], 1)
+        # Promoted into the reader's L1
+        self.assertEqual(reader.get("backend"), [0.25])
+        self.assertEqual(reader.stats()["l2"]["hits"], 1)
+
+    def test_model_name_is_part_of_key(self):
+        client = FakeAerospike()
+        EmbeddingCache(client, "test", "emb", model_name="a").put("q", [1.0])
+        self.assertIsNone(EmbeddingCache(client, "test", "emb", model_name="b").get("q"))
+
+class TestGenerationWatcher(unittest.TestCase):
+    def test_reads_stamp_and_throttles(self):
+        client = FakeAerospike()
+        watcher = GenerationWatcher(client, "test", check_interval=60)
+        self.assertEqual(watcher.current(), 0)
+        client.put(("test", "meta", "jobs_generation"), {"generation": 3})
+        # Still within the check interval
+        self.assertEqual(watcher.current(), 0)
+        watcher.check_interval = 0
+        self.assertEqual(watcher.current(), 3)
+
+class TestResultCache(unittest.TestCase):
+    def test_canonical_key(self):
+        self.assertEqual(
+            canonical_search_key(" Python  Developer", "Bangalore", {"lte": 5, "gte": 3}),
+            canonical_search_key("python developer", "Bangalore ", {"gte": 3, "lte": 5}),
+        )
+        self.assertEqual(canonical_search_key("x", None, 5.0), canonical_search_key("x", None, 5))
+        self.assertNotEqual(canonical_search_key("x", "pune"), canonical_search_key("x", "remote"))
+
+    def test_generation_scoping(self):
+        cache = ResultCache()
+        key = canonical_search_key("python", "pune", 3)
+        cache.put(key, 1, [{"id": "1", "score": 0.5}])
+        self.assertEqual(cache.get(key, 1), [{"id": "1", "score": 0.5}])
+        self.assertIsNone(cache.get(key, 2))
+        self.assertEqual(len(cache.l1), 0)
+
+    def test_shared_through_aerospike(self):
+        client = FakeAerospike()
+        key = canonical_search_key("python")
+        ResultCache(client).put(key, 7, [{"id": "1", "score": 0.5}])
+        self.assertEqual(ResultCache(client).get(key, 7), [{"id": "1", "score": 0.5}])
+
+if __name__ == '__main__':
+    unittest.main()
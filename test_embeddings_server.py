@@ -0,0 +1,49 @@
+import asyncio
+import sys
+import unittest
+from unittest.mock import MagicMock
+
+sys.modules.setdefault("sentence_transformers", MagicMock())
+
+from fastapi import HTTPException
+
+from embeddings import server
+
+
+class TestEncodeValidation(unittest.TestCase):
+    def test_non_string_text_rejected_before_batching(self):
+        for payload in [{"text": ["a", "b"]}, {"text": 3}, {"text": None}, {}]:
+            with self.assertRaises(HTTPException) as ctx:
+                asyncio.run(server.encode(payload))
+            self.assertEqual(ctx.exception.status_code, 422)
+        with self.assertRaises(HTTPException) as ctx:
+            asyncio.run(server.encode_batch({"texts": ["a", 1]}))
+        self.assertEqual(ctx.exception.status_code, 422)
+
+
+class TestMicroBatcher(unittest.TestCase):
+    def setUp(self):
+        self.addCleanup(setattr, server, "encode_texts", server.encode_texts)
+
+    def run_batch(self, texts):
+        async def go():
+            batcher = server.MicroBatcher(max_batch_size=8, max_wait_ms=20)
+            batcher.start()
+            try:
+                return await asyncio.wait_for(
+                    asyncio.gather(*[batcher.submit(t) for t in texts], return_exceptions=True), 1.0)
+            finally:
+                await batcher.stop()
+        return asyncio.run(go())
+
+    def test_co_batched_requests_get_their_own_vectors(self):
+        server.encode_texts = lambda texts: [[float(len(t))] for t in texts]
+        self.assertEqual(self.run_batch(["a", "bbb"]), [[1.0], [3.0]])
+
+    def test_embedding_count_mismatch_fails_every_request(self):
+        server.encode_texts = lambda texts: [[0.0]] * (len(texts) + 1)
+        results = self.run_batch(["a", "b"])
+        self.assertTrue(all(isinstance(r, ValueError) for r in results))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+
+import json
+import sys
+import unittest
+from unittest.mock import MagicMock
+
+sys.modules.setdefault("ollama", MagicMock())
+
+from src.orchestrator import fast_path, model
+from src.orchestrator.plan_cache import PlanCache
+
+class TestFastPath(unittest.TestCase):
+    def setUp(self):
+        self.addCleanup(setattr, fast_path, "STATS", fast_path.STATS)
+        fast_path.STATS = fast_path.FastPathStats()
+
+    def test_standard_job_search_gets_plan(self):
+        for query in ["python developer jobs in pune", "backend engineer 5 years bangalore",
+                      "remote react roles", "data scientist 3-5 yrs hyderabad"]:
+            plan = fast_path.plan(query)
+            self.assertIsNotNone(plan, query)
+            steps = json.loads(plan)["steps"]
+            self.assertEqual([s["tool"] for s in steps], ["query_rewrite", "job_search", "rerank"])
+            self.assertEqual(steps[0]["input"], query)
+            self.assertEqual(steps[1]["input"], "$PREVIOUS_OUTPUT")
+
+    def test_other_intents_and_vague_queries_go_to_llm(self):
+        for query in ["what is the salary of a python developer in pune",
+                      "parse my resume and find matching jobs",
+                      "run sql to show records of jobs",
+                      "search the web for kubernetes jobs",
+                      "something in pune",
+                      "hello"]:
+            self.assertIsNone(fast_path.plan(query), query)
+
+    def test_stats_fraction(self):
+        fast_path.plan("python jobs")
+        fast_path.plan("hello")
+        stats = fast_path.fast_path_stats()
+        self.assertEqual(stats["queries"], 2)
+        self.assertEqual(stats["fast_path"], 1)
+        self.assertAlmostEqual(stats["fast_path_fraction"], 0.5)
+
+    def test_orchestrate_falls_back_to_llm(self):
+        self.addCleanup(setattr, model, "PLAN_CACHE", model.PLAN_CACHE)
+        self.addCleanup(setattr, model, "client", model.client)
+        model.PLAN_CACHE = PlanCache(tools=["query_rewrite", "job_search", "rerank"])
+        model.client = MagicMock()
+        model.client.chat.return_value = {"message": {"content": '{"steps": []}'}}
+        self.assertEqual(json.loads(model.orchestrate("python developer jobs"))["steps"][2]["tool"], "rerank")
+        model.client.chat.assert_not_called()
+        self.assertEqual(model.orchestrate("hello"), '{"steps": []}')
+        model.client.chat.assert_called_once()
+
+if __name__ == '__main__':
+    unittest.main()
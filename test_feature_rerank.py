@@ -0,0 +1,115 @@
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+import numpy as np
+
+sys.modules.setdefault("ollama", MagicMock())
+
+from src.tools import rerank
+from src.tools.feature_rerank import DEFAULT_WEIGHTS, FEATURES, LinearReranker, features, log_impression
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts"))
+import train_reranker
+
+
+def job(jid, title, skills, experience, score, bm25_rank=None, dense_rank=None, dense_score=0.0):
+    return {"id": jid, "score": score, "bm25_rank": bm25_rank, "dense_rank": dense_rank,
+            "dense_score": dense_score,
+            "source": {"title": title, "skills": skills, "experience": experience}}
+
+
+CANDIDATES = [
+    job("a", "Office Manager", "excel", 12, 0.033, bm25_rank=1),
+    job("b", "Python Developer", "python, django", 5, 0.030, bm25_rank=3, dense_rank=1, dense_score=0.9),
+    job("c", "Java Developer", "java", None, 0.020, dense_rank=2, dense_score=0.7),
+]
+QUERY = {"rewritten_query": "python developer", "location": "Pune", "experience": {"gte": 4, "lte": 6}}
+
+
+class TestFeatures(unittest.TestCase):
+    def test_feature_values(self):
+        m = features(CANDIDATES, QUERY)
+        col = {name: m[:, i] for i, name in enumerate(FEATURES)}
+        np.testing.assert_allclose(col["fused_score"], [1.0, 0.030 / 0.033, 0.020 / 0.033])
+        np.testing.assert_allclose(col["bm25_rrank"], [1.0, 1 / 3, 0.0])
+        np.testing.assert_allclose(col["dense_rrank"], [0.0, 1.0, 0.5])
+        np.testing.assert_allclose(col["title_overlap"], [0.0, 1.0, 0.5])
+        np.testing.assert_allclose(col["title_phrase"], [0.0, 1.0, 0.0])
+        np.testing.assert_allclose(col["skills_overlap"], [0.0, 0.5, 0.0])
+        np.testing.assert_allclose(col["experience_distance"], [0.6, 0.0, 1.0])
+        np.testing.assert_allclose(col["cosine"], [0.0, 0.8, 0.4])
+
+    def test_cosine_lookup_fills_jobs_missing_from_dense_leg(self):
+        lookup = MagicMock(return_value=np.array([0.25]))
+        m = features(CANDIDATES, QUERY, cosine_lookup=lookup)
+        lookup.assert_called_once_with(["a"])
+        self.assertAlmostEqual(m[0, FEATURES.index("cosine")], 0.25)
+
+
+class TestLinearReranker(unittest.TestCase):
+    def test_default_model_prefers_matching_job(self):
+        ranked = LinearReranker(DEFAULT_WEIGHTS).rerank(CANDIDATES, QUERY)
+        self.assertEqual([c["id"] for c in ranked], ["b", "a", "c"])
+
+    def test_save_load_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "model.json")
+            model = LinearReranker({"title_overlap": 2.0}, bias=0.5, mean=np.arange(len(FEATURES)))
+            model.save(path)
+            loaded = LinearReranker.load(path)
+            np.testing.assert_allclose(loaded.score(features(CANDIDATES, QUERY)),
+                                       model.score(features(CANDIDATES, QUERY)))
+            self.assertEqual(LinearReranker.load(os.path.join(tmp, "missing.json")).weights.tolist(),
+                             [DEFAULT_WEIGHTS[name] for name in FEATURES])
+
+
+class TestRerankMode(unittest.TestCase):
+    def test_features_mode_skips_llm(self):
+        self.addCleanup(setattr, rerank, "client", rerank.client)
+        rerank.client = MagicMock()
+        rerank.RERANK_MODE = "features"
+        self.addCleanup(setattr, rerank, "RERANK_MODE", "llm")
+        self.addCleanup(setattr, rerank, "cosine_lookup_for", rerank.cosine_lookup_for)
+        rerank.cosine_lookup_for = MagicMock(return_value=None)
+        out = rerank.run(list(CANDIDATES), QUERY)
+        self.assertEqual([c["id"] for c in out["jobs"]], ["b", "a", "c"])
+        rerank.client.chat.assert_not_called()
+
+
+class TestTrainingOnServedFeatures(unittest.TestCase):
+    def test_logged_rows_are_trained_on_as_served(self):
+        served = features(CANDIDATES, QUERY, cosine_lookup=lambda ids: np.array([0.25]))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "impressions.jsonl")
+            log_impression(QUERY, CANDIDATES, served, path=path)
+            log_impression(QUERY, [], np.zeros((0, len(FEATURES))), path=path)
+            with open(path) as f:
+                records = [json.loads(line) for line in f]
+            self.assertEqual(len(records), 1)
+            self.assertEqual(records[0]["ids"], ["a", "b", "c"])
+
+            # Clicks joined on the ids; features are reordered by name.
+            records[0]["clicked"] = ["b"]
+            names = records[0]["feature_names"][::-1]
+            records[0]["features"] = [row[::-1] for row in records[0]["features"]]
+            records[0]["feature_names"] = names
+            with open(path, "w") as f:
+                f.write(json.dumps(records[0]) + "\n")
+            blocks, labels = train_reranker.build_dataset(train_reranker.load_impressions(path))
+        np.testing.assert_allclose(blocks[0], served)
+        np.testing.assert_allclose(labels[0], [0.0, 1.0, 0.0])
+
+    def test_raw_impressions_use_the_cosine_lookup(self):
+        impression = (QUERY, ["a", "b", "c"], CANDIDATES, None, {"b"})
+        lookup = MagicMock(return_value=np.array([0.25]))
+        blocks, _ = train_reranker.build_dataset([impression], cosine_lookup_for=lambda query: lookup)
+        lookup.assert_called_once_with(["a"])
+        self.assertAlmostEqual(blocks[0][0, FEATURES.index("cosine")], 0.25)
+
+if __name__ == '__main__':
+    unittest.main()
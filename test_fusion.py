@@ -0,0 +1,66 @@
+
+import unittest
+import numpy as np
+from src.tools.fusion import RankedList, fuse, normalize_scores
+
+class TestFusion(unittest.TestCase):
+    def test_rrf_matches_reference(self):
+        bm25 = RankedList("bm25", ["a", "b", "c"], [9.0, 5.0, 1.0])
+        dense = RankedList("dense", ["c", "a"], [0.9, 0.8])
+        result = fuse([bm25, dense], k=60)
+        expected = {
+            "a": 1 / 61 + 1 / 62,
+            "b": 1 / 62,
+            "c": 1 / 63 + 1 / 61,
+        }
+        self.assertEqual(result.ids.tolist(), ["a", "c", "b"])
+        for jid, score in zip(result.ids, result.scores):
+            self.assertAlmostEqual(score, expected[jid])
+
+    def test_ranks_and_raw_scores_kept(self):
+        bm25 = RankedList("bm25", ["a", "b"], [9.0, 5.0])
+        dense = RankedList("dense", ["b"], [0.7])
+        result = fuse([bm25, dense])
+        b = result.ids.tolist().index("b")
+        self.assertEqual(result.rank_of("bm25")[b], 2)
+        self.assertEqual(result.rank_of("dense")[b], 1)
+        self.assertAlmostEqual(result.raw_score_of("dense")[b], 0.7)
+        a = result.ids.tolist().index("a")
+        self.assertEqual(result.rank_of("dense")[a], 0)
+        self.assertTrue(np.isnan(result.raw_score_of("dense")[a]))
+
+    def test_weights(self):
+        bm25 = RankedList("bm25", ["a", "b"])
+        dense = RankedList("dense", ["b", "a"])
+        result = fuse([bm25, dense], weights={"dense": 2.0})
+        self.assertEqual(result.ids[0], "b")
+
+    def test_linear_minmax(self):
+        bm25 = RankedList("bm25", ["a", "b"], [10.0, 0.0])
+        dense = RankedList("dense", ["b", "a"], [0.9, 0.1])
+        result = fuse([bm25, dense], method="linear", weights={"bm25": 1.0, "dense": 0.5})
+        self.assertEqual(result.ids.tolist(), ["a", "b"])
+        self.assertAlmostEqual(result.scores[0], 1.0)
+        self.assertAlmostEqual(result.scores[1], 0.5)
+
+    def test_zscore_constant_scores(self):
+        out = normalize_scores(np.array([2.0, 2.0, np.nan]), "zscore")
+        self.assertEqual(out.tolist(), [0.0, 0.0, 0.0])
+
+    def test_top_k_and_ties_keep_first_seen_order(self):
+        bm25 = RankedList("bm25", ["a", "b", "c", "d"])
+        dense = RankedList("dense", ["e", "f", "g", "h"])
+        result = fuse([bm25, dense], top_k=3)
+        self.assertEqual(result.ids.tolist(), ["a", "e", "b"])
+
+    def test_duplicate_ids_keep_best_rank(self):
+        result = fuse([RankedList("bm25", ["a", "b", "a"])])
+        self.assertEqual(result.ids.tolist(), ["a", "b"])
+        self.assertEqual(result.rank_of("bm25").tolist(), [1, 2])
+
+    def test_empty(self):
+        result = fuse([RankedList("bm25", []), RankedList("dense", [])])
+        self.assertEqual(len(result), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -11,7 +11,7 @@ sys.modules["requests"] = MagicMock()
 from src.tools import hybrid_core
 
 # Mock ES
-mock_es = hybrid_core.ES
+mock_es = hybrid_core.ES.options.return_value
 mock_es.search.return_value = {"hits": {"hits": []}}
 
 # Input with dict experience
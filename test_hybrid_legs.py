@@ -0,0 +1,66 @@
+import sys
+import time
+import unittest
+from unittest.mock import MagicMock
+
+for name in ["elasticsearch", "aerospike", "requests"]:
+    sys.modules.setdefault(name, MagicMock())
+
+from src.tools import hybrid_core
+
+BM25_RESPONSE = {"hits": {"hits": [{"_id": "b1", "_score": 2.0, "_source": {"title": "Python Developer"}}]}}
+
+
+class TestRetrievalLegs(unittest.TestCase):
+    def setUp(self):
+        for name in ["ES", "embed", "VECTOR_INDEX", "BM25_INDEX", "EMBED_CACHE", "requests"]:
+            self.addCleanup(setattr, hybrid_core, name, getattr(hybrid_core, name))
+        hybrid_core.ES = MagicMock()
+        hybrid_core.VECTOR_INDEX = None
+        hybrid_core.BM25_INDEX = None
+
+    def test_msearch_degrades_to_bm25_when_embedding_fails(self):
+        hybrid_core.embed = MagicMock(side_effect=ConnectionError("embeddings down"))
+        msearch = hybrid_core.ES.options.return_value.msearch
+        msearch.return_value = {"responses": [BM25_RESPONSE]}
+
+        results = hybrid_core.hybrid_search("python", mode="msearch", hydrate_results=False,
+                                            bm25_timeout=2.0, dense_timeout=1.0)
+        self.assertEqual([hit["id"] for hit in results], ["b1"])
+        searches = msearch.call_args.kwargs["searches"]
+        self.assertEqual(len(searches), 2)
+        self.assertNotIn("knn", searches[1])
+        timeout = hybrid_core.ES.options.call_args.kwargs["request_timeout"]
+        self.assertTrue(0 < timeout <= 2.0)
+
+    def test_slow_dense_leg_returns_bm25_within_deadline(self):
+        hybrid_core.embed = lambda text, timeout=None: time.sleep(0.5) or [0.0] * 4
+        hybrid_core.ES.options.return_value.search.return_value = BM25_RESPONSE
+
+        start = time.monotonic()
+        results = hybrid_core.hybrid_search("python", mode="parallel", hydrate_results=False,
+                                            bm25_timeout=1.0, dense_timeout=0.1)
+        self.assertLess(time.monotonic() - start, 0.4)
+        self.assertEqual([hit["id"] for hit in results], ["b1"])
+
+    def test_embedding_request_has_timeout(self):
+        hybrid_core.EMBED_CACHE = MagicMock(get=MagicMock(return_value=None))
+        hybrid_core.requests = MagicMock()
+        hybrid_core.requests.post.return_value.json.return_value = {"embedding": [0.1]}
+        self.assertEqual(hybrid_core.embed("python", timeout=0.3), [0.1])
+        self.assertEqual(hybrid_core.requests.post.call_args.kwargs["timeout"], 0.3)
+
+        hybrid_core.search_dense(hybrid_core.build_search_query("java"), "java", timeout=0.2)
+        self.assertEqual(hybrid_core.requests.post.call_args.kwargs["timeout"], 0.2)
+
+    def test_es_leg_requests_are_bounded_by_leg_budget(self):
+        hybrid_core.embed = lambda text, timeout=None: [0.0] * 4
+        hybrid_core.ES.options.return_value.search.return_value = BM25_RESPONSE
+        builder = hybrid_core.build_search_query("python")
+        hybrid_core.search_bm25(builder.build_bm25_query(), timeout=0.7)
+        self.assertEqual(hybrid_core.ES.options.call_args.kwargs["request_timeout"], 0.7)
+        hybrid_core.search_dense(builder, "python", timeout=0.3)
+        self.assertTrue(0 < hybrid_core.ES.options.call_args.kwargs["request_timeout"] <= 0.3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+import numpy as np
+
+for name in ["elasticsearch", "aerospike", "requests"]:
+    sys.modules.setdefault(name, MagicMock())
+
+from src.tools import hybrid_core
+from src.tools.bm25_index import BM25Index, BM25IndexWriter
+from src.tools.vector_index import VectorIndex, VectorIndexWriter
+
+DIMS = 4
+EMPTY = {"hits": {"hits": []}}
+
+
+class TestLocalRetrieversFusion(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        for name in ["VECTOR_INDEX", "BM25_INDEX", "embed", "ES"]:
+            self.addCleanup(setattr, hybrid_core, name, getattr(hybrid_core, name))
+        hybrid_core.ES = MagicMock()
+        hybrid_core.embed = lambda text, timeout=None: [1.0, 0.0, 0.0, 0.0]
+
+    def build_vectors(self):
+        path = self.tmp.name + "/vectors"
+        writer = VectorIndexWriter(path, DIMS)
+        writer.add_batch(["d1", "d2"], np.eye(DIMS)[:2],
+                         [{"location": "Pune", "experience": 4}, {"location": "Mumbai", "experience": 9}])
+        writer.close()
+        return VectorIndex(path)
+
+    def test_dense_only_ids_survive_fusion(self):
+        hybrid_core.VECTOR_INDEX = self.build_vectors()
+        hybrid_core.ES.options.return_value.search.return_value = {"hits": {"hits": [
+            {"_id": "b1", "_score": 3.0, "_source": {"title": "Python Developer", "experience": 2}},
+        ]}}
+        results = hybrid_core.hybrid_search("python", hydrate_results=False)
+        ids = [hit["id"] for hit in results]
+        self.assertIn("b1", ids)
+        self.assertIn("d1", ids)
+        dense_hit = results[ids.index("d1")]
+        self.assertIsNone(dense_hit["bm25_rank"])
+        self.assertEqual(dense_hit["source"], {"location": "Pune", "experience": 4})
+
+    def test_both_local_retrievers(self):
+        hybrid_core.VECTOR_INDEX = self.build_vectors()
+        path = self.tmp.name + "/bm25"
+        writer = BM25IndexWriter(path)
+        writer.add_batch(["b1", "d2"], [
+            {"title": "Python Developer", "skills": "python", "location": "Pune", "experience": 2},
+            {"title": "Java Developer", "skills": "java", "location": "Mumbai", "experience": 9},
+        ])
+        writer.close()
+        hybrid_core.BM25_INDEX = BM25Index(path)
+
+        results = hybrid_core.hybrid_search("python developer", hydrate_results=False)
+        hybrid_core.ES.options.return_value.search.assert_not_called()
+        self.assertEqual({hit["id"] for hit in results}, {"b1", "d1", "d2"})
+        # Lexical-only match keeps its stored fields for job_search's experience ordering.
+        self.assertEqual(next(h for h in results if h["id"] == "b1")["source"],
+                         {"location": "Pune", "experience": 2})
+
+        filtered = hybrid_core.hybrid_search("python developer", location="Pune", hydrate_results=False)
+        self.assertEqual({hit["id"] for hit in filtered}, {"b1", "d1"})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import sys
+import unittest
+from unittest.mock import MagicMock
+
+for name in ["elasticsearch", "aerospike", "requests"]:
+    sys.modules.setdefault(name, MagicMock())
+
+from src.tools import hybrid_core, job_search
+from src.tools.result_cache import ResultCache
+
+CANDIDATES = [
+    {"id": "1", "score": 0.03, "bm25_rank": 1, "dense_rank": None,
+     "source": {"title": "Python Developer", "location": "Pune", "experience": 5, "description": "long"}},
+    {"id": "2", "score": 0.02, "bm25_rank": 2, "dense_rank": 1,
+     "source": {"title": "Django Developer", "location": "Pune", "experience": 3, "description": "long"}},
+]
+
+
+class TestResultCacheHit(unittest.TestCase):
+    def setUp(self):
+        for name in ["RESULT_CACHE", "GENERATION", "hybrid_search"]:
+            self.addCleanup(setattr, job_search, name, getattr(job_search, name))
+        self.addCleanup(setattr, hybrid_core, "HYDRATE_MODE", hybrid_core.HYDRATE_MODE)
+        self.addCleanup(setattr, hybrid_core, "get_aerospike_details", hybrid_core.get_aerospike_details)
+        job_search.RESULT_CACHE = ResultCache(max_entries=10, ttl=60)
+        job_search.GENERATION = MagicMock(current=MagicMock(return_value=1))
+        job_search.hybrid_search = MagicMock(side_effect=lambda *a, **k: [dict(c, source=dict(c["source"])) for c in CANDIDATES])
+
+    def test_hit_served_with_hydration_disabled(self):
+        hybrid_core.HYDRATE_MODE = "none"
+        query = {"rewritten_query": "python", "location": "Pune", "experience": None}
+        first = job_search.run(query)
+        second = job_search.run(query)
+        job_search.hybrid_search.assert_called_once()
+        self.assertEqual(second, first)
+        self.assertEqual(second["jobs"][0]["source"]["description"], "long")
+
+    def test_hit_matches_miss_when_some_jobs_cannot_be_hydrated(self):
+        hybrid_core.HYDRATE_MODE = "aerospike"
+        hybrid_core.get_aerospike_details = MagicMock(return_value={"2": {"job_id": "2", "description": "fresh"}})
+        query = {"rewritten_query": "python", "location": "Pune", "experience": None}
+        first = job_search.run(query)
+        second = job_search.run(query)
+        job_search.hybrid_search.assert_called_once()
+        self.assertEqual(second, first)
+        self.assertEqual(second["jobs"][0]["source"]["description"], "fresh")
+        # Job "1" isn't in Aerospike: it keeps its full search source on the hit too.
+        self.assertEqual(second["jobs"][1]["source"], CANDIDATES[0]["source"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+
+import json
+import sys
+import unittest
+from unittest.mock import MagicMock
+
+sys.modules.setdefault("ollama", MagicMock())
+
+from src.orchestrator import model
+from src.orchestrator.plan_cache import PlanCache, canonicalize
+
+TOOLS = ["query_rewrite", "job_search", "rerank", "salary_lookup"]
+
+
+def salary_plan(text):
+    return json.dumps({"steps": [{"tool": "salary_lookup", "input": text}]})
+
+
+class TestCanonicalize(unittest.TestCase):
+    def test_slots_are_masked(self):
+        shape, slots = canonicalize("Salary of a python developer in Bengaluru with 3-5 years")
+        self.assertEqual(shape, "salary of a <skill> developer in <loc> with <num> years")
+        self.assertEqual(slots, [("skill", "python"), ("loc", "Bengaluru"), ("num", "3-5")])
+
+    def test_same_shape_for_different_values(self):
+        self.assertEqual(canonicalize("salary for java in pune, 4 yrs")[0],
+                         canonicalize("Salary for Kafka in Mumbai, 10 yrs")[0])
+        self.assertEqual(canonicalize("salary for java in pune")[0],
+                         canonicalize("salary for rust in work from home")[0])
+
+
+class TestPlanCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = PlanCache(tools=TOOLS, max_entries=2, ttl=None)
+
+    def test_plan_reinstantiated_for_same_shape(self):
+        self.assertTrue(self.cache.put("salary of python developer in pune",
+                                       salary_plan("python developer salary, Pune")))
+        plan = json.loads(self.cache.get("salary of java developer in hyderabad"))
+        self.assertEqual(plan["steps"][0]["input"], "java developer salary, hyderabad")
+        self.assertIsNotNone(self.cache.get("salary of python developer in pune"))
+        self.assertIsNone(self.cache.get("salary of python developer"))
+
+        stats = self.cache.stats()
+        self.assertEqual((stats["template_hits"], stats["exact_hits"], stats["misses"]), (1, 1, 1))
+
+    def test_params_reinstantiated(self):
+        plan = json.loads(salary_plan("python pune"))
+        plan["params"] = {"keywords": "python developer", "location": "pune", "experience": 5}
+        self.cache.put("salary python developer pune 5 years", json.dumps(plan))
+        params = json.loads(self.cache.get("salary java developer mumbai 3-5 years"))["params"]
+        self.assertEqual(params, {"keywords": "java developer", "location": "mumbai", "experience": "3-5"})
+
+    def test_invalid_plans_are_not_cached(self):
+        self.assertFalse(self.cache.put("q", "not json"))
+        self.assertFalse(self.cache.put("q", json.dumps({"steps": [{"tool": "rm_rf", "input": "x"}]})))
+        self.assertEqual(self.cache.stats()["rejected"], 2)
+        self.assertIsNone(self.cache.get("q"))
+
+    def test_plans_with_literals_not_from_query_are_not_cached(self):
+        query = "show me python developer openings in bengaluru please"
+        rewritten = json.dumps({"steps": [
+            {"tool": "query_rewrite", "input": "python developer jobs in Bangalore"},
+            {"tool": "job_search", "input": "$PREVIOUS_OUTPUT"},
+        ]})
+        self.assertFalse(self.cache.put(query, rewritten))
+        self.assertIsNone(self.cache.get("show me java developer openings in pune please"))
+
+        plan = json.loads(salary_plan("python pune"))
+        plan["params"] = {"keywords": "python developer", "location": "pune", "experience": 5}
+        self.assertFalse(self.cache.put("salary python developer pune", json.dumps(plan)))
+        self.assertEqual(self.cache.stats()["rejected"], 2)
+
+    def test_stale_plan_rejected_on_reuse(self):
+        self.cache.put("salary in pune", salary_plan("pune"))
+        self.cache._tools = {"query_rewrite"}
+        self.assertIsNone(self.cache.get("salary in mumbai"))
+        self.assertEqual(self.cache.stats()["invalid_on_reuse"], 1)
+        self.assertEqual(len(self.cache.cache), 0)
+
+    def test_bounded(self):
+        for city in ["pune", "salary a", "salary b", "salary c"]:
+            self.cache.put(city, salary_plan(city))
+        self.assertEqual(self.cache.stats()["entries"], 2)
+
+
+class TestOrchestrateUsesCache(unittest.TestCase):
+    def test_llm_called_once_per_shape(self):
+        self.addCleanup(setattr, model, "PLAN_CACHE", model.PLAN_CACHE)
+        self.addCleanup(setattr, model, "client", model.client)
+        model.PLAN_CACHE = PlanCache(tools=TOOLS)
+        model.client = MagicMock()
+        model.client.chat.return_value = {"message": {"content": salary_plan("salary python pune")}}
+        model.orchestrate("what is the salary for python in pune")
+        plan = json.loads(model.orchestrate("what is the salary for java in chennai"))
+        self.assertEqual(plan["steps"][0]["input"], "salary java chennai")
+        model.client.chat.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
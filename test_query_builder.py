@@ -1,6 +1,7 @@
 
 import unittest
 from src.tools.query_builder import ElasticsearchQueryBuilder
+from src.tools.routing import NO_LOCATION, normalize_location, routing_for
 
 class TestQueryBuilder(unittest.TestCase):
     def test_text_search(self):
@@ -45,5 +46,43 @@ class TestQueryBuilder(unittest.TestCase):
         self.assertEqual(query["knn"]["query_vector"], vector)
         self.assertIn("filter", query["knn"])
 
+    def test_msearch_body(self):
+        qb = ElasticsearchQueryBuilder()
+        qb.add_text_search("python", ["title"])
+        qb.add_filter("location", "Pune")
+        qb.set_knn([0.1, 0.2], k=10, num_candidates=20)
+        searches = qb.build_msearch_body("jobs", bm25_size=25)
+        self.assertEqual(len(searches), 4)
+        self.assertEqual(searches[0], {"index": "jobs"})
+        self.assertEqual(searches[1]["size"], 25)
+        self.assertIn("query", searches[1])
+        self.assertEqual(searches[3]["knn"]["k"], 10)
+        self.assertEqual(searches[3]["knn"]["filter"], searches[1]["query"]["bool"]["filter"])
+
+    def test_msearch_body_without_knn(self):
+        qb = ElasticsearchQueryBuilder()
+        qb.add_text_search("python", ["title"])
+        self.assertEqual(len(qb.build_msearch_body("jobs")), 2)
+
+    def test_msearch_headers_carry_routing(self):
+        qb = ElasticsearchQueryBuilder()
+        qb.add_filter("location", "Pune").set_routing("pune")
+        qb.set_knn([0.1, 0.2])
+        searches = qb.build_msearch_body("jobs")
+        self.assertEqual(searches[0], {"index": "jobs", "routing": "pune"})
+        self.assertEqual(searches[2], {"index": "jobs", "routing": "pune"})
+        self.assertNotIn("routing", searches[1])
+
+class TestRouting(unittest.TestCase):
+    def test_normalize_location(self):
+        self.assertEqual(normalize_location("  New   Delhi "), "new delhi")
+        self.assertEqual(normalize_location("Pune"), normalize_location("pune"))
+        self.assertIsNone(normalize_location(""))
+        self.assertIsNone(normalize_location(float("nan")))
+
+    def test_routing_for_missing_location(self):
+        self.assertEqual(routing_for(None), NO_LOCATION)
+        self.assertEqual(routing_for("Remote"), "remote")
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,68 @@
+
+import json
+import sys
+import unittest
+from unittest.mock import MagicMock
+
+sys.modules.setdefault("ollama", MagicMock())
+
+from src.tools import query_rewrite
+from src.tools.gazetteer import Gazetteer, load_locations, save_locations
+
+class TestRuleExtractor(unittest.TestCase):
+    def setUp(self):
+        for name in ["client", "STATS"]:
+            self.addCleanup(setattr, query_rewrite, name, getattr(query_rewrite, name))
+        query_rewrite.client = MagicMock()
+        query_rewrite.STATS = query_rewrite.RewriteStats()
+
+    def test_common_patterns_skip_llm(self):
+        cases = {
+            "frontend dev 3-5 years exp in pune": ("frontend dev", "Pune", {"gte": 3, "lte": 5}),
+            "backend role in bangalore for 5 years": ("backend", "Bangalore", 5),
+            "python remote": ("python", "Remote", None),
+            "senior java developer 5+ yrs in Bengaluru": ("senior java developer", "Bangalore", {"gte": 5}),
+            "data scientist at least 4 yrs experience mumbai": ("data scientist", "Mumbai", {"gte": 4}),
+            "jobs in hyderabad": ("", "Hyderabad", None),
+            "python dev under 3 years": ("python dev", None, {"lt": 3}),
+            "python developer up to 4 yrs exp": ("python developer", None, {"lte": 4}),
+            "java developer not more than 5 years": ("java developer", None, {"lte": 5}),
+        }
+        for query, (keywords, location, experience) in cases.items():
+            self.assertEqual(query_rewrite.run(query),
+                             {"rewritten_query": keywords, "location": location, "experience": experience},
+                             query)
+        query_rewrite.client.chat.assert_not_called()
+        stats = query_rewrite.rewrite_stats()
+        self.assertEqual((stats["rules"], stats["llm"]), (len(cases), 0))
+        self.assertEqual(stats["llm_skipped_fraction"], 1.0)
+
+    def test_low_confidence_falls_back_to_llm(self):
+        query_rewrite.client.chat.return_value = {"message": {"content": json.dumps(
+            {"keywords": "plumber", "location": "pune", "experience": None})}}
+        for query in ["plumber in pune", "python dev in pune or chennai", "python 7 developer",
+                      "not in pune python developer", "python developer jobs outside mumbai",
+                      "java developer except in mumbai", "python developer pune not preferred",
+                      "python developer excluding 5 years", "python jobs in delhi",
+                      "devops engineer kolkata", "react developer near lucknow"]:
+            _, confidence = query_rewrite.extract(query)
+            self.assertLess(confidence, query_rewrite.REWRITE_MIN_CONFIDENCE, query)
+
+        result = query_rewrite.run("plumber in pune")
+        self.assertEqual(result, {"rewritten_query": "plumber", "location": "Pune", "experience": None})
+        query_rewrite.client.chat.assert_called_once()
+        self.assertEqual(query_rewrite.rewrite_stats()["llm"], 1)
+
+
+class TestLocations(unittest.TestCase):
+    def test_round_trip_and_fallback(self):
+        import os, tempfile
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "locations.json")
+            self.assertIn("Pune", load_locations(path))
+            save_locations(["Noida", " New  Delhi ", "Noida", None], path)
+            self.assertEqual(load_locations(path), ["New Delhi", "Noida"])
+            self.assertEqual(Gazetteer(load_locations(path)).find("jobs in new delhi").location, "New Delhi")
+
+if __name__ == '__main__':
+    unittest.main()
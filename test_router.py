@@ -0,0 +1,63 @@
+
+import json
+import sys
+import unittest
+from unittest.mock import MagicMock
+
+for name in ["ollama", "elasticsearch", "elasticsearch.helpers", "aerospike", "requests"]:
+    sys.modules.setdefault(name, MagicMock())
+
+from src.orchestrator import router
+from src.tools import query_rewrite
+
+class TestCombinedPlan(unittest.TestCase):
+    def setUp(self):
+        self.addCleanup(setattr, query_rewrite, "client", query_rewrite.client)
+        query_rewrite.client = MagicMock()
+        self.job_search = MagicMock(return_value={"jobs": [{"job_id": 1}]})
+        self.rerank = MagicMock(return_value={"jobs": [{"job_id": 1}]})
+        router.TOOL_MAP["job_search"] = self.job_search
+        router.TOOL_MAP["rerank"] = self.rerank
+
+    def tearDown(self):
+        router.TOOL_MAP["job_search"] = router.job_search
+        router.TOOL_MAP["rerank"] = router.rerank
+
+    def plan(self, params):
+        plan = {"steps": [
+            {"tool": "query_rewrite", "input": "frontend dev 3-5 years exp in pune"},
+            {"tool": "job_search", "input": "$PREVIOUS_OUTPUT"},
+            {"tool": "rerank", "input": "$PREVIOUS_OUTPUT"},
+        ]}
+        if params is not None:
+            plan["params"] = params
+        return json.dumps(plan)
+
+    def test_params_skip_rewrite_llm(self):
+        results = router.run_workflow(self.plan(
+            {"keywords": "frontend developer", "location": "pune", "experience": "3-5"}))
+        query_rewrite.client.chat.assert_not_called()
+        self.job_search.assert_called_once_with(
+            {"rewritten_query": "frontend developer", "location": "Pune",
+             "experience": {"gte": 3, "lte": 5}})
+        self.assertEqual(results[2]["output"], {"jobs": [{"job_id": 1}]})
+
+    def test_without_params_rewrite_calls_llm(self):
+        query_rewrite.REWRITE_RULES_ENABLED = False
+        self.addCleanup(setattr, query_rewrite, "REWRITE_RULES_ENABLED", True)
+        query_rewrite.client.chat.return_value = {"message": {"content": json.dumps(
+            {"keywords": "frontend developer", "location": "pune", "experience": 4})}}
+        router.run_workflow(self.plan(None))
+        query_rewrite.client.chat.assert_called_once()
+        self.assertEqual(self.job_search.call_args[0][0]["experience"], 4)
+
+
+class TestParseExperience(unittest.TestCase):
+    def test_forms(self):
+        cases = {5: 5, "5": 5, "3-5": {"gte": 3, "lte": 5}, "3 to 5": {"gte": 3, "lte": 5},
+                 "5+": {"gte": 5}, None: None, "several": None}
+        for value, expected in cases.items():
+            self.assertEqual(query_rewrite.parse_experience(value), expected, value)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+
+import os
+import tempfile
+import unittest
+import numpy as np
+from src.tools.vector_index import VectorIndex, VectorIndexWriter
+
+DIMS = 8
+
+def build(path, dtype="float32", ivf_lists=0, n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(n, DIMS)).astype(np.float32)
+    fields = [
+        {"location": ["Pune", "Remote", "Mumbai"][i % 3], "experience": i % 10 if i % 7 else None}
+        for i in range(n)
+    ]
+    writer = VectorIndexWriter(path, DIMS, dtype=dtype)
+    # Two batches to exercise streaming appends
+    writer.add_batch([f"j{i}" for i in range(100)], vectors[:100], fields[:100])
+    writer.add_batch([f"j{i}" for i in range(100, n)], vectors[100:], fields[100:])
+    writer.close(ivf_lists=ivf_lists)
+    return vectors, fields
+
+def brute_force(vectors, query, k, rows=None):
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    scores = unit @ (query / np.linalg.norm(query))
+    rows = np.arange(len(vectors)) if rows is None else np.asarray(rows)
+    order = rows[np.argsort(-scores[rows], kind="stable")][:k]
+    return [f"j{i}" for i in order]
+
+class TestVectorIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_exact_topk_matches_brute_force(self):
+        vectors, _ = build(self.path)
+        index = VectorIndex(self.path)
+        query = vectors[5] + 0.1
+        ids = [doc_id for doc_id, _ in index.search(query, k=10)]
+        self.assertEqual(ids, brute_force(vectors, query, 10))
+
+    def test_filters(self):
+        vectors, fields = build(self.path)
+        index = VectorIndex(self.path)
+        filters = [{"match": {"location": "Remote"}}, {"range": {"experience": {"gte": 3, "lte": 5}}}]
+        rows = [i for i, f in enumerate(fields)
+                if f["location"] == "Remote" and f["experience"] is not None and 3 <= f["experience"] <= 5]
+        ids = [doc_id for doc_id, _ in index.search(vectors[0], k=5, filters=filters)]
+        self.assertEqual(ids, brute_force(vectors, vectors[0], 5, rows))
+        self.assertEqual(index.search(vectors[0], filters=[{"match": {"location": "Chennai"}}]), [])
+        with self.assertRaises(ValueError):
+            index.search(vectors[0], filters=[{"match": {"title": "x"}}])
+
+    def test_cosine_for_ids(self):
+        vectors, _ = build(self.path)
+        index = VectorIndex(self.path)
+        unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        out = index.cosine_for_ids(vectors[3], ["j7", "missing", "j3"])
+        np.testing.assert_allclose(out[[0, 2]], [unit[7] @ unit[3], 1.0], rtol=1e-5)
+        self.assertTrue(np.isnan(out[1]))
+        self.assertEqual(len(index.cosine_for_ids(vectors[3], [])), 0)
+
+        # Indexes written before the sorted id files fall back to an in-memory sort.
+        for name in ("ids_sorted.npy", "ids_rows.npy"):
+            os.remove(os.path.join(self.path, name))
+        legacy = VectorIndex(self.path).cosine_for_ids(vectors[3], ["j7", "missing", "j3"])
+        np.testing.assert_allclose(legacy, out, rtol=1e-6)
+
+    def test_quantized_dtypes_keep_recall(self):
+        vectors, _ = build(self.path, dtype="int8")
+        index = VectorIndex(self.path)
+        query = vectors[42]
+        ids = [doc_id for doc_id, _ in index.search(query, k=10)]
+        self.assertEqual(ids[0], "j42")
+        self.assertGreaterEqual(len(set(ids) & set(brute_force(vectors, query, 10))), 8)
+
+    def test_ivf_with_all_lists_is_exact(self):
+        vectors, _ = build(self.path, ivf_lists=4)
+        index = VectorIndex(self.path, nprobe=4)
+        query = vectors[7]
+        ids = [doc_id for doc_id, _ in index.search(query, k=10)]
+        self.assertEqual(ids, brute_force(vectors, query, 10))
+        self.assertLessEqual(len(index.search(query, k=10, nprobe=1)), 10)
+
+    def test_search_hits_shape(self):
+        vectors, fields = build(self.path, dtype="float16")
+        hits = VectorIndex(self.path).search_hits(vectors[7], k=3)["hits"]["hits"]
+        self.assertEqual(hits[0]["_id"], "j7")
+        self.assertAlmostEqual(hits[0]["_score"], 1.0, places=2)
+        # Stored filter fields come back as _source; a missing experience is omitted.
+        self.assertEqual(hits[0]["_source"], {"location": fields[7]["location"]})
+        self.assertEqual(VectorIndex(self.path).search_hits(vectors[3], k=1)["hits"]["hits"][0]["_source"],
+                         {"location": "Pune", "experience": 3})
+
+if __name__ == '__main__':
+    unittest.main()